@@ -1,6 +1,10 @@
-from .core import Process
-from .policies import RR, FCFS, SJF, STCF, PriorityScheduler
-from .engine import BasicEngine
+from .core import Process, TraceLevel
+from .types import IOBurst, PeriodicTask, SporadicTask
+from .io import IODevice
+from .policies import RR, FCFS, SJF, STCF, PriorityScheduler, MLFQ, CFS, Lottery, Stride, EDF, RateMonotonic
+from .engine import BasicEngine, EventEngine, StreamingEngine
+from .analytic import AnalyticEngine
+from .smp import SMPEngine
 from .visualizer import Visualizer
 
-__all__ = ["Process", "BasicEngine", "RR", "FCFS", "SJF", "STCF", "Visualizer", "PriorityScheduler"]
+__all__ = ["Process", "IOBurst", "IODevice", "TraceLevel", "BasicEngine", "EventEngine", "StreamingEngine", "AnalyticEngine", "SMPEngine", "RR", "FCFS", "SJF", "STCF", "Visualizer", "PriorityScheduler", "MLFQ", "CFS", "Lottery", "Stride", "EDF", "RateMonotonic", "PeriodicTask", "SporadicTask"]
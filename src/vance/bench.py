@@ -0,0 +1,380 @@
+"""Benchmarks for the simulation engines.
+
+Run with ``python -m vance.bench``. The default suite times every built-in
+policy on every engine across workload sizes, dispatch latencies and trace
+levels, and reports simulated ticks per second, policy decisions per second,
+wall time and peak memory:
+
+    python -m vance.bench --save baseline.json          # record a baseline
+    python -m vance.bench --compare baseline.json       # flag regressions (exit code 1)
+
+``--scaling`` and ``--trace-overhead`` print the process-count scaling and
+per-trace-level overhead reports instead; ``--trace-levels`` picks the trace
+levels the suite runs at.
+"""
+from .types import Process
+from .policies import SchedulerPolicy, RR, FCFS, SJF, STCF, PriorityScheduler
+from .engine import BasicEngine, EventEngine
+from .core import TraceLevel
+from typing import List, Dict, Optional
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# Built-in policies timed by the suite
+POLICIES = {
+    "FCFS": FCFS,
+    "SJF": SJF,
+    "STCF": STCF,
+    "Priority": PriorityScheduler,
+    "RR(q=4)": lambda: RR(time_quantum=4),
+}
+ENGINES = {"BasicEngine": BasicEngine, "EventEngine": EventEngine}
+
+
+def make_workload(n: int, burst_time: int = 2) -> List[Process]:
+    """Builds an overloaded workload: two processes arrive on every tick.
+
+    Args:
+      n: int: Number of processes.
+      burst_time: int: Burst time of every process. (Default value = 2)
+    """
+    return [Process(pid=i, burst_time=burst_time, arrival_time=i // 2) for i in range(n)]
+
+
+def bench_scaling(sizes=(1_000, 10_000, 100_000), engine_cls=EventEngine) -> List[Dict]:
+    """Times FIFO-style policies as the number of processes grows.
+
+    With O(1) queue operations the time per process should stay roughly
+    flat, i.e. the total time grows linearly with the process count.
+
+    Args:
+      sizes: Process counts to simulate.
+      engine_cls: The engine class to time. (Default value = EventEngine)
+
+    Returns:
+      list[dict]: One row per (policy, size) with wall time and time per process.
+    """
+    rows = []
+    for name, make_policy in (("FCFS", FCFS), ("RR(q=1)", lambda: RR(time_quantum=1))):
+        for n in sizes:
+            processes = make_workload(n)
+            start = time.perf_counter()
+            engine_cls(make_policy()).run(processes)
+            elapsed = time.perf_counter() - start
+            rows.append({
+                "policy": name,
+                "processes": n,
+                "seconds": elapsed,
+                "us_per_process": elapsed / n * 1e6,
+            })
+    return rows
+
+
+def bench_trace_levels(n: int = 20_000, engine_cls=BasicEngine) -> List[Dict]:
+    """Measures the per-tick cost of every trace level.
+
+    Uses the tick-by-tick BasicEngine with RR(q=1) by default, so every tick
+    goes through the tracer.
+
+    Args:
+      n: int: Number of processes. (Default value = 20_000)
+      engine_cls: The engine class to time. (Default value = BasicEngine)
+
+    Returns:
+      list[dict]: One row per level with ns/tick and the overhead over OFF.
+    """
+    processes = make_workload(n)
+    rows = []
+    for level in TraceLevel:
+        engine = engine_cls(RR(time_quantum=1), dispatch_latency=1, trace_level=level)
+        start = time.perf_counter()
+        res = engine.run(processes)
+        if level == TraceLevel.FULL:
+            engine.tracer.get_log()  # the text is only built on demand
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "level": level.name,
+            "ticks": res["total_time"],
+            "seconds": elapsed,
+            "ns_per_tick": elapsed / res["total_time"] * 1e9,
+        })
+    for row in rows:
+        row["overhead_ns_per_tick"] = row["ns_per_tick"] - rows[0]["ns_per_tick"]
+    return rows
+
+
+def make_random_workload(n: int, load: float = 0.9, seed: int = 0) -> List[Process]:
+    """Builds a seeded random workload that keeps the CPU about ``load`` busy.
+
+    Burst times are uniform in [1, 15] and priorities in [0, 4].
+
+    Args:
+      n: int: Number of processes.
+      load: float: Target CPU utilization. (Default value = 0.9)
+      seed: int: Random seed. (Default value = 0)
+    """
+    rng = random.Random(seed)
+    mean_gap = 8 / load  # mean burst is 8
+    arrival = 0.0
+    processes = []
+    for pid in range(n):
+        arrival += rng.expovariate(1 / mean_gap)
+        processes.append(Process(pid, rng.randint(1, 15), int(arrival), rng.randint(0, 4)))
+    return processes
+
+
+class _CountingPolicy(SchedulerPolicy):
+    """Wraps a policy and counts how many decisions the engine asks for."""
+
+    def __init__(self, policy: SchedulerPolicy):
+        self.policy = policy
+        self.decisions = 0
+
+    def create_ready_queue(self, remaining_times):
+        return self.policy.create_ready_queue(remaining_times)
+
+    def get_next_process(self, ready_queue, current_process, current_runtime, remaining_times):
+        self.decisions += 1
+        return self.policy.get_next_process(
+            ready_queue, current_process, current_runtime, remaining_times
+        )
+
+    def preemption_horizon(self, ready_queue, current_process, current_runtime, remaining_times):
+        return self.policy.preemption_horizon(
+            ready_queue, current_process, current_runtime, remaining_times
+        )
+
+
+def bench_case(
+    engine_cls, make_policy, processes: List[Process], dispatch_latency: int,
+    trace_level: TraceLevel, repeat: int = 3, memory: bool = True,
+) -> Dict:
+    """Times one configuration.
+
+    The wall time is the best of ``repeat`` runs. Peak memory is measured in
+    a separate run under ``tracemalloc``, so it does not slow the timed ones.
+
+    Returns:
+      dict: wall_time, ticks, decisions, ticks_per_sec, decisions_per_sec
+      and peak_memory_kb (None when ``memory`` is off).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        policy = _CountingPolicy(make_policy())
+        engine = engine_cls(policy, dispatch_latency=dispatch_latency, trace_level=trace_level)
+        start = time.perf_counter()
+        res = engine.run(processes)
+        best = min(best, time.perf_counter() - start)
+
+    peak_kb = None
+    if memory:
+        engine = engine_cls(make_policy(), dispatch_latency=dispatch_latency, trace_level=trace_level)
+        tracemalloc.start()
+        engine.run(processes)
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+    return {
+        "wall_time": best,
+        "ticks": res["total_time"],
+        "decisions": policy.decisions,
+        "ticks_per_sec": res["total_time"] / best if best else 0.0,
+        "decisions_per_sec": policy.decisions / best if best else 0.0,
+        "peak_memory_kb": peak_kb,
+    }
+
+
+def run_suite(
+    sizes=(1_000, 5_000),
+    latencies=(0, 2),
+    trace_levels=(TraceLevel.OFF, TraceLevel.FULL),
+    engines=None,
+    policies=None,
+    repeat: int = 3,
+    memory: bool = True,
+    progress=None,
+) -> Dict:
+    """Runs every (engine, policy, size, latency, trace level) combination.
+
+    Args:
+      sizes: Workload sizes (see ``make_random_workload``).
+      latencies: Dispatch latencies.
+      trace_levels: Trace levels, e.g. with and without tracing.
+      engines: Name to engine class. (Default value = None, ``ENGINES``)
+      policies: Name to policy factory. (Default value = None, ``POLICIES``)
+      repeat: Timed runs per case; the best one counts. (Default value = 3)
+      memory: Also measure peak memory. (Default value = True)
+      progress: Called with each case name before it runs.
+
+    Returns:
+      dict: ``{"meta": {...}, "results": {case name: metrics}}``, the format
+      of the JSON baseline files.
+    """
+    engines = engines or ENGINES
+    policies = policies or POLICIES
+    results = {}
+    for n in sizes:
+        processes = make_random_workload(n)
+        for engine_name, engine_cls in engines.items():
+            for policy_name, make_policy in policies.items():
+                for latency in latencies:
+                    for level in trace_levels:
+                        level = TraceLevel[level.upper()] if isinstance(level, str) else TraceLevel(level)
+                        name = f"{engine_name}/{policy_name}/n={n}/latency={latency}/trace={level.name}"
+                        if progress:
+                            progress(name)
+                        results[name] = bench_case(
+                            engine_cls, make_policy, processes, latency, level,
+                            repeat=repeat, memory=memory,
+                        )
+    return {"meta": _meta(), "results": results}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.10) -> List[Dict]:
+    """Compares a suite run against a baseline.
+
+    A case regresses when its wall time or peak memory grew by more than
+    ``threshold`` (a fraction, 0.10 = 10%). Cases missing from either side
+    are skipped.
+
+    Returns:
+      list[dict]: One row per shared case with the relative changes and a
+      ``regression`` flag.
+    """
+    rows = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        time_change = _relative_change(new["wall_time"], old["wall_time"])
+        memory_change = _relative_change(new.get("peak_memory_kb"), old.get("peak_memory_kb"))
+        rows.append({
+            "case": name,
+            "wall_time_change": time_change,
+            "peak_memory_change": memory_change,
+            "regression": time_change > threshold
+            or (memory_change is not None and memory_change > threshold),
+        })
+    return rows
+
+
+def _relative_change(new, old) -> Optional[float]:
+    if new is None or old is None:
+        return None
+    if not old:
+        return 0.0
+    return (new - old) / old
+
+
+def _meta() -> Dict:
+    try:
+        from importlib.metadata import version
+        vance_version = version("vance")
+    except Exception:
+        vance_version = "unknown"
+    return {
+        "vance": vance_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def _print_suite(report: Dict):
+    head = (
+        f"{'Case':<58} | {'Wall s':>8} | {'ticks/s':>10} | "
+        f"{'decisions/s':>11} | {'peak KiB':>9}"
+    )
+    print(head)
+    print("-" * len(head))
+    for name, r in report["results"].items():
+        peak = f"{r['peak_memory_kb']:>9.0f}" if r["peak_memory_kb"] is not None else f"{'-':>9}"
+        print(
+            f"{name:<58} | {r['wall_time']:>8.3f} | {r['ticks_per_sec']:>10.0f} | "
+            f"{r['decisions_per_sec']:>11.0f} | {peak}"
+        )
+
+
+def _print_comparison(rows: List[Dict], threshold: float):
+    print(f"\nCompared with baseline (threshold {threshold:.0%}):")
+    for row in rows:
+        memory = row["peak_memory_change"]
+        memory = f"{memory:+.1%}" if memory is not None else "-"
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['case']:<58} | time {row['wall_time_change']:+.1%} | memory {memory}{flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{regressions} regression(s) in {len(rows)} compared case(s).")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m vance.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000])
+    parser.add_argument("--latencies", type=int, nargs="+", default=[0, 2])
+    parser.add_argument("--trace-levels", dest="levels", nargs="+", default=["OFF", "FULL"],
+                        choices=[level.name for level in TraceLevel], type=str.upper)
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--policies", nargs="+", choices=list(POLICIES), default=list(POLICIES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory runs")
+    parser.add_argument("--save", metavar="PATH", help="write the results to a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown counted as a regression (default: 0.10)")
+    parser.add_argument("--scaling", action="store_true",
+                        help="only print the process-count scaling report")
+    parser.add_argument("--trace-overhead", action="store_true",
+                        help="only print the per-trace-level overhead report")
+    args = parser.parse_args(argv)
+
+    if args.scaling or args.trace_overhead:
+        if args.scaling:
+            print(f"{'Policy':<10} | {'Processes':>10} | {'Seconds':>8} | {'us/process':>10}")
+            print("-" * 47)
+            for row in bench_scaling():
+                print(
+                    f"{row['policy']:<10} | {row['processes']:>10} | "
+                    f"{row['seconds']:>8.3f} | {row['us_per_process']:>10.2f}"
+                )
+        if args.trace_overhead:
+            print(f"\n{'Trace level':<11} | {'Ticks':>8} | {'ns/tick':>8} | {'overhead':>8}")
+            print("-" * 45)
+            for row in bench_trace_levels():
+                print(
+                    f"{row['level']:<11} | {row['ticks']:>8} | "
+                    f"{row['ns_per_tick']:>8.0f} | {row['overhead_ns_per_tick']:>+8.0f}"
+                )
+        return 0
+
+    report = run_suite(
+        sizes=args.sizes,
+        latencies=args.latencies,
+        trace_levels=args.levels,
+        engines={name: ENGINES[name] for name in args.engines},
+        policies={name: POLICIES[name] for name in args.policies},
+        repeat=args.repeat,
+        memory=not args.no_memory,
+        progress=lambda name: print(f"running {name}", file=sys.stderr),
+    )
+    _print_suite(report)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        _print_comparison(rows, args.threshold)
+        exit_code = 1 if any(row["regression"] for row in rows) else 0
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""An on-disk cache of simulation results.
+
+Runs are keyed by a hash of everything that determines their output: the
+engine class and its settings (see ``BaseEngine.cache_key``), the policy
+class and its parameters (see ``SchedulerPolicy.cache_key``), the vance
+version, and a digest of the workload. Identical runs, e.g. from re-executed
+notebooks or CI jobs, are then read back instead of simulated again.
+
+Example:
+
+    from vance import EventEngine, RR
+    from vance.cache import ResultCache
+
+    cache = ResultCache(max_bytes=512 * 2**20, keep_trace=False)
+    res = cache.run(EventEngine(RR(time_quantum=4), dispatch_latency=1), processes)
+    res = cache.run(EventEngine(RR(time_quantum=4), dispatch_latency=1), processes)  # a hit
+    print(cache.hits, cache.misses)
+
+Entries are plain pickle files named after their key, so several processes
+can share one cache directory. When it grows beyond ``max_bytes`` the least
+recently used entries are deleted.
+"""
+from .types import Process
+from .policies import SchedulerPolicy
+from .switching import SwitchCostModel
+from .table import ProcessTable
+from array import array
+from enum import Enum
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Union
+import gc
+import hashlib
+import json
+import numbers
+import os
+import pickle
+import tempfile
+
+# Bumped whenever the stored format or the key layout changes
+CACHE_FORMAT = 2
+
+# What the digest of a workload covers, in sort order
+_FIELDS = attrgetter("arrival_time", "pid", "burst_time", "priority_time")
+
+# Output entries holding the trace, dropped when keep_trace is False
+TRACE_KEYS = ("structured_trace", "core_traces")
+
+
+class _Uncacheable(Exception):
+    """Raised while building a key for a run that must not be cached."""
+
+
+@lru_cache(maxsize=None)
+def _vance_version() -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # pragma: no cover - Python < 3.8
+        return "unknown"
+    try:
+        return version("vance")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _canonical(value):
+    """Turns a key into plain JSON values, refusing anything without a stable form."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, numbers.Integral):  # e.g. NumPy integers
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, Enum):
+        return _canonical(value.value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (SchedulerPolicy, SwitchCostModel)):
+        return _policy_key(value)
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    raise _Uncacheable(f"{type(value).__name__} has no stable cache key")
+
+
+def _policy_key(policy: Union[SchedulerPolicy, SwitchCostModel]) -> list:
+    key = policy.cache_key()
+    if key is None:
+        raise _Uncacheable(f"{type(policy).__name__} opted out of caching")
+    return [_canonical(type(policy)), _canonical(key)]
+
+
+def workload_digest(processes: Union[Iterable[Process], ProcessTable]) -> str:
+    """A digest of a workload that does not depend on the order of the list.
+
+    Args:
+      processes: The workload, as processes or a ``ProcessTable``.
+
+    Returns:
+      str: A hex digest of the processes in (arrival, PID) order, the
+      order every engine schedules them in.
+    """
+    if isinstance(processes, ProcessTable):
+        t = processes
+        rows = sorted(zip(t.arrival, t.pid, t.burst, t.priority))
+    else:
+        processes = list(processes)
+        rows = sorted(map(_FIELDS, processes))
+    values = array("q", chain.from_iterable(rows))
+    digest = hashlib.blake2b(values.tobytes(), digest_size=20)
+    if not isinstance(processes, ProcessTable):
+        # Only workloads with I/O, working sets or deadlines hash them, so other digests stay the same
+        extra = sorted(
+            (p.arrival_time, p.pid, repr(p.io), p.working_set) for p in processes if p.io or p.working_set
+        )
+        if extra:
+            digest.update(repr(extra).encode())
+        timed = sorted(
+            (p.arrival_time, p.pid, p.deadline, repr(p.task))
+            for p in processes
+            if p.deadline is not None or p.task is not None
+        )
+        if timed:
+            digest.update(repr(timed).encode())
+    return digest.hexdigest()
+
+
+def _without_trace(output):
+    """A copy of an engine output without the trace entries."""
+    output = output.copy()
+    for name in TRACE_KEYS:
+        output.pop(name, None)
+    return output
+
+
+def _load(f):
+    """Unpickles with the garbage collector paused.
+
+    Loading a trace creates hundreds of thousands of objects, which would
+    otherwise set off a collection pass every few hundred of them.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.load(f)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def default_cache_dir() -> str:
+    """``$VANCE_CACHE_DIR``, else ``vance`` in the user's cache directory."""
+    if os.environ.get("VANCE_CACHE_DIR"):
+        return os.environ["VANCE_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "vance")
+
+
+class ResultCache:
+    """Stores engine outputs on disk, keyed by what produced them.
+
+    Args:
+      directory: Where entries are kept. (Default value = None, see
+        ``default_cache_dir``)
+      max_bytes: Size limit of the directory; the least recently used
+        entries are evicted beyond it. (Default value = 1 GiB)
+      keep_trace: Store the structured trace along with the results.
+        (Default value = True)
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, os.PathLike]] = None,
+        max_bytes: int = 1 << 30,
+        keep_trace: bool = True,
+    ):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be positive.")
+        self.directory = os.fspath(directory) if directory is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.keep_trace = keep_trace
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0  # runs that could not be cached
+        self._total: Optional[int] = None  # bytes on disk, once scanned
+
+    def __getstate__(self):
+        # Sent to sweep workers: the counters and size estimate stay local
+        state = self.__dict__.copy()
+        state.update(hits=0, misses=0, skipped=0, _total=None)
+        return state
+
+    def key(self, engine, processes: List[Process], digest: Optional[str] = None) -> Optional[str]:
+        """The cache key of running ``processes`` on ``engine``.
+
+        Args:
+          engine: A BaseEngine with a ``policy``.
+          processes: List[Process]: The workload.
+          digest: Its ``workload_digest``, if already known. (Default value = None)
+
+        Returns:
+          str | None: A hex key, or None if the run must not be cached.
+        """
+        try:
+            payload = {
+                "format": CACHE_FORMAT,
+                "vance": _vance_version(),
+                "engine": _canonical(type(engine)),
+                "settings": _canonical(engine.cache_key()),
+                "policy": _policy_key(engine.policy),
+                "workload": digest if digest is not None else workload_digest(processes),
+                "trace": self.keep_trace,
+            }
+        except _Uncacheable:
+            return None
+        text = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".pkl")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """The stored output for ``key``, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                output = _load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError):
+            # A broken entry (e.g. from a crash) is just a miss
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return output
+
+    def put(self, key: str, output: Dict):
+        """Stores an engine output under ``key``, evicting old entries if needed."""
+        if not self.keep_trace:
+            output = _without_trace(output)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write aside and rename, so readers never see half an entry
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+        if self._total is not None:
+            self._total += size
+        if self._total is None or self._total > self.max_bytes:
+            self._evict()
+
+    def run(self, engine, processes: List[Process], digest: Optional[str] = None) -> Dict:
+        """``engine.run(processes)``, or its stored output if it ran before.
+
+        On a hit the engine itself is left untouched; only the returned
+        output is restored.
+
+        Args:
+          engine: A fresh engine.
+          processes: List[Process]: The workload.
+          digest: Its ``workload_digest``, if already known. (Default value = None)
+
+        Returns:
+          dict: The engine output.
+        """
+        key = self.key(engine, processes, digest)
+        if key is None:
+            self.skipped += 1
+            return engine.run(processes)
+        output = self.get(key)
+        if output is not None:
+            self.hits += 1
+            return output
+        self.misses += 1
+        output = engine.run(processes)
+        self.put(key, output)
+        if not self.keep_trace:
+            output = _without_trace(output)
+        return output
+
+    def _entries(self) -> List[os.DirEntry]:
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for bucket in os.scandir(self.directory):
+            if bucket.is_dir():
+                entries.extend(e for e in os.scandir(bucket.path) if e.name.endswith(".pkl"))
+        return entries
+
+    def _evict(self):
+        """Deletes least recently used entries until the cache fits ``max_bytes``."""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # evicted by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._total = total
+
+    @property
+    def size(self) -> int:
+        """Bytes currently used by the cache on disk."""
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def clear(self):
+        """Deletes every entry."""
+        for entry in self._entries():
+            self._remove(entry.path)
+        self._total = 0
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,7 +1,9 @@
-from typing import List, Dict, Union, Optional
+from typing import Iterator, List, Dict, Union, Optional
 from .types import Process, ProcessResult
 from .policies import SchedulerPolicy
+from .switching import SwitchCostModel
 from dataclasses import dataclass
+from enum import IntEnum
 from abc import ABC, abstractmethod
 
 class Clock:
@@ -19,16 +21,28 @@ class Clock:
         self._time += 1
         return self._time
 
+    def advance(self, ticks: int) -> int:
+        """Advance the system heartbeat by several units at once."""
+        self._time += ticks
+        return self._time
+
 
 class Dispatcher:
-    """Represents a dispatcher, for managing context switches of processes"""
+    """Represents a dispatcher, for managing context switches of processes
+
+    Args:
+      dispatch_latency: Fixed cost of every switch. (Default value = 0)
+      cost_model: Decides the cost of each switch instead (see
+        ``vance.switching``). (Default value = None, always the latency)
+    """
 
-    def __init__(self, dispatch_latency: int = 0):
+    def __init__(self, dispatch_latency: int = 0, cost_model: Optional[SwitchCostModel] = None):
 
         if dispatch_latency < 0:
             self.dispatch_latency = 0
         else:
             self.dispatch_latency = dispatch_latency
+        self.cost_model = cost_model
         self.current_switch_remaining = 0
         self.target_process_id: Optional[int] = None
 
@@ -37,19 +51,27 @@ class Dispatcher:
         """ """
         return self.current_switch_remaining > 0
 
-    def start_switch(self, process_id: int):
-        """Begin the overhead period for a new process.
+    def switch_cost(self, outgoing: Optional[Process], incoming: Optional[Process], remaining: int = 0) -> int:
+        """How long switching from ``outgoing`` to ``incoming`` takes.
 
         Args:
-          process_id: int:
-          process_id: int:
-          process_id: int: 
+          outgoing: Optional[Process]: The process leaving the CPU, if any.
+          incoming: Optional[Process]: The process switched in, None for idle.
+          remaining: int: What is left of the incoming CPU burst. (Default value = 0)
+        """
+        if self.cost_model is None:
+            return self.dispatch_latency
+        return max(self.cost_model.cost(outgoing, incoming, remaining, self.dispatch_latency), 0)
 
-        Returns:
+    def start_switch(self, process_id: int, cost: Optional[int] = None):
+        """Begin the overhead period for a new process.
 
+        Args:
+          process_id: int: The process switched in.
+          cost: Optional[int]: Length of the switch. (Default value = None, the latency)
         """
         self.target_process_id = process_id
-        self.current_switch_remaining = self.dispatch_latency
+        self.current_switch_remaining = self.dispatch_latency if cost is None else cost
 
     def tick(self):
         """Reduce the overhead timer by 1."""
@@ -61,6 +83,19 @@ class Dispatcher:
         else:
             self.current_switch_remaining -= 1
 
+    def advance(self, ticks: int):
+        """Reduce the overhead timer by several units at once.
+
+        Args:
+          ticks: int: Number of switch ticks to consume.
+        """
+        if ticks > self.current_switch_remaining:
+            raise ValueError(
+                "Cannot advance past the end of the context switch!"
+                "There must be a problem with your dispatcher logic."
+            )
+        self.current_switch_remaining -= ticks
+
 
 @dataclass
 class TraceEvent:
@@ -69,11 +104,170 @@ class TraceEvent:
     event_type: str  # "ARRIVAL", "SWITCH", "EXEC", "IDLE", "FINISHED"
     pid: int
 
+class TraceInterval:
+    """A run of consecutive ticks spent in the same CPU state.
+
+    Covers the ticks ``start <= t < end``.
+    """
+    __slots__ = ("start", "end", "event_type", "pid")
+
+    def __init__(self, start: int, end: int, event_type: str, pid: Optional[Union[int, str]]):
+        self.start = start
+        self.end = end
+        self.event_type = event_type
+        self.pid = pid
+
+    def __reduce__(self):
+        # A plain tuple pickles smaller and faster than the slot state
+        return TraceInterval, (self.start, self.end, self.event_type, self.pid)
+
+    def __repr__(self) -> str:
+        return f"TraceInterval(start={self.start}, end={self.end}, event_type={self.event_type!r}, pid={self.pid!r})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TraceInterval):
+            return NotImplemented
+        return (self.start, self.end, self.event_type, self.pid) == (
+            other.start, other.end, other.event_type, other.pid
+        )
+
+
+class StructuredTrace:
+    """Read-only, per-tick view over a run-length encoded trace.
+
+    Iterating it yields the same ``TraceEvent`` objects, in the same order,
+    as the old one-event-per-tick list: on every tick, the point events
+    (ARRIVAL, SWITCH_START, ...) come first, followed by the CPU state of
+    that tick. Events are only created while iterating.
+
+    The compact data stays available as ``intervals`` and ``points``.
+    """
+
+    def __init__(self, intervals: List[TraceInterval], points: List[TraceEvent]):
+        self.intervals = intervals
+        self.points = points
+        self._expanded: Optional[List[TraceEvent]] = None
+
+    def __iter__(self) -> Iterator[TraceEvent]:
+        points = self.points
+        i = 0
+        for run in self.intervals:
+            for time in range(run.start, run.end):
+                while i < len(points) and points[i].time <= time:
+                    yield points[i]
+                    i += 1
+                yield TraceEvent(time, run.event_type, run.pid)
+        yield from points[i:]
+
+    def __len__(self) -> int:
+        return len(self.points) + sum(run.end - run.start for run in self.intervals)
+
+    def __getitem__(self, index):
+        # Indexing needs the expanded list; build it once, on first use.
+        if self._expanded is None:
+            self._expanded = list(self)
+        return self._expanded[index]
+
+
+class TraceLevel(IntEnum):
+    """How much a ``Tracer`` keeps.
+
+    OFF: nothing at all; engines skip every tracing call.
+    SUMMARY: only per-event-type totals (see ``Tracer.get_summary``).
+    INTERVALS: the structured trace (intervals and point events), no text log.
+    FULL: everything, including the text log.
+    """
+    OFF = 0
+    SUMMARY = 1
+    INTERVALS = 2
+    FULL = 3
+
+
 class Tracer:
-    """ """
-    def __init__(self):
+    """Collects what happened during a simulation.
+
+    CPU states that last a whole tick (EXEC, SWITCH, IDLE) are run-length
+    encoded into ``TraceInterval`` records, so a job running for a million
+    ticks costs one record instead of a million. Everything else is kept as
+    a point ``TraceEvent`` in ``events``.
+
+    Log text is only formatted when ``get_log`` is called. Events recorded
+    without a message get the default one from ``MESSAGES``.
+
+    With a sink attached (see ``attach``), closed intervals and point events
+    are handed to the sink instead of being kept, so the trace can be larger
+    than memory.
+
+    Args:
+      level: TraceLevel | str: How much to keep. (Default value = TraceLevel.FULL)
+    """
+    SPAN_TYPES = frozenset(("EXEC", "SWITCH", "IDLE"))
+    MESSAGES = {
+        "ARRIVAL": "Process {pid} arrived.",
+        "SWITCH_START": "STARTING SWITCH to P{pid}",
+        "SWITCH": "Dispatcher busy...",
+        "IDLE": "CPU Idle.",
+        "BLOCK": "P{pid} blocked on I/O.",
+        "WAKE": "P{pid} finished its I/O.",
+    }
+
+    def __init__(self, level: Union[TraceLevel, str] = TraceLevel.FULL):
+        if isinstance(level, str):
+            level = TraceLevel[level.upper()]
+        self.level = TraceLevel(level)
         self.events: List[TraceEvent] = []
-        self._log: List[str] = []
+        self.intervals: List[TraceInterval] = []
+        self.summary: Dict[str, int] = {}
+        # [start, end, event_type, pid, msg]; formatted lazily by get_log()
+        self._log: List[list] = []
+        self.sink = None
+        # The level to go back to when the sink is detached
+        self._level_before_sink: Optional[TraceLevel] = None
+
+    def __getstate__(self):
+        # A sink (e.g. an open file) stays with the original tracer
+        state = self.__dict__.copy()
+        if self.sink is not None:
+            state["sink"] = None
+            state["level"] = self._level_before_sink
+            state["_level_before_sink"] = None
+        return state
+
+    def attach(self, sink):
+        """Streams the trace to ``sink`` from now on instead of keeping it.
+
+        The sink needs ``write_interval(interval)`` and ``write_event(event)``.
+        Tracing is set to the INTERVALS level (the text log is not streamed)
+        until ``detach``, which restores the previous level.
+
+        Args:
+          sink: The object receiving finished intervals and point events.
+        """
+        if self.sink is None:
+            self._level_before_sink = self.level
+        self.level = TraceLevel.INTERVALS
+        self.sink = sink
+
+    def detach(self):
+        """Hands everything still held in memory to the sink and detaches it.
+
+        The trace level goes back to what it was before ``attach``.
+
+        Returns:
+          The sink that was attached.
+        """
+        sink = self.sink
+        if sink is not None:
+            for event in self.events:
+                sink.write_event(event)
+            for interval in self.intervals:
+                sink.write_interval(interval)
+            self.events.clear()
+            self.intervals.clear()
+            self.sink = None
+            self.level = self._level_before_sink
+            self._level_before_sink = None
+        return sink
 
     def record(
         self,
@@ -85,33 +279,94 @@ class Tracer:
         """Records a structured event and a string message simultaneously.
 
         Args:
-          time: int:
-          event_type: str:
-          pid: Optional[Union[int:
-          str: Default value = None)
-          msg: str:  (Default value = "")
-          time: int:
-          event_type: str:
-          pid: Optional[Union[int:
-          str: Default value = None)
-          msg: str:  (Default value = "")
-          time: int: 
-          event_type: str: 
-          pid: Optional[Union[int: 
-          str]]:  (Default value = None)
-          msg: str:  (Default value = "")
+          time: int: The tick the event happened on.
+          event_type: str: "ARRIVAL", "SWITCH_START", "SWITCH", "EXEC", "IDLE", ...
+          pid: Optional[Union[int, str]]: (Default value = None)
+          msg: str: Overrides the default message of the event type. (Default value = "")
+        """
+        self.record_span(time, 1, event_type, pid, msg)
 
-        Returns:
+    def record_span(
+        self,
+        start: int,
+        duration: int,
+        event_type: str,
+        pid: Optional[Union[int, str]] = None,
+        msg: str = "",
+    ):
+        """Records the same event for every tick in ``[start, start + duration)``.
 
+        Args:
+          start: int: The first tick of the span.
+          duration: int: Number of consecutive ticks.
+          event_type: str: The event type repeated on every tick.
+          pid: Optional[Union[int, str]]: (Default value = None)
+          msg: str: Message logged on every tick (Default value = "")
         """
-        self.events.append(TraceEvent(time, event_type, pid))
-        if msg:
-            self._log.append(f"T={time}: {msg}")
+        level = self.level
+        if level == TraceLevel.OFF:
+            return
+        self.summary[event_type] = self.summary.get(event_type, 0) + duration
+        if level == TraceLevel.SUMMARY:
+            return
+
+        if event_type in self.SPAN_TYPES:
+            intervals = self.intervals
+            self._extend(intervals, start, duration, event_type, pid)
+            if self.sink is not None and len(intervals) > 1:
+                # Only the last interval can still grow
+                self.sink.write_interval(intervals.pop(0))
+        elif self.sink is not None:
+            for time in range(start, start + duration):
+                self.sink.write_event(TraceEvent(time, event_type, pid))
+        else:
+            self.events.extend(
+                TraceEvent(time, event_type, pid) for time in range(start, start + duration)
+            )
+
+        if level == TraceLevel.FULL and (msg or event_type in self.MESSAGES):
+            log = self._log
+            if log:
+                last = log[-1]
+                if last[1] == start and last[2] == event_type and last[3] == pid and last[4] == msg:
+                    last[1] += duration
+                    return
+            log.append([start, start + duration, event_type, pid, msg])
+
+    @staticmethod
+    def _extend(intervals: List[TraceInterval], start: int, duration: int, event_type: str, pid):
+        """Grows the last interval if this continues it, else opens a new one."""
+        if intervals:
+            last = intervals[-1]
+            if last.end == start and last.event_type == event_type and last.pid == pid:
+                last.end += duration
+                return
+        intervals.append(TraceInterval(start, start + duration, event_type, pid))
 
     def get_log(self) -> List[str]:
-        """ """
-        return self._log
+        """Formats the text log, one line per logged tick."""
+        lines = []
+        for start, end, event_type, pid, msg in self._log:
+            text = msg or self.MESSAGES[event_type].format(pid=pid)
+            lines.extend(f"T={time}: {text}" for time in range(start, end))
+        return lines
 
-    def get_structured_data(self) -> List[TraceEvent]:
-        """ """
-        return self.events
\ No newline at end of file
+    def get_summary(self) -> Dict[str, int]:
+        """Returns how many ticks (or occurrences) were recorded per event type."""
+        return dict(self.summary)
+
+    def get_intervals(self) -> List[TraceInterval]:
+        """Returns the run-length encoded CPU timeline."""
+        return self.intervals
+
+    def get_structured_data(self) -> StructuredTrace:
+        """Returns the trace so far as a per-tick ``TraceEvent`` sequence.
+
+        It holds copies of the lists (and of the last interval, the only one
+        that can still grow), so it stays as it is if the run goes on.
+        """
+        intervals = self.intervals[:]
+        if intervals:
+            last = intervals[-1]
+            intervals[-1] = TraceInterval(last.start, last.end, last.event_type, last.pid)
+        return StructuredTrace(intervals, self.events[:])
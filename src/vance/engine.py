@@ -1,161 +1,631 @@
-from .types import Process
-from .policies import SchedulerPolicy
-from typing import List, Dict, Optional
 from .types import Process, ProcessResult
-from .policies import SchedulerPolicy
+from .policies import SchedulerPolicy, policy_hook
+from typing import Iterable, Iterator, List, Dict, Optional, Sequence, Union
 from abc import ABC, abstractmethod
-from .core import Clock, Tracer, Dispatcher
+from dataclasses import dataclass
+from .core import Clock, Tracer, TraceLevel, TraceInterval, Dispatcher
+from .stats import LatencyStats
+from .instrument import EngineHook, Probe
+from .table import ProcessTable, ResultTable, TableArrivals
+from .result import SimulationResult, summarize
+from .io import IODevice, IOSystem
+from .switching import SwitchCostModel
+from .realtime import DeadlineStats
+import gc
+import pickle
+import zlib
+
+
+class _RunState:
+    """Where a run stands, besides the engine's clock, dispatcher and totals.
+
+    Kept between ``advance`` calls, so a run can be paused and picked up
+    again, snapshotted or handed to another policy.
+    """
+
+    def __init__(
+        self, policy: SchedulerPolicy, arrivals: Iterable[Process], remaining_times: Dict[int, int]
+    ):
+        self.remaining_times = remaining_times
+        # The policy decides what the ready queue looks like (list, heap, ...)
+        self.ready_queue = policy.create_ready_queue(remaining_times)
+        self.current_process: Optional[Process] = None
+        self.next_process: Optional[Process] = None
+        self.current_job_runtime = 0
+        # The process that had the CPU when the policy was switched; it keeps
+        # it without a context switch if the new policy picks it first
+        self.carried: Optional[Process] = None
+        self.total_burst = 0
+        # Devices and blocked processes, for runs with I/O (see vance.io)
+        self.io: Optional[IOSystem] = None
+        self.set_pending(arrivals)
+
+    def set_pending(self, arrivals: Iterable[Process]):
+        """Replaces the processes yet to arrive."""
+        self.arrivals = iter(arrivals)
+        self.upcoming: Optional[Process] = next(self.arrivals, None)
+
+    def pending(self) -> List[Process]:
+        """The processes yet to arrive, in order."""
+        rest = list(self.arrivals)
+        if self.upcoming is not None:
+            rest.insert(0, self.upcoming)
+        self.set_pending(rest)
+        return rest
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if not isinstance(self.arrivals, TableArrivals):
+            # Iterators do not pickle (and would drag the consumed part along)
+            del state["upcoming"]
+            state["arrivals"] = self.pending()
+        return state
+
+    def __setstate__(self, state):
+        arrivals = state.pop("arrivals")
+        self.__dict__.update(state)
+        if "upcoming" in state:
+            self.arrivals = arrivals
+        else:
+            self.set_pending(arrivals)
+
+
+@dataclass(frozen=True)
+class EngineSnapshot:
+    """A paused simulation, frozen as bytes.
+
+    It holds everything the engine needs to carry on: the clock, dispatcher,
+    ready queue, remaining times, the process on the CPU, the results and
+    totals so far, the trace, and the policy with its internal state. Being
+    plain bytes, it can be pickled, written to disk or sent to another
+    worker process, and ``fork`` turns it back into an engine as often as
+    needed.
+
+    Attributes:
+      time: The simulation time it was taken at.
+      data: The pickled engine state.
+      compressed: Whether ``data`` is zlib-compressed.
+    """
+
+    time: int
+    data: bytes
+    compressed: bool = False
+
+    @property
+    def size(self) -> int:
+        """Size of the snapshot in bytes."""
+        return len(self.data)
+
+    def _load(self):
+        data = zlib.decompress(self.data) if self.compressed else self.data
+        # Paused GC: unpickling creates many objects at once, and collection
+        # passes would otherwise dominate the time a fork takes
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.loads(data)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def fork(self, policy: Optional[SchedulerPolicy] = None) -> "BaseEngine":
+        """Builds a new engine that continues from this snapshot.
+
+        Args:
+          policy: Carry on with this policy instead (see
+            ``BaseEngine.switch_policy``). (Default value = None, the same one)
+
+        Returns:
+          BaseEngine: An independent engine; call ``advance`` to go on.
+        """
+        cls, state = self._load()
+        engine = cls.__new__(cls)
+        engine.__dict__.update(state)
+        if policy is not None:
+            engine.switch_policy(policy)
+        return engine
+
 
 class BaseEngine(ABC):
     """
     The base engine for creating custom engines of various needs for CPU scheduling. 
+
+    ``trace_level`` controls how much the tracer keeps (see ``TraceLevel``).
+    Use ``TraceLevel.OFF`` when only the results and averages are needed.
+
+    Percentiles of the waiting, turnaround and first-response times are
+    collected in ``latency_stats`` (see ``vance.stats``); they are exact
+    unless it is replaced with ``LatencyStats(exact=False)`` before the run.
+
+    Processes with I/O bursts block on the engine's ``devices`` between
+    CPU bursts (see ``vance.io``); without ``devices`` there is one FCFS
+    device. Every context switch costs ``dispatch_latency`` ticks, unless a
+    ``switch_cost`` model prices each one (see ``vance.switching``).
+    Processes with a ``deadline`` are summed up in ``deadline_stats`` and
+    the output's ``deadlines`` (see ``vance.realtime``).
+
+    Besides lists of ``Process``, engines accept a ``ProcessTable`` (see
+    ``vance.table``); ``BasicEngine`` and ``EventEngine`` then only create a
+    ``Process`` object when it arrives, and keep nothing per process but a
+    row of ``results`` once it completes.
+
+    Engines that support pausing (``BasicEngine``, ``EventEngine``) can also
+    run step by step: ``start`` loads the processes, ``advance(until=t)``
+    simulates up to time ``t``, and ``result`` gives the usual output. In
+    between, ``snapshot`` freezes the whole state so that any number of
+    what-if branches can be forked from it without replaying the prefix.
     """
-    def __init__(self, dispatch_latency: int = 0):
+    def __init__(
+        self,
+        dispatch_latency: int = 0,
+        trace_level: Union[TraceLevel, str] = TraceLevel.FULL,
+        devices: Optional[Sequence[IODevice]] = None,
+        switch_cost: Optional[SwitchCostModel] = None,
+    ):
         self.clock = Clock()
-        self.tracer = Tracer()
-        self.dispatcher = Dispatcher(dispatch_latency=dispatch_latency)
-        self.results: List[ProcessResult] = []
+        self.devices: Optional[List[IODevice]] = list(devices) if devices is not None else None
+        self.tracer = Tracer(level=trace_level)
+        self.dispatcher = Dispatcher(dispatch_latency=dispatch_latency, cost_model=switch_cost)
+        # Completed processes, stored column-wise (see vance.table)
+        self.results = ResultTable()
         self.total_idle_time = 0
         self.total_switch_time = 0
+        self.latency_stats = LatencyStats(exact=True)
+        # Created by the first completed process with a deadline
+        self.deadline_stats: Optional[DeadlineStats] = None
+        # PID -> time it first got the CPU, until it completes
+        self._first_run: Dict[int, int] = {}
+        self._state: Optional[_RunState] = None
+        # Instrumentation (see vance.instrument); none by default
+        self.hooks: List[EngineHook] = []
 
     @abstractmethod
-    def run(self, processes: List[Process]) -> Dict:
+    def run(self, processes: List[Process]) -> SimulationResult:
         """The core execution loop. Must be implemented by subclasses."""
         pass
 
-    def _record_completion(self, process: Process, finish_time: int) -> None:
-        """ Calculates turnaround and wait time, and saves it in self.results """
-        turnaround = finish_time - process.arrival_time
-        wait = turnaround - process.burst_time
-        self.results.append(ProcessResult(process, wait, turnaround, finish_time))
+    def start(self, processes: Union[List[Process], ProcessTable]):
+        """Loads the processes of a run without simulating anything yet.
 
-    def _get_output(self, total_burst: int) -> Dict:
-        total_time = self.clock.time
-        n_results = len(self.results)
-        
-        # Guard against zero-division if results are empty
-        if not self.results:
-            avg_wait = 0
-            avg_tat = 0
+        Args:
+          processes: The processes to schedule, as a list or a ``ProcessTable``.
+        """
+        if isinstance(processes, ProcessTable):
+            arrivals = processes.arrivals()
+            total_burst = sum(processes.burst)
+            with_io = []
         else:
-            avg_wait = sum(r.waiting_time for r in self.results) / n_results
-            avg_tat = sum(r.turnaround_time for r in self.results) / n_results
+            arrivals = sorted(processes, key=lambda p: (p.arrival_time, p.pid))
+            total_burst = sum(p.cpu_time for p in arrivals)
+            with_io = [p for p in arrivals if p.io]
+        # Filled in as processes arrive, emptied as they complete
+        self._state = _RunState(self.policy, arrivals, {})
+        self._state.total_burst = total_burst
+        self._prepare_io(with_io)
+        if self.dispatcher.cost_model is not None:
+            self.dispatcher.cost_model.reset()
 
+    def _prepare_io(self, processes: List[Process]):
+        """Sets up the devices if the run needs them and checks the processes' I/O."""
+        state = self._state
+        if state.io is None and (processes or self.devices is not None):
+            devices = self.devices if self.devices is not None else [IODevice()]
+            state.io = IOSystem(devices)
+        for process in processes:
+            state.io.validate(process)
 
-        if total_time > 0:
-            utilization = (total_burst / total_time) * 100
-        else:
-            utilization = 0
+    def advance(self, until: Optional[int] = None) -> bool:
+        """Simulates until the clock reaches ``until`` or everything is done.
 
-        if (total_burst + self.total_switch_time) > 0:
-            efficiency = (total_burst / (total_burst + self.total_switch_time)) * 100
-        else:
-            efficiency = 0
+        Pausing and resuming gives exactly the same results as running in
+        one go.
+
+        Args:
+          until: Optional[int]: Time to stop at. (Default value = None, the end)
+
+        Returns:
+          bool: Whether the run is finished.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot be run step by step.")
+
+    @property
+    def finished(self) -> bool:
+        """Whether the started run has nothing left to do."""
+        state = self._state
+        return state is not None and not (
+            state.upcoming is not None
+            or state.ready_queue
+            or state.current_process
+            or self.dispatcher.is_currently_switching
+            or (state.io is not None and state.io.busy)
+        )
+
+    def result(self) -> SimulationResult:
+        """The output of the run so far, in the same shape as ``run`` returns."""
+        return self._get_output(self._require_state().total_burst)
 
-        if total_time > 0:
-            throughput = n_results / total_time
+    def add_processes(self, processes: Iterable[Process]):
+        """Adds processes to a started run, e.g. a burst of jobs arriving now.
+
+        Args:
+          processes: Iterable[Process]: New processes, arriving no earlier
+            than the current time, with PIDs not used yet.
+        """
+        state = self._require_state()
+        processes = list(processes)
+        pending = state.pending()
+        in_use = set(state.remaining_times)
+        in_use.update(p.pid for p in pending)
+        for process in processes:
+            if process.arrival_time < self.clock.time:
+                raise ValueError(
+                    f"P{process.pid} arrives at {process.arrival_time}, before the current time {self.clock.time}."
+                )
+            if process.pid in in_use:
+                raise ValueError(f"PID {process.pid} is already in use.")
+            in_use.add(process.pid)
+            state.total_burst += process.cpu_time
+        self._prepare_io([p for p in processes if p.io])
+        state.set_pending(sorted(pending + processes, key=lambda p: (p.arrival_time, p.pid)))
+
+    def switch_policy(self, policy: SchedulerPolicy):
+        """Hands the rest of the started run to another policy.
+
+        The waiting processes move to the new policy's ready queue (in the
+        order the old queue iterates them), followed by the process on the
+        CPU or the one being switched in. If the new policy picks that one
+        first, it keeps the CPU without another context switch.
+
+        Args:
+          policy: SchedulerPolicy: The policy to continue with.
+        """
+        state = self._require_state()
+        waiting = list(state.ready_queue)
+        if self.dispatcher.is_currently_switching:
+            # The switch finishes into an idle CPU; the new policy decides
+            carried = state.next_process
+            state.next_process = None
         else:
-            throughput = 0
-
-        return {
-            "individual_results": [
-                {
-                    "pid": r.process.pid,
-                    "arrival": r.process.arrival_time,
-                    "burst": r.process.burst_time,
-                    "wait": r.waiting_time,
-                    "turnaround": r.turnaround_time,
-                    "completion": r.completion_time,
-                }
-                for r in self.results
-            ],
-            "averages": {
-                "avg_waiting_time": round(avg_wait, 2),
-                "avg_turnaround_time": round(avg_tat, 2),
-                "cpu_utilization": f"{utilization:.1f}%",
-                "hardware_efficiency": f"{efficiency:.1f}%",
-            },
-            "structured_trace": self.tracer.get_structured_data(),
-            "total_time": total_time,
-            "throughput": throughput
+            carried = state.current_process
+        state.current_process = None
+        state.current_job_runtime = 0
+        queue = policy.create_ready_queue(state.remaining_times)
+        for process in waiting:
+            queue.append(process)
+        if carried is not None:
+            queue.append(carried)
+        state.ready_queue = queue
+        state.carried = carried
+        self.policy = policy
+
+    def snapshot(self, trace: bool = True, compress: bool = False) -> EngineSnapshot:
+        """Freezes the complete state of the engine.
+
+        Args:
+          trace: bool: Include the trace so far. Without it, forks only trace
+            what happens after the snapshot, which keeps it small.
+            (Default value = True)
+          compress: bool: zlib-compress the snapshot. (Default value = False)
+
+        Returns:
+          EngineSnapshot: Restore it with ``restore`` or branch off with ``fork``.
+        """
+        state = self.__dict__.copy()
+        state["hooks"] = []  # forks start without instrumentation
+        if not trace:
+            state["tracer"] = Tracer(level=self.tracer.level)
+        data = pickle.dumps((type(self), state), protocol=pickle.HIGHEST_PROTOCOL)
+        if compress:
+            data = zlib.compress(data, 1)
+        return EngineSnapshot(self.clock.time, data, compress)
+
+    def restore(self, snapshot: EngineSnapshot):
+        """Puts the engine back into the state of ``snapshot``.
+
+        Args:
+          snapshot: EngineSnapshot: Taken from an engine of the same type.
+        """
+        cls, state = snapshot._load()
+        if cls is not type(self):
+            raise ValueError(f"Cannot restore a {cls.__name__} snapshot into a {type(self).__name__}.")
+        self.__dict__.clear()
+        self.__dict__.update(state)
+
+    def fork(self, policy: Optional[SchedulerPolicy] = None) -> "BaseEngine":
+        """An independent copy of this engine, to explore a what-if branch.
+
+        Args:
+          policy: Optional[SchedulerPolicy]: Continue the copy with this
+            policy instead. (Default value = None, the same one)
+        """
+        return self.snapshot().fork(policy)
+
+    def add_hook(self, hook: EngineHook):
+        """Registers an instrumentation hook (see ``vance.instrument``).
+
+        Args:
+          hook: EngineHook: Gets called from the engine loop from the next
+            ``run`` or ``advance`` on.
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: EngineHook):
+        """Unregisters a hook added with ``add_hook``."""
+        self.hooks.remove(hook)
+
+    def cache_key(self) -> Dict:
+        """The engine settings that shape its output, for the result cache."""
+        key = {
+            "dispatch_latency": self.dispatcher.dispatch_latency,
+            "trace_level": int(self.tracer.level),
+            "exact_percentiles": self.latency_stats.exact,
+            "sketch_k": self.latency_stats.k,
         }
+        if self.devices is not None:
+            key["devices"] = [[d.name, d.discipline] for d in self.devices]
+        model = self.dispatcher.cost_model
+        if model is not None:
+            key["switch_cost"] = model
+        return key
+
+    def _require_state(self) -> _RunState:
+        if self._state is None:
+            raise ValueError("No run has been started; call start() first.")
+        return self._state
+
+    def _record_dispatch(self, process: Optional[Process], time: int):
+        """Notes when a process first gets the CPU, for its response time."""
+        if process is None:
+            return
+        if process.pid not in self._first_run:
+            self._first_run[process.pid] = time
+        state = self._state
+        if state is not None and state.io is not None:
+            state.io.dispatched(process.pid, time)
+
+    def _note_latencies(
+        self, process: Process, finish_time: int, first_run: Optional[int] = None, blocked: int = 0
+    ) -> Optional[int]:
+        """Feeds ``latency_stats`` with a completed process.
+
+        Args:
+          process: The process that completed.
+          finish_time: Its completion time.
+          first_run: When it first got the CPU. (Default value = None, as
+            noted by ``_record_dispatch``)
+          blocked: Time it spent blocked on I/O. (Default value = 0)
+
+        Returns:
+          int | None: When it first got the CPU.
+        """
+        turnaround = finish_time - process.arrival_time
+        if first_run is None:
+            first_run = self._first_run.pop(process.pid, None)
+        response = first_run - process.arrival_time if first_run is not None else None
+        self.latency_stats.record(turnaround - process.cpu_time - blocked, turnaround, response)
+        if process.deadline is not None:
+            if self.deadline_stats is None:
+                self.deadline_stats = DeadlineStats(exact=self.latency_stats.exact)
+            self.deadline_stats.record(process, finish_time)
+        return first_run
+
+    def _blocked_time(self, process: Process) -> int:
+        """How long a completing process spent blocked on I/O."""
+        state = self._state
+        if not process.io or state is None or state.io is None:
+            return 0
+        return state.io.blocked.pop(process.pid, 0)
+
+    def _make_result(
+        self, process: Process, finish_time: int, first_run: Optional[int] = None
+    ) -> ProcessResult:
+        """Computes the metrics of a completed process and feeds ``latency_stats``."""
+        blocked = self._blocked_time(process)
+        first_run = self._note_latencies(process, finish_time, first_run, blocked)
+        turnaround = finish_time - process.arrival_time
+        response = first_run - process.arrival_time if first_run is not None else None
+        return ProcessResult(
+            process, turnaround - process.cpu_time - blocked, turnaround, finish_time, response
+        )
+
+    def _record_completion(
+        self, process: Process, finish_time: int, first_run: Optional[int] = None
+    ) -> None:
+        """Adds a row for a finished process to ``self.results``.
+
+        Its turnaround and waiting time are derived from the table's columns
+        when asked for. Only the ``StreamingEngine``, which keeps no table,
+        builds and returns the ``ProcessResult``.
+        """
+        blocked = self._blocked_time(process)
+        first_run = self._note_latencies(process, finish_time, first_run, blocked)
+        self.results.record(process, finish_time, first_run, blocked)
+
+    def _get_output(self, total_burst: int, cores: int = 1) -> SimulationResult:
+        """The output of the run so far (see ``vance.result``)."""
+        stats = self.latency_stats
+        io = self._state.io if self._state is not None else None
+        result = SimulationResult(
+            # A copy, so the result stays as it is if the run goes on
+            self.results.copy(),
+            self.clock.time,
+            total_burst,
+            self.total_switch_time,
+            cores,
+            trace=self.tracer.get_structured_data(),
+            # Exact percentiles are computed from the table when asked for
+            percentiles=None if stats.exact else stats.summary(),
+            io=io.summary(self.clock.time) if io is not None else None,
+        )
+        if self.deadline_stats is not None:
+            result["deadlines"] = self.deadline_stats.summary()
+        result.update(self._policy_report())
+        return result
+
+    def _policy_report(self) -> Dict:
+        """The policy's own entries for the output (see ``SchedulerPolicy.report``)."""
+        return self.policy.report()
+
+    def _summarize(
+        self,
+        n_results: int,
+        total_wait: int,
+        total_tat: int,
+        total_burst: int,
+        total_time: int,
+        cores: int = 1,
+    ):
+        """Computes the averages block and the throughput from run totals."""
+        return summarize(
+            n_results, total_wait, total_tat, total_burst, total_time, self.total_switch_time, cores
+        )
 
 class BasicEngine(BaseEngine):
     """
     A single-queue simulation engine suitable for basic 
     algorithms like FCFS, SJF, RR, and standard Priority Scheduling.
     """
-    def __init__(self, policy: SchedulerPolicy, dispatch_latency: int = 0):
+    def __init__(
+        self,
+        policy: SchedulerPolicy,
+        dispatch_latency: int = 0,
+        trace_level: Union[TraceLevel, str] = TraceLevel.FULL,
+        devices: Optional[Sequence[IODevice]] = None,
+        switch_cost: Optional[SwitchCostModel] = None,
+    ):
         # Call the BaseEngine constructor to setup Clock, Tracer, etc.
-        super().__init__(dispatch_latency=dispatch_latency)
+        super().__init__(
+            dispatch_latency=dispatch_latency, trace_level=trace_level, devices=devices, switch_cost=switch_cost
+        )
         self.policy = policy
 
-    def run(self, processes: list[Process]) -> dict:        
-        incoming = sorted(processes, key=lambda p: (p.arrival_time, p.pid))
-        ready_queue: list[Process] = []
-        remaining_times = {p.pid: p.burst_time for p in incoming}
+    def run(self, processes: list[Process]) -> SimulationResult:
+        self.start(processes)
+        self.advance()
+        return self.result()
+
+    def advance(self, until: Optional[int] = None) -> bool:
+        state = self._require_state()
+        arrivals = state.arrivals
+        upcoming = state.upcoming
+        remaining_times = state.remaining_times
+        ready_queue = state.ready_queue
+        io = state.io
         
-        current_job_runtime = 0
-        next_process: Optional[Process] = None
-        current_process: Optional[Process] = None
+        # Checked before every tracer call so that OFF costs nothing per tick
+        tracing = self.tracer.level > TraceLevel.OFF
+        # Notifications, None unless the policy overrides them
+        on_clock = policy_hook(self.policy, "on_clock")
+        on_finish = policy_hook(self.policy, "on_finish")
+        on_block = policy_hook(self.policy, "on_block")
+
+        # The loop calls these through locals, so hooks can wrap them
+        get_next_process = self.policy.get_next_process
+        admit = ready_queue.append
+        record = self.tracer.record
+        start_switch = self.dispatcher.start_switch
+        latency = self.dispatcher.dispatch_latency
+        switch_cost = self.dispatcher.switch_cost if self.dispatcher.cost_model is not None else None
+        dispatcher_tick = self.dispatcher.tick
+        probe = Probe(self, self.hooks) if self.hooks else None
+        if probe is not None:
+            get_next_process = probe.decision(get_next_process)
+            admit = probe.phase("arrivals", admit)
+            record = probe.phase("tracing", record)
+            start_switch = probe.phase("dispatcher", start_switch)
+            dispatcher_tick = probe.phase("dispatcher", dispatcher_tick)
+            probe.start()
+
+        current_job_runtime = state.current_job_runtime
+        next_process = state.next_process
+        current_process = state.current_process
+        carried = state.carried
 
         while (
-            incoming
+            upcoming is not None
             or ready_queue
             or current_process
             or self.dispatcher.is_currently_switching
-        ):
+            or (io is not None and io.pending)
+        ) and (until is None or self.clock.time < until):
             # 1. Handle Arrivals (At the start of the tick)
-            while incoming and incoming[0].arrival_time <= self.clock.time:
-                new_proc = incoming.pop(0)
-                ready_queue.append(new_proc)
-                self.tracer.record(
-                    self.clock.time,
-                    "ARRIVAL",
-                    new_proc.pid,
-                    f"Process {new_proc.pid} arrived.",
-                )
+            while upcoming is not None and upcoming.arrival_time <= self.clock.time:
+                new_proc = upcoming
+                upcoming = next(arrivals, None)
+                remaining_times[new_proc.pid] = new_proc.burst_time
+                if io is not None:
+                    io.ready(new_proc.pid, self.clock.time)
+                admit(new_proc)
+                if tracing:
+                    record(self.clock.time, "ARRIVAL", new_proc.pid)
+            # Processes whose I/O is done rejoin the ready queue
+            if io is not None and io.next_wake is not None and io.next_wake <= self.clock.time:
+                for woken, cpu_burst in io.wake(self.clock.time):
+                    remaining_times[woken.pid] = cpu_burst
+                    admit(woken)
+                    if tracing:
+                        record(self.clock.time, "WAKE", woken.pid)
 
             # 2. Decision Logic
             # We check if we need to switch even if current_process just finished
             if not self.dispatcher.is_currently_switching:
-                potential_next = self.policy.get_next_process(
+                if on_clock:
+                    on_clock(self.clock.time)
+                potential_next = get_next_process(
                     ready_queue, current_process, current_job_runtime, remaining_times
                 )
+                if carried is not None:
+                    # First decision since switch_policy
+                    if potential_next is carried:
+                        current_process = carried
+                    carried = None
 
                 if potential_next != current_process:
-                    if self.dispatcher.dispatch_latency > 0:
-                        self.dispatcher.start_switch(
-                            potential_next.pid if potential_next else None
+                    if switch_cost is None:
+                        cost = latency
+                    else:
+                        cost = switch_cost(
+                            current_process,
+                            potential_next,
+                            remaining_times[potential_next.pid] if potential_next else 0,
+                        )
+                    if cost > 0:
+                        start_switch(
+                            potential_next.pid if potential_next else None, cost
                         )
                         next_process = potential_next
                         # Note: We don't clear current_process yet; it's being swapped out
-                        self.tracer.record(
-                            self.clock.time,
-                            "SWITCH_START",
-                            next_process.pid if next_process else "Idle",
-                            f"STARTING SWITCH to P{next_process.pid if next_process else 'Idle'}",
-                        )
+                        if tracing:
+                            record(
+                                self.clock.time,
+                                "SWITCH_START",
+                                next_process.pid if next_process else "Idle",
+                            )
                     else:
                         current_process = potential_next
                         current_job_runtime = 0
+                        self._record_dispatch(current_process, self.clock.time)
 
             # 3. Execution Phase
+            if io is not None:
+                io.account(1, not self.dispatcher.is_currently_switching and current_process is not None)
             if self.dispatcher.is_currently_switching:
                 self.total_switch_time += 1
-                self.tracer.record(
-                    self.clock.time,
-                    "SWITCH",
-                    next_process.pid if next_process else "Idle",
-                    "Dispatcher busy...",
-                )
-                self.dispatcher.tick()
+                if tracing:
+                    record(
+                        self.clock.time,
+                        "SWITCH",
+                        next_process.pid if next_process else "Idle",
+                    )
+                dispatcher_tick()
                 if not self.dispatcher.is_currently_switching:
                     current_process = next_process
                     current_job_runtime = 0
+                    self._record_dispatch(current_process, self.clock.time + 1)
 
             elif current_process:
-                self.tracer.record(self.clock.time, "EXEC", current_process.pid)
+                if tracing:
+                    record(self.clock.time, "EXEC", current_process.pid)
                 # Actual work happens here
                 remaining_times[current_process.pid] -= 1
                 current_job_runtime += 1
@@ -164,13 +634,376 @@ class BasicEngine(BaseEngine):
                 if remaining_times[current_process.pid] == 0:
                     # Clock advances at the end of the loop,
                     # so completion is current_time + 1
-                    self._record_completion(current_process, self.clock.time + 1)
+                    if io is not None and io.block(current_process, self.clock.time + 1):
+                        if on_block:
+                            on_block(current_process, current_job_runtime, self.clock.time + 1)
+                        if tracing:
+                            record(self.clock.time + 1, "BLOCK", current_process.pid)
+                    else:
+                        self._record_completion(current_process, self.clock.time + 1)
+                        if on_finish:
+                            on_finish(current_process, self.clock.time + 1)
+                        del remaining_times[current_process.pid]
                     current_process = None
                     current_job_runtime = 0
             else:
                 self.total_idle_time += 1
-                self.tracer.record(self.clock.time, "IDLE", msg="CPU Idle.")
+                if tracing:
+                    record(self.clock.time, "IDLE")
 
             self.clock.tick()
 
-        return self._get_output(sum(p.burst_time for p in processes))
\ No newline at end of file
+        state.upcoming = upcoming
+        state.current_process = current_process
+        state.next_process = next_process
+        state.current_job_runtime = current_job_runtime
+        state.carried = carried
+        if probe is not None:
+            probe.stop(self.finished)
+        return self.finished
+
+class EventEngine(BaseEngine):
+    """
+    A discrete-event version of the BasicEngine.
+
+    Instead of consulting the policy on every tick, it jumps straight to the
+    next interesting time: the next arrival, the completion of the current
+    job, the end of a context switch, or the next point where the policy says
+    it might preempt (see ``SchedulerPolicy.preemption_horizon``). The output
+    is identical to the BasicEngine, but long bursts cost a single step.
+    """
+    def __init__(
+        self,
+        policy: SchedulerPolicy,
+        dispatch_latency: int = 0,
+        trace_level: Union[TraceLevel, str] = TraceLevel.FULL,
+        devices: Optional[Sequence[IODevice]] = None,
+        switch_cost: Optional[SwitchCostModel] = None,
+    ):
+        super().__init__(
+            dispatch_latency=dispatch_latency, trace_level=trace_level, devices=devices, switch_cost=switch_cost
+        )
+        self.policy = policy
+
+    def run(self, processes: list[Process]) -> SimulationResult:
+        self.start(processes)
+        self.advance()
+        return self.result()
+
+    def advance(self, until: Optional[int] = None) -> bool:
+        for _ in self._simulate(self._require_state(), until):
+            pass
+        return self.finished
+
+    def _simulate(
+        self,
+        state: _RunState,
+        until: Optional[int] = None,
+    ) -> Iterator[Optional[ProcessResult]]:
+        """The event loop, as a generator that yields after every step.
+
+        Args:
+          state: Where the run stands; updated when the loop stops.
+          until: Stop once the clock gets here. (Default value = None, at the end)
+
+        Yields:
+          ProcessResult | None: What ``_record_completion`` returned for the
+          process that completed in this step, if any.
+        """
+        arrivals = state.arrivals
+        upcoming = state.upcoming
+        remaining_times = state.remaining_times
+        ready_queue = state.ready_queue
+        io = state.io
+
+        # Checked before every tracer call so that OFF costs nothing per tick
+        tracing = self.tracer.level > TraceLevel.OFF
+        # Notifications, None unless the policy overrides them
+        on_clock = policy_hook(self.policy, "on_clock")
+        on_finish = policy_hook(self.policy, "on_finish")
+        on_block = policy_hook(self.policy, "on_block")
+
+        # The loop calls these through locals, so hooks can wrap them
+        get_next_process = self.policy.get_next_process
+        admit = ready_queue.append
+        record = self.tracer.record
+        start_switch = self.dispatcher.start_switch
+        latency = self.dispatcher.dispatch_latency
+        switch_cost = self.dispatcher.switch_cost if self.dispatcher.cost_model is not None else None
+        record_span = self.tracer.record_span
+        preemption_horizon = self.policy.preemption_horizon
+        dispatcher_advance = self.dispatcher.advance
+        probe = Probe(self, self.hooks) if self.hooks else None
+        if probe is not None:
+            get_next_process = probe.decision(get_next_process)
+            preemption_horizon = probe.phase("decision", preemption_horizon)
+            admit = probe.phase("arrivals", admit)
+            record = probe.phase("tracing", record)
+            record_span = probe.phase("tracing", record_span)
+            start_switch = probe.phase("dispatcher", start_switch)
+            dispatcher_advance = probe.phase("dispatcher", dispatcher_advance)
+            probe.start()
+
+        current_job_runtime = state.current_job_runtime
+        next_process = state.next_process
+        current_process = state.current_process
+        carried = state.carried
+
+        while (
+            upcoming is not None
+            or ready_queue
+            or current_process
+            or self.dispatcher.is_currently_switching
+            or (io is not None and io.pending)
+        ) and (until is None or self.clock.time < until):
+            finished = None
+            # 1. Handle Arrivals (At the start of the step)
+            while upcoming is not None and upcoming.arrival_time <= self.clock.time:
+                new_proc = upcoming
+                upcoming = next(arrivals, None)
+                if upcoming is not None and upcoming.arrival_time < new_proc.arrival_time:
+                    raise ValueError("Processes must be given in order of arrival time.")
+                remaining_times[new_proc.pid] = new_proc.burst_time
+                if io is not None:
+                    io.ready(new_proc.pid, self.clock.time)
+                elif new_proc.io:
+                    raise ValueError(f"P{new_proc.pid} has I/O bursts, but the engine has no devices.")
+                admit(new_proc)
+                if tracing:
+                    record(self.clock.time, "ARRIVAL", new_proc.pid)
+            # Processes whose I/O is done rejoin the ready queue
+            if io is not None and io.next_wake is not None and io.next_wake <= self.clock.time:
+                for woken, cpu_burst in io.wake(self.clock.time):
+                    remaining_times[woken.pid] = cpu_burst
+                    admit(woken)
+                    if tracing:
+                        record(self.clock.time, "WAKE", woken.pid)
+
+            # 2. Decision Logic (same as the BasicEngine)
+            if not self.dispatcher.is_currently_switching:
+                if on_clock:
+                    on_clock(self.clock.time)
+                potential_next = get_next_process(
+                    ready_queue, current_process, current_job_runtime, remaining_times
+                )
+                if carried is not None:
+                    # First decision since switch_policy
+                    if potential_next is carried:
+                        current_process = carried
+                    carried = None
+
+                if potential_next != current_process:
+                    if switch_cost is None:
+                        cost = latency
+                    else:
+                        cost = switch_cost(
+                            current_process,
+                            potential_next,
+                            remaining_times[potential_next.pid] if potential_next else 0,
+                        )
+                    if cost > 0:
+                        start_switch(
+                            potential_next.pid if potential_next else None, cost
+                        )
+                        next_process = potential_next
+                        if tracing:
+                            record(
+                                self.clock.time,
+                                "SWITCH_START",
+                                next_process.pid if next_process else "Idle",
+                            )
+                    else:
+                        current_process = potential_next
+                        current_job_runtime = 0
+                        self._record_dispatch(current_process, self.clock.time)
+
+            # 3. Find the next time anything can change
+            if self.dispatcher.is_currently_switching:
+                span = self.dispatcher.current_switch_remaining
+            else:
+                span = preemption_horizon(
+                    ready_queue, current_process, current_job_runtime, remaining_times
+                )
+                if current_process:
+                    job_left = remaining_times[current_process.pid]
+                    span = job_left if span is None else min(span, job_left)
+            if upcoming is not None:
+                until_arrival = upcoming.arrival_time - self.clock.time
+                span = until_arrival if span is None else min(span, until_arrival)
+            if io is not None and io.next_wake is not None:
+                until_wake = io.next_wake - self.clock.time
+                span = until_wake if span is None else min(span, until_wake)
+            # Nothing will ever change (e.g. a policy idling on a full queue);
+            # fall back to single ticks just like the BasicEngine would.
+            step = max(span or 1, 1)
+            if until is not None and step > until - self.clock.time:
+                step = until - self.clock.time
+
+            # 4. Execution Phase, `step` ticks at once
+            if io is not None:
+                io.account(step, not self.dispatcher.is_currently_switching and current_process is not None)
+            if self.dispatcher.is_currently_switching:
+                self.total_switch_time += step
+                if tracing:
+                    record_span(
+                        self.clock.time,
+                        step,
+                        "SWITCH",
+                        next_process.pid if next_process else "Idle",
+                    )
+                dispatcher_advance(step)
+                if not self.dispatcher.is_currently_switching:
+                    current_process = next_process
+                    current_job_runtime = 0
+                    self._record_dispatch(current_process, self.clock.time + step)
+
+            elif current_process:
+                if tracing:
+                    record_span(self.clock.time, step, "EXEC", current_process.pid)
+                remaining_times[current_process.pid] -= step
+                current_job_runtime += step
+
+                if remaining_times[current_process.pid] == 0:
+                    if io is not None and io.block(current_process, self.clock.time + step):
+                        if on_block:
+                            on_block(current_process, current_job_runtime, self.clock.time + step)
+                        if tracing:
+                            record(self.clock.time + step, "BLOCK", current_process.pid)
+                    else:
+                        finished = self._record_completion(current_process, self.clock.time + step)
+                        if on_finish:
+                            on_finish(current_process, self.clock.time + step)
+                        del remaining_times[current_process.pid]
+                    current_process = None
+                    current_job_runtime = 0
+            else:
+                self.total_idle_time += step
+                if tracing:
+                    record_span(self.clock.time, step, "IDLE")
+
+            self.clock.advance(step)
+            yield finished
+
+        state.upcoming = upcoming
+        state.current_process = current_process
+        state.next_process = next_process
+        state.current_job_runtime = current_job_runtime
+        state.carried = carried
+        if probe is not None:
+            probe.stop(self.finished)
+
+
+class StreamingEngine(EventEngine):
+    """
+    An EventEngine for unbounded arrival streams.
+
+    ``stream`` consumes an iterator of processes (sorted by arrival time) and
+    yields every ``ProcessResult`` as soon as the process completes. Nothing
+    is kept per finished process: the averages, utilization and throughput
+    are running aggregates (see ``summary``), so memory only depends on how
+    many processes are waiting at once.
+
+    The text log would grow without bound, so ``TraceLevel.FULL`` is not
+    supported; use ``stream(..., emit_intervals=True)`` to get the timeline.
+    Percentiles come from KLL sketches unless ``exact_percentiles`` is set.
+    """
+    def __init__(
+        self,
+        policy: SchedulerPolicy,
+        dispatch_latency: int = 0,
+        trace_level: Union[TraceLevel, str] = TraceLevel.OFF,
+        exact_percentiles: bool = False,
+        devices: Optional[Sequence[IODevice]] = None,
+        switch_cost: Optional[SwitchCostModel] = None,
+    ):
+        super().__init__(
+            policy, dispatch_latency=dispatch_latency, trace_level=trace_level, devices=devices, switch_cost=switch_cost
+        )
+        if self.tracer.level == TraceLevel.FULL:
+            raise ValueError("StreamingEngine cannot keep a full text log, use INTERVALS at most.")
+        # Sketches keep memory constant however long the stream runs
+        self.latency_stats = LatencyStats(exact=exact_percentiles)
+        self.completed = 0
+        self.total_waiting_time = 0
+        self.total_turnaround_time = 0
+        self.total_burst_time = 0
+
+    def stream(
+        self, processes: Iterable[Process], emit_intervals: bool = False
+    ) -> Iterator[Union[ProcessResult, TraceInterval]]:
+        """Runs the simulation lazily over an arrival stream.
+
+        Args:
+          processes: Processes in order of arrival time; may be endless.
+          emit_intervals: Also yield every ``TraceInterval`` once it is
+            closed (this turns tracing on at the INTERVALS level).
+            (Default value = False)
+
+        Yields:
+          ProcessResult | TraceInterval: Completions (and intervals) in time order.
+        """
+        if emit_intervals and self.tracer.level < TraceLevel.INTERVALS:
+            self.tracer.level = TraceLevel.INTERVALS
+        intervals = self.tracer.intervals
+        state = _RunState(self.policy, processes, {})
+        if self.devices is not None:
+            state.io = IOSystem(self.devices, exact=self.latency_stats.exact)
+        self._state = state
+        for finished in self._simulate(state):
+            # Only the last interval can still grow; hand out (or drop) the rest
+            if len(intervals) > 1:
+                if emit_intervals:
+                    yield from intervals[:-1]
+                del intervals[:-1]
+            self.tracer.events.clear()
+            if finished is not None:
+                yield finished
+        if emit_intervals:
+            yield from intervals
+        if self.tracer.sink is None:
+            intervals.clear()
+
+    def run(self, processes: list[Process]) -> dict:
+        """Drains ``stream`` and returns the summary (without per-process results)."""
+        for _ in self.stream(sorted(processes, key=lambda p: (p.arrival_time, p.pid))):
+            pass
+        return self.summary()
+
+    def snapshot(self, trace: bool = True, compress: bool = False) -> EngineSnapshot:
+        """Not supported: the arrival stream may be endless and cannot be saved."""
+        raise ValueError("A StreamingEngine cannot be snapshotted; use an EventEngine.")
+
+    def summary(self) -> Dict:
+        """The running aggregates so far, in the shape of the usual output."""
+        averages, throughput = self._summarize(
+            self.completed,
+            self.total_waiting_time,
+            self.total_turnaround_time,
+            self.total_burst_time,
+            self.clock.time,
+        )
+        summary = {
+            "completed": self.completed,
+            "averages": averages,
+            "percentiles": self.latency_stats.summary(),
+            "total_time": self.clock.time,
+            "throughput": throughput,
+        }
+        io = self._state.io if self._state is not None else None
+        if io is not None:
+            summary["io"] = io.summary(self.clock.time)
+        if self.deadline_stats is not None:
+            summary["deadlines"] = self.deadline_stats.summary()
+        summary.update(self._policy_report())
+        return summary
+
+    def _record_completion(
+        self, process: Process, finish_time: int, first_run: Optional[int] = None
+    ) -> ProcessResult:
+        """Updates the running aggregates instead of storing the result."""
+        result = self._make_result(process, finish_time, first_run)
+        self.completed += 1
+        self.total_waiting_time += result.waiting_time
+        self.total_turnaround_time += result.turnaround_time
+        self.total_burst_time += process.cpu_time
+        return result
@@ -0,0 +1,242 @@
+"""Simulated I/O devices.
+
+Processes with ``io`` bursts (see ``Process.from_bursts``) alternate between
+the CPU and I/O devices: when a CPU burst ends the process blocks, waits in
+the queue of its device, gets served, and rejoins the ready queue for its
+next CPU burst. Engines keep the requests in service on an event heap, so
+blocked processes cost nothing until they wake up.
+
+Example:
+
+    from vance import EventEngine, RR, Process
+    from vance.io import IODevice
+
+    p = Process.from_bursts(1, [5, ("disk", 8), 3, ("net", 20), 2])
+    engine = EventEngine(RR(time_quantum=4), devices=[IODevice("disk"), IODevice("net", "SJF")])
+    res = engine.run([p, ...])
+    res["io"]["overlap_efficiency"]   # how much of the I/O was hidden behind computation
+"""
+from .types import IOBurst, Process
+from .stats import ExactQuantiles, KLLSketch, PERCENTILES
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import heapq
+
+# Orders a device can serve its queue in
+DISCIPLINES = ("FCFS", "SJF", "PRIORITY")
+
+
+@dataclass(frozen=True)
+class IODevice:
+    """A device that serves one I/O request at a time.
+
+    Attributes:
+      name: What ``IOBurst.device`` refers to it by (its index works too).
+      discipline: How the queue is served: "FCFS", "SJF" (shortest request
+        first) or "PRIORITY" (smallest ``priority_time`` first). Ties go
+        to the request submitted first.
+    """
+
+    name: str = "io"
+    discipline: str = "FCFS"
+
+    def __post_init__(self):
+        if self.discipline not in DISCIPLINES:
+            raise ValueError(f"Unknown discipline {self.discipline!r}, expected one of {DISCIPLINES}.")
+
+
+class _Device:
+    """The run-time state of one device."""
+
+    __slots__ = ("config", "queue", "current", "busy_time", "queue_time", "requests")
+
+    def __init__(self, config: IODevice):
+        self.config = config
+        # (key, seq, submitted, process, burst)
+        self.queue: List[tuple] = []
+        self.current: Optional[tuple] = None
+        self.busy_time = 0
+        self.queue_time = 0
+        self.requests = 0
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class IOSystem:
+    """The devices of one run, their queues and the wake-up heap.
+
+    Engines ``block`` a process when its CPU burst ends and ``wake`` the
+    ones whose request is done at the start of every step; ``next_wake``
+    tells the event engine how far it may jump.
+
+    Args:
+      devices: The device configurations; ``IOBurst.device`` indexes or
+        names one of them.
+      exact: Keep every CPU-burst response time instead of sketching them.
+        (Default value = True)
+    """
+
+    def __init__(self, devices: Sequence[IODevice], exact: bool = True):
+        self.devices = [_Device(config) for config in devices]
+        self._index = {config.name: i for i, config in enumerate(devices)}
+        # (completion time, seq, device index) of every request in service
+        self._heap: List[Tuple[int, int, int]] = []
+        self._seq = 0
+        self.next_wake: Optional[int] = None
+        self.pending = 0  # requests queued or in service
+        self._next_io: Dict[int, int] = {}  # PID -> index of its next IOBurst
+        self._blocked_since: Dict[int, int] = {}
+        self.blocked: Dict[int, int] = {}  # PID -> time blocked so far
+        self._ready_since: Dict[int, int] = {}
+        self.burst_response = ExactQuantiles() if exact else KLLSketch()
+        self.cpu_time = 0
+        self.io_busy_time = 0
+        self.overlap_time = 0
+
+    def device_index(self, device) -> int:
+        """Resolves ``IOBurst.device`` (an index or a name) to an index."""
+        index = self._index.get(device, device)
+        if not isinstance(index, int) or not 0 <= index < len(self.devices):
+            raise ValueError(f"No I/O device {device!r}; the engine has {len(self.devices)}.")
+        return index
+
+    def validate(self, process: Process):
+        """Checks that every I/O burst of ``process`` names an existing device."""
+        for burst in process.io:
+            self.device_index(burst.device)
+
+    @property
+    def busy(self) -> bool:
+        """Whether any request is queued or in service."""
+        return self.pending > 0
+
+    def ready(self, pid: int, time: int):
+        """Notes that a process became ready, for its CPU-burst response time."""
+        self._ready_since[pid] = time
+
+    def dispatched(self, pid: int, time: int):
+        """Notes that a process got the CPU."""
+        since = self._ready_since.pop(pid, None)
+        if since is not None:
+            self.burst_response.add(time - since)
+
+    def block(self, process: Process, time: int) -> bool:
+        """Sends ``process`` to its next I/O request, if it has one left.
+
+        Args:
+          process: Process: A process whose CPU burst just ended.
+          time: int: The current time.
+
+        Returns:
+          bool: True if it blocked, False if it is done.
+        """
+        k = self._next_io.get(process.pid, 0)
+        if k >= len(process.io):
+            self._next_io.pop(process.pid, None)
+            return False
+        burst = process.io[k]
+        self._next_io[process.pid] = k + 1
+        self._blocked_since[process.pid] = time
+        self.pending += 1
+        device_id = self.device_index(burst.device)
+        device = self.devices[device_id]
+        discipline = device.config.discipline
+        if discipline == "SJF":
+            key = burst.duration
+        elif discipline == "PRIORITY":
+            key = process.priority_time
+        else:
+            key = 0
+        request = (key, self._seq, time, process, burst)
+        self._seq += 1
+        if device.current is None:
+            self._start(device_id, request, time)
+        else:
+            heapq.heappush(device.queue, request)
+        return True
+
+    def _start(self, device_id: int, request: tuple, time: int):
+        device = self.devices[device_id]
+        device.current = request
+        device.queue_time += time - request[2]
+        heapq.heappush(self._heap, (time + request[4].duration, self._seq, device_id))
+        self._seq += 1
+        self.next_wake = self._heap[0][0]
+
+    def wake(self, time: int) -> List[Tuple[Process, int]]:
+        """Completes every request done by ``time``.
+
+        A device that finishes starts its next request at the moment it
+        finished, not at ``time``.
+
+        Returns:
+          list[tuple[Process, int]]: ``(process, next CPU burst)`` in the
+          order the requests completed.
+        """
+        woken = []
+        heap = self._heap
+        while heap and heap[0][0] <= time:
+            done, _, device_id = heapq.heappop(heap)
+            device = self.devices[device_id]
+            _, _, _, process, burst = device.current
+            device.current = None
+            device.busy_time += burst.duration
+            device.requests += 1
+            self.pending -= 1
+            pid = process.pid
+            self.blocked[pid] = self.blocked.get(pid, 0) + done - self._blocked_since.pop(pid)
+            self._ready_since[pid] = done
+            woken.append((process, burst.cpu_after))
+            if device.queue:
+                self._start(device_id, heapq.heappop(device.queue), done)
+        self.next_wake = heap[0][0] if heap else None
+        return woken
+
+    def account(self, duration: int, executing: bool):
+        """Adds ``duration`` ticks of CPU and device activity to the totals.
+
+        Devices only start or stop at step boundaries, so whether any of
+        them is busy is the same for the whole step.
+        """
+        if executing:
+            self.cpu_time += duration
+        if self._heap:
+            self.io_busy_time += duration
+            if executing:
+                self.overlap_time += duration
+
+    def summary(self, total_time: int) -> Dict:
+        """Device utilization, CPU/I-O overlap and CPU-burst response times.
+
+        Percentages are floats. ``overlap_efficiency`` is the share of the
+        shorter of CPU and I/O activity that ran at the same time as the
+        other: 100 means one was completely hidden behind the other.
+        """
+        devices = []
+        for i, device in enumerate(self.devices):
+            devices.append({
+                "device": i,
+                "name": device.config.name,
+                "discipline": device.config.discipline,
+                "requests": device.requests,
+                "busy_time": device.busy_time,
+                "utilization": device.busy_time / total_time * 100 if total_time else 0.0,
+                "avg_queue_time": round(device.queue_time / device.requests, 2) if device.requests else 0,
+            })
+        shorter = min(self.cpu_time, self.io_busy_time)
+        response = self.burst_response
+        burst_response = {f"p{p:g}": response.quantile(p / 100) or 0 for p in PERCENTILES}
+        burst_response["max"] = response.max or 0
+        burst_response["count"] = response.count
+        return {
+            "devices": devices,
+            "io_busy_time": self.io_busy_time,
+            "overlap_time": self.overlap_time,
+            "overlap_efficiency": self.overlap_time / shorter * 100 if shorter else 0.0,
+            "burst_response": burst_response,
+        }
@@ -1,11 +1,34 @@
 from .core import Process
+from .queues import FIFOQueue, HeapQueue, LotteryQueue, MultiLevelQueue, pop_head
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional, Sequence, Union
+from collections import deque
+from functools import partial
+from itertools import chain
+from operator import attrgetter
+import random
 
 
 class SchedulerPolicy(ABC):
     """The Base Class (Interface) that all schedulers must inherit from."""
 
+    def create_ready_queue(self, remaining_times: Dict[int, int]):
+        """Builds the ready queue the engine will hand to ``get_next_process``.
+
+        Engines only ever ``append`` arriving processes to it; everything else
+        is up to the policy. The default is a ``FIFOQueue``, which is O(1) at
+        both ends but still supports the list operations (``pop(0)``,
+        ``remove``, indexing, ...) that custom policies rely on.
+
+        Args:
+          remaining_times(dict[int, int]): The engine's map of PID to remaining
+            burst units, for policies whose ordering depends on it.
+
+        Returns:
+          The (empty) ready queue.
+        """
+        return FIFOQueue()
+
     @abstractmethod
     def get_next_process(
         self,
@@ -51,6 +74,155 @@ class SchedulerPolicy(ABC):
         """
         pass
 
+    def preemption_horizon(
+        self,
+        ready_queue: List[Process],
+        current_process: Optional[Process],
+        current_runtime: int,
+        remaining_times: Dict[int, int],
+    ) -> Optional[int]:
+        """Tells event-driven engines how long the current decision stays valid.
+
+        Called right after ``get_next_process``. The returned number of ticks
+        is a promise that, as long as no new process arrives, asking again on
+        any of those ticks would keep the same process on the CPU without
+        touching the ready queue. Engines may then skip straight past them.
+
+        The default of 1 asks again on every tick, which is always exact, so
+        custom policies only need to override this to run faster.
+
+        Args:
+          ready_queue(list[Process]): Processes currently waiting for CPU time.
+          current_process(Process | None): The process that was just picked.
+          current_runtime(int): Ticks elapsed since the current process started its slice.
+          remaining_times(dict[int, int]): Map of PID to remaining burst units.
+
+        Returns:
+          int | None: Ticks until the policy may preempt, or None if only an
+          arrival or the completion of the current process can change its mind.
+        """
+        return 1
+
+    def on_clock(self, time: int):
+        """Tells the policy the simulation time, right before ``get_next_process``.
+
+        Only needed by policies that act on wall-clock time (e.g. periodic
+        boosts). Event-driven engines skip ticks, so such policies must also
+        keep ``preemption_horizon`` short enough to be asked in time.
+
+        Args:
+          time(int): The current simulation time.
+        """
+
+    def on_finish(self, process: Process, time: int):
+        """Tells the policy that a process has completed its burst.
+
+        Args:
+          process(Process): The process that finished.
+          time(int): Its completion time.
+        """
+
+    def on_block(self, process: Process, runtime: int, time: int):
+        """Tells the policy that the running process blocked on I/O.
+
+        It left the CPU without being preempted and comes back through the
+        ready queue, with ``remaining_times`` set to its next CPU burst, once
+        its I/O is done (see ``vance.io``).
+
+        Args:
+          process(Process): The process that blocked.
+          runtime(int): Ticks it ran since it was dispatched.
+          time(int): When it blocked.
+        """
+
+    def on_migrate_out(self, process: Process, time: int):
+        """Tells the policy that a waiting process moves to another CPU.
+
+        Called by the ``SMPEngine`` after taking the process out of this
+        policy's run queue (work stealing or load balancing). The policy
+        should forget the process, like ``on_finish`` does, and may return
+        whatever of its state should follow it to the other CPU.
+
+        Args:
+          process(Process): The process that leaves.
+          time(int): When it leaves.
+
+        Returns:
+          The state handed to the receiving policy's ``on_migrate_in``;
+          None by default.
+        """
+
+    def on_migrate_in(self, process: Process, state, time: int):
+        """Tells the policy that a process moves in from another CPU.
+
+        Called right before the process is appended to this policy's run
+        queue, with what the other CPU's policy returned from
+        ``on_migrate_out``.
+
+        Args:
+          process(Process): The process that arrives.
+          state: Its state on the other CPU (None if there is none).
+          time(int): When it arrives.
+        """
+
+    def report(self) -> Dict:
+        """Extra entries for the output of a run, e.g. ``fairness``.
+
+        Engines add them to the result (or the streaming summary) as is.
+
+        Returns:
+          dict: Output keys and their values; empty by default.
+        """
+        return {}
+
+    def merge_reports(self, copies: Sequence["SchedulerPolicy"]) -> Dict:
+        """The ``report`` of a run scheduled by several copies of this policy.
+
+        The ``SMPEngine`` gives every core its own copy when the cores have
+        their own run queues, and calls this on the original. Override it
+        to merge your ``report`` entries; by default a single copy's report
+        is used as is, and several non-empty ones are listed per core under
+        ``core_reports``.
+
+        Args:
+          copies(list[SchedulerPolicy]): The copies that ran, one per core.
+
+        Returns:
+          dict: Output keys and their values.
+        """
+        reports = [copy.report() for copy in copies]
+        if len(reports) == 1:
+            return reports[0]
+        return {"core_reports": reports} if any(reports) else {}
+
+    def cache_key(self):
+        """What identifies this policy's decisions, for the result cache.
+
+        Two policies of the same class with equal keys must schedule any
+        workload identically. The default is the policy's public attributes,
+        which for the built-in policies are their constructor parameters.
+
+        Override it to return your own key (made of numbers, strings, lists
+        and dicts), or to return None when runs must never be cached, e.g.
+        because the policy draws unseeded random numbers.
+
+        Returns:
+          The key, or None to opt out of caching.
+        """
+        return {name: value for name, value in vars(self).items() if not name.startswith("_")}
+
+
+def policy_hook(policy: SchedulerPolicy, name: str) -> Optional[Callable]:
+    """Returns ``policy``'s notification method ``name`` if it overrides it.
+
+    Engines look the hooks up once per run and skip the call entirely when a
+    policy keeps the no-op default.
+    """
+    method = getattr(type(policy), name, None)
+    if method is None or method is getattr(SchedulerPolicy, name):
+        return None
+    return getattr(policy, name)
+
 
 class FCFS(SchedulerPolicy):
     """First-Come, First-Served (FCFS) scheduling policy.
@@ -85,10 +257,41 @@ class FCFS(SchedulerPolicy):
 
         # If CPU is idle, pick the first person in line
         if ready_queue:
-            return ready_queue.pop(0)
+            return pop_head(ready_queue)
 
         return None
 
+    def preemption_horizon(
+        self, _ready_queue, _current_process, _current_runtime, _remaining_times
+    ):
+        """Non-preemptive: the decision holds until completion or an arrival."""
+        return None
+
+
+def _pop_best(ready_queue, key: Callable[[Process], object]) -> Process:
+    """Removes and returns the waiting process with the smallest ``key``.
+
+    O(log n) on the ``HeapQueue`` from ``create_ready_queue`` (which orders
+    by the same key); any other ready queue, like a plain list, is scanned,
+    ties going to whoever got in line first.
+    """
+    if isinstance(ready_queue, HeapQueue):
+        return ready_queue.pop()
+    best = min(ready_queue, key=key)
+    ready_queue.remove(best)
+    return best
+
+
+def _peek_best(ready_queue, key: Callable[[Process], object]) -> Optional[Process]:
+    """Like ``_pop_best``, but leaves the process queued (None if it is empty)."""
+    if isinstance(ready_queue, HeapQueue):
+        return ready_queue.peek()
+    return min(ready_queue, key=key, default=None)
+
+
+_burst_key = attrgetter("burst_time")
+_priority_key = attrgetter("priority_time", "arrival_time", "pid")
+
 
 class SJF(SchedulerPolicy):
     """Shortest Job First (SJF) scheduling policy.
@@ -97,39 +300,52 @@ class SJF(SchedulerPolicy):
     smallest initial burst time. Once a process starts, it holds the CPU
     until completion, regardless of new arrivals.
 
+    Waiting processes are kept in a heap keyed on burst time.
+
     Args:
 
     Returns:
 
     """
 
+    def create_ready_queue(self, _remaining_times):
+        """Ready queue ordered by burst time."""
+        return HeapQueue(key=_burst_key)
+
     def get_next_process(
         self, ready_queue, current_process, _current_runtime, _remaining_times
     ):
-        """
+        """Keeps the running process, else picks the shortest waiting job.
 
         Args:
-          ready_queue: param current_process:
-          _current_runtime: param _remaining_times:
-          current_process: param _remaining_times:
-          _remaining_times: 
+          ready_queue: The queue from ``create_ready_queue`` (O(log n)), or
+            any list of processes (scanned).
+          current_process: The process on the CPU, if any.
 
         Returns:
-
+          The process to run next, or None for an idle CPU.
         """
         # Non-preemptive: If running, don't stop.
         if current_process:
             return current_process
 
-        # Pick the shortest job
+        # Pick the shortest job (ties go to whoever got in line first)
         if ready_queue:
-            # Find process with smallest burst time
-            shortest = min(ready_queue, key=lambda p: p.burst_time)
-            ready_queue.remove(shortest)
-            return shortest
+            return _pop_best(ready_queue, _burst_key)
 
         return None
 
+    def preemption_horizon(
+        self, _ready_queue, _current_process, _current_runtime, _remaining_times
+    ):
+        """Non-preemptive: the decision holds until completion or an arrival."""
+        return None
+
+
+def _remaining_key(remaining_times: Dict[int, int], process: Process):
+    # A module-level function (not a lambda), so queues keyed on it can be pickled
+    return remaining_times[process.pid], process.pid
+
 
 class STCF(SchedulerPolicy):
     """Shortest Time-to-Completion First (STCF) scheduling policy.
@@ -139,46 +355,50 @@ class STCF(SchedulerPolicy):
     has a shorter remaining burst than the current job, the current job
     is preempted and returned to the ready queue.
 
+    Waiting processes are kept in a heap keyed on remaining time. A queued
+    process does not run, so its key stays valid until it is picked.
+
     Args:
 
     Returns:
 
     """
 
+    def create_ready_queue(self, remaining_times):
+        """Ready queue ordered by remaining time, then PID."""
+        return HeapQueue(key=partial(_remaining_key, remaining_times))
+
     def get_next_process(
         self, ready_queue, current_process, _current_runtime, remaining_times
     ):
-        """
+        """Runs the process with the least time left, preempting if needed.
 
         Args:
-          ready_queue: param current_process:
-          _current_runtime: param remaining_times:
-          current_process: param remaining_times:
-          remaining_times: 
+          ready_queue: The queue from ``create_ready_queue`` (O(log n)), or
+            any list of processes (scanned).
+          current_process: The process on the CPU, if any.
+          remaining_times: Map of PID to remaining burst units.
 
         Returns:
-
+          The process to run next, or None for an idle CPU.
         """
         if not ready_queue and not current_process:
             return None
 
         # 1. Find the best candidate in the ready queue
-        best_in_queue = None
-        if ready_queue:
-            # Tie-breaker: smallest remaining time, then lower PID
-            best_in_queue = min(
-                ready_queue, key=lambda p: (remaining_times[p.pid], p.pid)
-            )
+        # Tie-breaker: smallest remaining time, then lower PID
+        key = partial(_remaining_key, remaining_times)
+        best_in_queue = _peek_best(ready_queue, key)
 
-        # 2. THE SNIPPET GOES HERE: Decision Logic
+        # 2. Decision Logic
         if current_process:
             current_rem = remaining_times[current_process.pid]
 
             # Check if the new arrival is STRICTLY shorter than the current one
             if best_in_queue and remaining_times[best_in_queue.pid] < current_rem:
                 # Preempt: Swap them out
+                _pop_best(ready_queue, key)
                 ready_queue.append(current_process)
-                ready_queue.remove(best_in_queue)
                 return best_in_queue
 
             # No better candidate? Keep running the current process.
@@ -186,8 +406,13 @@ class STCF(SchedulerPolicy):
             return current_process
 
         # 3. CPU was idle, just pick the best from queue
-        ready_queue.remove(best_in_queue)
-        return best_in_queue
+        return _pop_best(ready_queue, key)
+
+    def preemption_horizon(
+        self, _ready_queue, _current_process, _current_runtime, _remaining_times
+    ):
+        """The running job only gets shorter, so only an arrival can preempt it."""
+        return None
 
 
 class RR(SchedulerPolicy):
@@ -230,12 +455,33 @@ class RR(SchedulerPolicy):
         # 2. If no one is running (or we just preempted), pick head of queue
         if not current_process:
             if ready_queue:
-                return ready_queue.pop(0)
+                return pop_head(ready_queue)
             return None
 
         # Otherwise, keep running the current guy
         return current_process
 
+    def preemption_horizon(
+        self, ready_queue, current_process, current_runtime, _remaining_times
+    ):
+        """The decision holds until the quantum of the current process expires.
+
+        Args:
+          ready_queue: Processes currently waiting for CPU time.
+          current_process: The process that was just picked.
+          current_runtime: Ticks elapsed since the current process started its slice.
+          _remaining_times: Unused.
+
+        Returns:
+          int | None: Ticks left in the quantum, or None once it has expired
+          with nobody else waiting.
+        """
+        if current_process and current_runtime < self.time_quantum:
+            return self.time_quantum - current_runtime
+        if ready_queue:
+            return 1
+        return None
+
 class PriorityScheduler(SchedulerPolicy):
     """Priority Scheduling policy (Non-preemptive).
     
@@ -245,25 +491,31 @@ class PriorityScheduler(SchedulerPolicy):
     it completes its burst, even if a higher-priority process arrives in the
     ready queue.
 
+    Waiting processes are kept in a heap keyed on
+    ``(priority_time, arrival_time, pid)``.
+
     Args:
 
     Returns:
 
     """
 
+    def create_ready_queue(self, _remaining_times):
+        """Ready queue ordered by priority, then arrival time, then PID."""
+        return HeapQueue(key=_priority_key)
+
     def get_next_process(
         self, ready_queue, current_process, _current_runtime, _remaining_times
     ):
-        """
+        """Keeps the running process, else picks the highest-priority one.
 
         Args:
-          ready_queue: param current_process:
-          _current_runtime: param _remaining_times:
-          current_process: param _remaining_times:
-          _remaining_times: 
+          ready_queue: The queue from ``create_ready_queue`` (O(log n)), or
+            any list of processes (scanned).
+          current_process: The process on the CPU, if any.
 
         Returns:
-
+          The process to run next, or None for an idle CPU.
         """
         # Non-preemptive: If running, don't stop.
         if current_process: 
@@ -273,8 +525,976 @@ class PriorityScheduler(SchedulerPolicy):
             # Find process with highest priority (0 is highest prio)
             # If processes both have high prio, choose which is closest to arrival time
             # If processes both have high prio and same arrival time, we choose by ID
-            best_candidate = min(ready_queue, key=lambda p: (p.priority_time, p.arrival_time, p.pid))
-            ready_queue.remove(best_candidate)
-            return best_candidate
+            return _pop_best(ready_queue, _priority_key)
+
+        return None
 
+    def preemption_horizon(
+        self, _ready_queue, _current_process, _current_runtime, _remaining_times
+    ):
+        """Non-preemptive: the decision holds until completion or an arrival."""
         return None
+
+
+class MLFQ(SchedulerPolicy):
+    """Multi-Level Feedback Queue (MLFQ) scheduling policy.
+
+    Processes start at the highest level (0) and a higher level always
+    preempts a lower one. Within a level they take turns like Round Robin
+    with that level's quantum. A process that has used up its allotment at
+    a level (summed over all its slices there) is demoted one level, and
+    every ``boost_interval`` ticks all processes go back to the top.
+
+    Waiting processes live in a ``MultiLevelQueue``, so picking the next
+    one is O(1) regardless of the number of levels.
+
+    Args:
+      levels: Number of priority levels. (Default value = 3)
+      quanta: Time quantum per level, or one for all levels.
+        (Default value = None, 2, 4, 8, ... doubling per level)
+      allotments: CPU time a process may use at a level before it is
+        demoted. (Default value = None, one quantum)
+      boost_interval: Ticks between priority boosts. (Default value = None, never)
+    """
+
+    def __init__(
+        self,
+        levels: int = 3,
+        quanta: Optional[Union[int, Sequence[int]]] = None,
+        allotments: Optional[Union[int, Sequence[int]]] = None,
+        boost_interval: Optional[int] = None,
+    ):
+        if levels < 1:
+            raise ValueError("MLFQ needs at least one level.")
+        if quanta is None:
+            quanta = [2 << level for level in range(levels)]
+        self.levels = levels
+        self.quanta = self._per_level(quanta, "quanta")
+        self.allotments = self._per_level(
+            allotments if allotments is not None else self.quanta, "allotments"
+        )
+        if boost_interval is not None and boost_interval < 1:
+            raise ValueError("boost_interval must be at least 1.")
+        self.boost_interval = boost_interval
+        self._reset()
+
+    def _per_level(self, values: Union[int, Sequence[int]], name: str) -> List[int]:
+        values = [values] * self.levels if isinstance(values, int) else list(values)
+        if len(values) != self.levels:
+            raise ValueError(f"Give one of {name} per level ({self.levels}).")
+        if min(values) < 1:
+            raise ValueError(f"All {name} must be at least 1.")
+        return values
+
+    def _reset(self):
+        self._level: Dict[int, int] = {}  # PID -> level, 0 if missing
+        self._used: Dict[int, int] = {}  # PID -> CPU time used at its level
+        self._charged: Dict[int, int] = {}  # PID -> runtime already accounted for
+        self._queue: Optional[MultiLevelQueue] = None
+        self._time = 0
+        self._next_boost = self.boost_interval
+
+    def level_of(self, process: Process) -> int:
+        """The current priority level of a process."""
+        return self._level.get(process.pid, 0)
+
+    def create_ready_queue(self, _remaining_times):
+        """Per-level FIFO queues with a bitmap of the non-empty levels."""
+        self._reset()
+        self._queue = MultiLevelQueue(self.levels, self.level_of)
+        return self._queue
+
+    def on_clock(self, time):
+        """Applies any priority boost that is due."""
+        self._time = time
+        if self._next_boost is not None and time >= self._next_boost:
+            self._level.clear()
+            self._used.clear()
+            if self._queue is not None:
+                self._queue.boost()
+            self._next_boost = (time // self.boost_interval + 1) * self.boost_interval
+
+    def on_finish(self, process, _time):
+        """Forgets the level of a finished process."""
+        self._level.pop(process.pid, None)
+        self._used.pop(process.pid, None)
+        self._charged.pop(process.pid, None)
+
+    def on_migrate_out(self, process, _time):
+        """Forgets a process moving to another CPU and hands over its level."""
+        pid = process.pid
+        self._charged.pop(pid, None)
+        return self._level.pop(pid, 0), self._used.pop(pid, 0)
+
+    def on_migrate_in(self, process, state, _time):
+        """Keeps the level a process had on another CPU."""
+        if state is not None:
+            self._level[process.pid], self._used[process.pid] = state
+
+    def on_block(self, process, runtime, _time):
+        """Counts the partial slice of a blocking process against its allotment.
+
+        Giving up the CPU just before the quantum ends does not keep a
+        process at a high level forever.
+        """
+        pid = process.pid
+        level = self._level.get(pid, 0)
+        used = self._used.get(pid, 0) + runtime - self._charged.pop(pid, 0)
+        if used >= self.allotments[level] and level + 1 < self.levels:
+            self._level[pid] = level + 1
+            used = 0
+        self._used[pid] = used
+
+    def get_next_process(
+        self, ready_queue, current_process, current_runtime, _remaining_times
+    ):
+        """Keeps the current process until its quantum expires or a higher
+        level has work, demoting it once its allotment is used up.
+
+        Args:
+          ready_queue: The ``MultiLevelQueue`` of waiting processes.
+          current_process: The process currently occupying the CPU.
+          current_runtime: Ticks elapsed since the current process was dispatched.
+          _remaining_times: Unused.
+
+        Returns:
+          Process | None: The process to run next, or None for an idle CPU.
+        """
+        if current_process is None:
+            return ready_queue.pop() if ready_queue else None
+
+        pid = current_process.pid
+        level = self._level.get(pid, 0)
+        ran = current_runtime - self._charged.get(pid, 0)
+        top = ready_queue.top_level()
+        if ran < self.quanta[level] and (top is None or top >= level):
+            return current_process
+
+        # The slice is over: account for it and requeue at the (new) level.
+        # If nobody else is waiting it keeps the CPU and starts a new slice.
+        self._charged[pid] = current_runtime
+        used = self._used.get(pid, 0) + ran
+        if used >= self.allotments[level] and level + 1 < self.levels:
+            self._level[pid] = level + 1
+            used = 0
+        self._used[pid] = used
+        ready_queue.append(current_process)
+        next_process = ready_queue.pop()
+        if next_process is not current_process:
+            del self._charged[pid]
+        return next_process
+
+    def preemption_horizon(
+        self, ready_queue, current_process, current_runtime, _remaining_times
+    ):
+        """The decision holds until the quantum expires or a boost is due.
+
+        Args:
+          ready_queue: The ``MultiLevelQueue`` of waiting processes.
+          current_process: The process that was just picked.
+          current_runtime: Ticks elapsed since the current process was dispatched.
+          _remaining_times: Unused.
+
+        Returns:
+          int | None: Ticks until the next quantum expiry or boost, or None
+          when the CPU is idle.
+        """
+        if current_process is None:
+            return None
+        level = self._level.get(current_process.pid, 0)
+        span = self.quanta[level] - (current_runtime - self._charged.get(current_process.pid, 0))
+        if self._next_boost is not None:
+            span = min(span, self._next_boost - self._time)
+        return max(span, 1)
+
+
+# Load weight per nice level -20..19 (each level is ~10% CPU), as in Linux
+NICE_TO_WEIGHT = [
+    88761, 71755, 56483, 46273, 36291,
+    29154, 23254, 18705, 14949, 11916,
+    9548, 7620, 6100, 4904, 3906,
+    3121, 2501, 1991, 1586, 1277,
+    1024, 820, 655, 526, 423,
+    335, 272, 215, 172, 137,
+    110, 87, 70, 56, 45,
+    36, 29, 23, 18, 15,
+]
+NICE_0_WEIGHT = 1024
+# Virtual runtime is kept in integer units of 2^-20 ticks, so it adds up
+# exactly no matter how often it is charged
+_VRUNTIME_SHIFT = 20
+
+
+class _PlacingQueue:
+    """A run queue mixin for policies that place new processes themselves.
+
+    Processes the policy has not placed yet (new arrivals, or ones back from
+    I/O) wait aside until its next decision ``admit``s them, after it has
+    accounted for the time that passed. The policy provides ``_placed`` and
+    ``_place``.
+    """
+
+    def __init__(self, policy: SchedulerPolicy, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._policy = policy
+        self._arrived: deque = deque()
+
+    def __len__(self) -> int:
+        return super().__len__() + len(self._arrived)
+
+    def __iter__(self) -> Iterator[Process]:
+        return chain(super().__iter__(), self._arrived)
+
+    def __contains__(self, process: Process) -> bool:
+        return super().__contains__(process) or process in self._arrived
+
+    def append(self, process: Process):
+        if self._policy._placed(process):
+            super().append(process)
+        else:
+            self._arrived.append(process)
+
+    def admit(self):
+        """Places the newly arrived processes in the queue."""
+        while self._arrived:
+            process = self._arrived.popleft()
+            self._policy._place(process)
+            super().append(process)
+
+    def pop(self) -> Process:
+        self.admit()
+        return super().pop()
+
+
+class _FairQueue(_PlacingQueue, HeapQueue):
+    """The CFS run queue: a heap on ``(vruntime, pid)``.
+
+    Newly arrived processes have no vruntime yet. They wait aside until the
+    policy's next decision places them at the queue's minimum vruntime.
+    """
+
+    def __init__(self, policy: "CFS"):
+        super().__init__(policy, key=self._order)
+
+    def _order(self, process: Process):
+        return self._policy._vruntime[process.pid], process.pid
+
+
+class CFS(SchedulerPolicy):
+    """Completely Fair Scheduler (CFS) style policy.
+
+    Every process accumulates virtual runtime: its CPU time scaled by
+    ``NICE_0_WEIGHT / weight``, where the weight comes from its
+    ``priority_time`` read as a nice value (0 is normal, lower gets more CPU,
+    higher gets less). The process with the smallest vruntime runs for a
+    slice of ``target_latency`` shared out by weight among all runnable
+    processes, but at least ``min_granularity`` ticks. When the slice ends
+    it is preempted if someone else now has a smaller vruntime.
+
+    New processes start at the smallest vruntime in the queue, so they
+    neither starve nor get to catch up on time they were not around for.
+    Processes blocked on I/O leave the load; when they wake up they keep
+    their vruntime, but no less than the queue's minimum.
+
+    Waiting processes are kept in a heap keyed on ``(vruntime, pid)``. Their
+    vruntime does not change while they wait, so picking the leftmost one
+    and re-inserting are both O(log n).
+
+    Args:
+      target_latency: Ticks within which every runnable process should get to
+        run once. (Default value = 24)
+      min_granularity: Shortest slice, however many processes are runnable.
+        (Default value = 3)
+    """
+
+    def __init__(self, target_latency: int = 24, min_granularity: int = 3):
+        if min_granularity < 1 or target_latency < min_granularity:
+            raise ValueError("Need 1 <= min_granularity <= target_latency.")
+        self.target_latency = target_latency
+        self.min_granularity = min_granularity
+        self._reset()
+
+    def _reset(self):
+        self._vruntime: Dict[int, int] = {}  # PID -> vruntime, scaled
+        self._charged: Dict[int, int] = {}  # PID -> runtime already charged
+        self._slice_start: Dict[int, int] = {}  # PID -> runtime when its slice began
+        self._weight: Dict[int, int] = {}  # PID -> load weight
+        self._sleeping: Dict[int, int] = {}  # PID -> vruntime, while blocked on I/O
+        self._ran: Dict[int, int] = {}  # PID -> CPU time charged so far
+        self._lag: Dict[int, int] = {}  # PID -> vruntime - min vruntime, when migrated in
+        self._queue: Optional[_FairQueue] = None
+        self._min_vruntime = 0
+        self._load = 0  # total weight of the runnable processes
+
+    @staticmethod
+    def weight(process: Process) -> int:
+        """The load weight of a process, from its priority as a nice value."""
+        nice = min(max(process.priority_time, -20), 19)
+        return NICE_TO_WEIGHT[nice + 20]
+
+    def vruntime(self, process: Process) -> float:
+        """The virtual runtime of a process, in ticks."""
+        return self._vruntime.get(process.pid, self._min_vruntime) / (1 << _VRUNTIME_SHIFT)
+
+    def create_ready_queue(self, _remaining_times):
+        """A heap on (vruntime, PID) that places new arrivals lazily."""
+        self._reset()
+        self._queue = _FairQueue(self)
+        return self._queue
+
+    def on_finish(self, process, _time):
+        """Drops a finished process from the accounting."""
+        # The minimum only needs to be exact for sleepers to come back at
+        if self._sleeping and process.pid in self._vruntime:
+            self._leave(process.pid, process.cpu_time - self._ran.get(process.pid, 0))
+        self._load -= self._weight.pop(process.pid, 0)
+        for table in (self._vruntime, self._charged, self._slice_start, self._sleeping, self._ran, self._lag):
+            table.pop(process.pid, None)
+
+    def on_migrate_out(self, process, _time):
+        """Takes a process moving to another CPU out of the load.
+
+        It hands over how far its vruntime is ahead of this queue's minimum,
+        as Linux does, since the minimum of the other queue is unrelated.
+        """
+        pid = process.pid
+        self._load -= self._weight.pop(pid, 0)
+        self._charged.pop(pid, None)
+        self._slice_start.pop(pid, None)
+        vruntime = self._vruntime.pop(pid, None)
+        lag = vruntime - self._min_vruntime if vruntime is not None else 0
+        return max(lag, 0), self._ran.pop(pid, 0)
+
+    def on_migrate_in(self, process, state, _time):
+        """Places a process from another CPU at the same distance from this queue's minimum."""
+        if state is not None:
+            self._lag[process.pid], self._ran[process.pid] = state
+
+    def on_block(self, process, runtime, _time):
+        """Takes a process blocked on I/O out of the load until it wakes up."""
+        pid = process.pid
+        self._sleeping[pid] = self._leave(pid, runtime - self._charged.pop(pid, 0))
+        del self._vruntime[pid]
+        self._slice_start.pop(pid, None)
+        self._load -= self._weight.pop(pid)
+
+    def _leave(self, pid: int, ran: int) -> int:
+        """Charges the last ``ran`` ticks of a process leaving the CPU.
+
+        The queue's minimum vruntime moves on as if a decision had been made
+        on the tick it left, so it does not depend on how often the engine
+        asks (which matters once sleepers come back at that minimum).
+
+        Returns:
+          int: Its final vruntime.
+        """
+        vruntime = self._vruntime[pid] + ran * ((NICE_0_WEIGHT << _VRUNTIME_SHIFT) // self._weight[pid])
+        self._vruntime[pid] = vruntime
+        self._ran[pid] = self._ran.get(pid, 0) + ran
+        low = vruntime
+        leftmost = self._queue.peek() if self._queue is not None else None
+        if leftmost is not None and self._vruntime[leftmost.pid] < low:
+            low = self._vruntime[leftmost.pid]
+        if low > self._min_vruntime:
+            self._min_vruntime = low
+        return vruntime
+
+    def _place(self, process: Process):
+        weight = self.weight(process)
+        self._weight[process.pid] = weight
+        slept = self._sleeping.pop(process.pid, None)
+        lag = self._lag.pop(process.pid, None)
+        if lag is not None:
+            slept = self._min_vruntime + lag
+        elif slept is None or slept < self._min_vruntime:
+            slept = self._min_vruntime
+        self._vruntime[process.pid] = slept
+        self._load += weight
+
+    def _placed(self, process: Process) -> bool:
+        return process.pid in self._vruntime
+
+    def _slice(self, pid: int) -> int:
+        """The share of the target latency of a running process, in ticks."""
+        share = -(-self.target_latency * self._weight[pid] // self._load)
+        return share if share > self.min_granularity else self.min_granularity
+
+    def get_next_process(
+        self, ready_queue, current_process, current_runtime, _remaining_times
+    ):
+        """Runs the process with the smallest vruntime for its slice.
+
+        Args:
+          ready_queue: The fair run queue of waiting processes.
+          current_process: The process currently occupying the CPU.
+          current_runtime: Ticks elapsed since the current process was dispatched.
+          _remaining_times: Unused.
+
+        Returns:
+          Process | None: The process to run next, or None for an idle CPU.
+        """
+        vruntime = self._vruntime
+        leftmost = ready_queue.peek()
+        # Charge the current process for the time it ran since the last call,
+        # then move the queue's minimum vruntime forward
+        if current_process is not None:
+            pid = current_process.pid
+            ran = current_runtime - self._charged.get(pid, 0)
+            if ran:
+                vruntime[pid] += ran * ((NICE_0_WEIGHT << _VRUNTIME_SHIFT) // self._weight[pid])
+                self._ran[pid] = self._ran.get(pid, 0) + ran
+                self._charged[pid] = current_runtime
+            low = vruntime[pid]
+            if leftmost is not None and vruntime[leftmost.pid] < low:
+                low = vruntime[leftmost.pid]
+        else:
+            low = vruntime[leftmost.pid] if leftmost is not None else self._min_vruntime
+        if low > self._min_vruntime:
+            self._min_vruntime = low
+        ready_queue.admit()
+
+        if current_process is None:
+            return self._dispatch(ready_queue.pop()) if ready_queue else None
+
+        if current_runtime - self._slice_start.get(pid, 0) < self._slice(pid):
+            return current_process
+
+        # Slice over: give way if someone is further behind
+        leftmost = ready_queue.peek()
+        if leftmost is not None and (vruntime[leftmost.pid], leftmost.pid) < (vruntime[pid], pid):
+            del self._charged[pid]
+            self._slice_start.pop(pid, None)
+            ready_queue.append(current_process)
+            return self._dispatch(ready_queue.pop())
+        self._slice_start[pid] = current_runtime
+        return current_process
+
+    def _dispatch(self, process: Process) -> Process:
+        self._charged[process.pid] = 0
+        self._slice_start[process.pid] = 0
+        return process
+
+    def preemption_horizon(
+        self, ready_queue, current_process, current_runtime, _remaining_times
+    ):
+        """The decision holds until the current slice ends.
+
+        Args:
+          ready_queue: The fair run queue of waiting processes.
+          current_process: The process that was just picked.
+          current_runtime: Ticks elapsed since the current process was dispatched.
+          _remaining_times: Unused.
+
+        Returns:
+          int | None: Ticks left in the slice, or None when the CPU is idle.
+        """
+        if current_process is None:
+            return None
+        pid = current_process.pid
+        return max(self._slice(pid) - (current_runtime - self._slice_start.get(pid, 0)), 1)
+
+
+# Stride of a process with one ticket; strides and passes are integers in
+# these units, so they add up exactly however often they are charged
+_STRIDE1 = 1 << 20
+
+
+class _Shares:
+    """Tracks the CPU time runnable processes are owed by their tickets.
+
+    Whatever CPU time is handed out is owed to the runnable processes in
+    proportion to their tickets. ``virtual`` is the CPU time owed per ticket
+    so far; it only moves on when a process joins or leaves, so it does not
+    depend on how often the engine asks for decisions. A finished process
+    is summed into the fairness figures and forgotten.
+    """
+
+    def __init__(self):
+        self.tickets: Dict[int, int] = {}  # PID -> tickets, while runnable
+        self.total = 0
+        self.virtual = 0.0
+        self._pending = 0  # CPU time charged since ``virtual`` last moved
+        self._joined: Dict[int, float] = {}  # PID -> ``virtual`` when it joined
+        self._owed: Dict[int, float] = {}  # PID -> CPU time owed in earlier stints
+        self._ran: Dict[int, int] = {}  # PID -> CPU time charged
+        # Over finished processes: count, sum and sum of squares of
+        # received / owed, CPU time owed and how much it was missed by
+        self._count = 0
+        self._sum = 0.0
+        self._squares = 0.0
+        self._owed_total = 0.0
+        self._error = 0.0
+
+    def _flush(self):
+        if self._pending:
+            self.virtual += self._pending / self.total
+            self._pending = 0
+
+    def join(self, pid: int, tickets: int):
+        self._flush()
+        self.tickets[pid] = tickets
+        self._joined[pid] = self.virtual
+        self.total += tickets
+
+    def charge(self, pid: int, ran: int):
+        self._pending += ran
+        self._ran[pid] = self._ran.get(pid, 0) + ran
+
+    def ran(self, pid: int) -> int:
+        return self._ran.get(pid, 0)
+
+    def leave(self, pid: int):
+        self._flush()
+        tickets = self.tickets.pop(pid)
+        self._owed[pid] = self._owed.get(pid, 0.0) + tickets * (self.virtual - self._joined.pop(pid))
+        self.total -= tickets
+
+    def hand_over(self, pid: int) -> tuple:
+        """Forgets a process moving to another CPU; returns its owed and received CPU time."""
+        if pid in self.tickets:
+            self.leave(pid)
+        return self._owed.pop(pid, 0.0), self._ran.pop(pid, 0)
+
+    def take_over(self, pid: int, owed: float, ran: int):
+        """Continues the accounts ``hand_over`` returned, before the process joins."""
+        self._owed[pid] = owed
+        self._ran[pid] = ran
+
+    def absorb(self, other: "_Shares"):
+        """Adds the fairness figures of another CPU's finished processes."""
+        self._count += other._count
+        self._sum += other._sum
+        self._squares += other._squares
+        self._owed_total += other._owed_total
+        self._error += other._error
+
+    def finish(self, pid: int):
+        if pid in self.tickets:
+            self.leave(pid)
+        owed = self._owed.pop(pid, 0.0)
+        ran = self._ran.pop(pid, 0)
+        if owed > 0:
+            share = ran / owed
+            self._count += 1
+            self._sum += share
+            self._squares += share * share
+            self._owed_total += owed
+            self._error += abs(ran - owed)
+
+    def summary(self) -> Dict:
+        """The fairness figures over the finished processes.
+
+        ``share_error`` is the CPU time given to the wrong process, relative
+        to all the CPU time handed out (0 is perfectly proportional), and
+        ``jain_index`` is Jain's fairness index of received / owed CPU time
+        (1 is perfectly proportional, 1/n the least fair).
+        """
+        return {
+            "share_error": self._error / self._owed_total if self._owed_total else 0.0,
+            "jain_index": self._sum * self._sum / (self._count * self._squares) if self._squares else 1.0,
+            "processes": self._count,
+        }
+
+
+class _ProportionalShare(SchedulerPolicy):
+    """What lottery and stride scheduling share: tickets, quanta and accounting.
+
+    The running process keeps the CPU for ``time_quantum`` ticks, after
+    which ``_yields`` decides whether it goes back to the queue for the
+    next pick. Subclasses provide the run queue, ``_place``, ``_yields``
+    and ``_advance``.
+    """
+
+    def __init__(self, time_quantum: int, tickets):
+        if time_quantum < 1:
+            raise ValueError("time_quantum must be at least 1.")
+        self.time_quantum = time_quantum
+        self.tickets = tickets
+        self._reset()
+
+    def _reset(self):
+        self._shares: Optional[_Shares] = None
+        self._charged: Dict[int, int] = {}  # PID -> runtime already charged
+        self._slice_start: Dict[int, int] = {}  # PID -> runtime when its quantum began
+
+    def tickets_of(self, process: Process) -> int:
+        """The tickets of a process.
+
+        From ``tickets`` if given (a dict of PID to tickets, where PIDs
+        missing from it fall back to the default, or a callable taking the
+        process), else its ``priority_time`` read as a nice value, weighted
+        like ``CFS.weight``.
+        """
+        tickets = self.tickets
+        if tickets is None:
+            value = CFS.weight(process)
+        elif callable(tickets):
+            value = tickets(process)
+        else:
+            value = tickets.get(process.pid)
+            if value is None:
+                value = CFS.weight(process)
+        if value < 1:
+            raise ValueError(f"P{process.pid} needs at least one ticket, got {value}.")
+        return value
+
+    def _placed(self, process: Process) -> bool:
+        return process.pid in self._shares.tickets
+
+    def _charge(self, pid: int, ran: int):
+        if ran:
+            self._shares.charge(pid, ran)
+            self._advance(pid, ran)
+
+    def _advance(self, pid: int, ran: int):
+        """Accounts for ``ran`` more ticks of CPU time of ``pid``."""
+
+    def on_finish(self, process, _time):
+        """Sums up how fairly a finished process was treated and forgets it."""
+        pid = process.pid
+        if self._shares is None or pid not in self._shares.tickets:
+            return
+        self._charge(pid, process.cpu_time - self._shares.ran(pid))
+        self._shares.finish(pid)
+        self._charged.pop(pid, None)
+        self._slice_start.pop(pid, None)
+
+    def on_block(self, process, runtime, _time):
+        """Takes a process blocked on I/O out of the runnable set until it wakes up."""
+        pid = process.pid
+        self._charge(pid, runtime - self._charged.pop(pid, 0))
+        self._slice_start.pop(pid, None)
+        self._shares.leave(pid)
+
+    def on_migrate_out(self, process, _time):
+        """Takes a process moving to another CPU out of the runnable set."""
+        pid = process.pid
+        self._charged.pop(pid, None)
+        self._slice_start.pop(pid, None)
+        return self._shares.hand_over(pid)
+
+    def on_migrate_in(self, process, state, _time):
+        """Carries on the fairness accounts a process had on another CPU."""
+        if state is not None:
+            self._shares.take_over(process.pid, *state)
+
+    def report(self):
+        """The ``fairness`` of the CPU time finished processes got (see ``_Shares.summary``)."""
+        return {"fairness": self._shares.summary()} if self._shares is not None else {}
+
+    def merge_reports(self, copies):
+        """The ``fairness`` over the finished processes of all copies.
+
+        A process moving between CPUs takes its accounts along (see
+        ``on_migrate_out``), so each one is summed up once, where it finished.
+        """
+        shares = _Shares()
+        ran = False
+        for copy in copies:
+            if copy._shares is not None:
+                shares.absorb(copy._shares)
+                ran = True
+        return {"fairness": shares.summary()} if ran else {}
+
+    def get_next_process(
+        self, ready_queue, current_process, current_runtime, _remaining_times
+    ):
+        """Keeps the current process for its quantum, then picks again.
+
+        Args:
+          ready_queue: The run queue of waiting processes.
+          current_process: The process currently occupying the CPU.
+          current_runtime: Ticks elapsed since the current process was dispatched.
+          _remaining_times: Unused.
+
+        Returns:
+          Process | None: The process to run next, or None for an idle CPU.
+        """
+        # Charge the current process before anyone new joins the shares
+        if current_process is not None:
+            pid = current_process.pid
+            self._charge(pid, current_runtime - self._charged.get(pid, 0))
+            self._charged[pid] = current_runtime
+        ready_queue.admit()
+
+        if current_process is None:
+            return self._dispatch(ready_queue.pop()) if ready_queue else None
+
+        if current_runtime - self._slice_start.get(pid, 0) < self.time_quantum:
+            return current_process
+
+        # Quantum over: pick again if anyone else is waiting
+        if ready_queue and self._yields(current_process, ready_queue):
+            ready_queue.append(current_process)
+            next_process = ready_queue.pop()
+            if next_process is not current_process:
+                del self._charged[pid]
+                self._slice_start.pop(pid, None)
+                return self._dispatch(next_process)
+        self._slice_start[pid] = current_runtime
+        return current_process
+
+    def _yields(self, process: Process, ready_queue) -> bool:
+        """Whether the process whose quantum is over takes part in a new pick."""
+        return True
+
+    def _dispatch(self, process: Process) -> Process:
+        self._charged[process.pid] = 0
+        self._slice_start[process.pid] = 0
+        return process
+
+    def preemption_horizon(
+        self, ready_queue, current_process, current_runtime, _remaining_times
+    ):
+        """The decision holds until the current quantum ends.
+
+        Args:
+          ready_queue: The run queue of waiting processes.
+          current_process: The process that was just picked.
+          current_runtime: Ticks elapsed since the current process was dispatched.
+          _remaining_times: Unused.
+
+        Returns:
+          int | None: Ticks left in the quantum, or None when the CPU is idle.
+        """
+        if current_process is None:
+            return None
+        return max(self.time_quantum - (current_runtime - self._slice_start.get(current_process.pid, 0)), 1)
+
+
+class _LotteryRunQueue(_PlacingQueue, LotteryQueue):
+    """The lottery run queue: a ``LotteryQueue`` that places new arrivals lazily."""
+
+    def __init__(self, policy: "Lottery"):
+        super().__init__(policy, policy._held, random.Random(policy.seed))
+
+
+class Lottery(_ProportionalShare):
+    """Lottery scheduling.
+
+    Every ``time_quantum`` ticks the CPU goes to a process drawn at random
+    from the runnable ones (the current process included), each with a
+    chance proportional to its tickets. Over many quanta every process gets
+    a share of the CPU proportional to its tickets; over few it may not.
+
+    Tickets come from ``priority_time`` read as a nice value (see
+    ``CFS.weight``) unless given explicitly. Waiting processes are kept in
+    a ``LotteryQueue``, so a draw is O(log n) instead of a walk through the
+    whole queue. The output gets a ``fairness`` entry comparing the CPU
+    time every finished process got with what its tickets entitled it to.
+
+    Args:
+      time_quantum: Ticks between draws.
+      tickets: Tickets per PID (a dict) or per process (a callable).
+        (Default value = None, from ``priority_time``)
+      seed: Seed of the draws; runs with the same seed draw the same
+        winners. (Default value = 0, None for an unseeded generator)
+    """
+
+    def __init__(
+        self,
+        time_quantum: int,
+        tickets: Optional[Union[Dict[int, int], Callable[[Process], int]]] = None,
+        seed: Optional[int] = 0,
+    ):
+        self.seed = seed
+        super().__init__(time_quantum, tickets)
+
+    def _held(self, process: Process) -> int:
+        return self._shares.tickets[process.pid]
+
+    def create_ready_queue(self, _remaining_times):
+        """A Fenwick tree of tickets that places new arrivals lazily."""
+        self._reset()
+        self._shares = _Shares()
+        return _LotteryRunQueue(self)
+
+    def _place(self, process: Process):
+        self._shares.join(process.pid, self.tickets_of(process))
+
+    def cache_key(self):
+        """Unseeded draws differ from run to run and are never cached."""
+        return super().cache_key() if self.seed is not None else None
+
+
+class _StrideQueue(_PlacingQueue, HeapQueue):
+    """The stride run queue: a heap on ``(pass, pid)`` that places new arrivals lazily."""
+
+    def __init__(self, policy: "Stride"):
+        super().__init__(policy, key=self._order)
+
+    def _order(self, process: Process):
+        return self._policy._pass[process.pid], process.pid
+
+
+class Stride(_ProportionalShare):
+    """Stride scheduling, the deterministic counterpart of lottery scheduling.
+
+    Every process has a stride inversely proportional to its tickets and a
+    pass that grows by its stride for every tick it runs. Every
+    ``time_quantum`` ticks the process with the smallest pass runs next
+    (ties go to the lower PID), so the shares of the CPU follow the tickets
+    within a quantum or so at any time, without any randomness.
+
+    New processes start at the global pass, the pass of a process that got
+    exactly its share. Processes blocked on I/O keep their distance to it
+    and come back at that distance when they wake up.
+
+    Tickets work as for ``Lottery``, and so does the ``fairness`` entry of
+    the output. Waiting processes are kept in a heap on ``(pass, pid)``.
+
+    Args:
+      time_quantum: Ticks between picks.
+      tickets: Tickets per PID (a dict) or per process (a callable).
+        (Default value = None, from ``priority_time``)
+    """
+
+    def __init__(
+        self,
+        time_quantum: int,
+        tickets: Optional[Union[Dict[int, int], Callable[[Process], int]]] = None,
+    ):
+        super().__init__(time_quantum, tickets)
+
+    def _reset(self):
+        super()._reset()
+        self._pass: Dict[int, int] = {}  # PID -> pass, while runnable
+        self._stride: Dict[int, int] = {}
+        self._remain: Dict[int, int] = {}  # PID -> pass - global pass, while blocked
+
+    def _global_pass(self) -> int:
+        return int(self._shares.virtual * _STRIDE1 + 0.5)
+
+    def create_ready_queue(self, _remaining_times):
+        """A heap on (pass, PID) that places new arrivals lazily."""
+        self._reset()
+        self._shares = _Shares()
+        return _StrideQueue(self)
+
+    def _place(self, process: Process):
+        pid = process.pid
+        tickets = self.tickets_of(process)
+        self._shares.join(pid, tickets)
+        self._stride[pid] = max(_STRIDE1 // tickets, 1)
+        self._pass[pid] = self._global_pass() + self._remain.pop(pid, 0)
+
+    def _advance(self, pid, ran):
+        self._pass[pid] += self._stride[pid] * ran
+
+    def _yields(self, process, ready_queue):
+        """Only if a waiting process now has a smaller pass."""
+        head = ready_queue.peek()
+        return head is not None and (self._pass[head.pid], head.pid) < (self._pass[process.pid], process.pid)
+
+    def on_finish(self, process, time):
+        super().on_finish(process, time)
+        for table in (self._pass, self._stride, self._remain):
+            table.pop(process.pid, None)
+
+    def on_block(self, process, runtime, time):
+        super().on_block(process, runtime, time)
+        pid = process.pid
+        self._remain[pid] = self._pass.pop(pid) - self._global_pass()
+        del self._stride[pid]
+
+    def on_migrate_out(self, process, time):
+        """Hands over the distance of a process's pass to the global pass, too."""
+        pid = process.pid
+        shares = super().on_migrate_out(process, time)
+        remain = self._pass.pop(pid) - self._global_pass() if pid in self._pass else 0
+        self._stride.pop(pid, None)
+        return shares, remain
+
+    def on_migrate_in(self, process, state, time):
+        """Places a process from another CPU at the same distance from the global pass."""
+        if state is not None:
+            shares, self._remain[process.pid] = state
+            super().on_migrate_in(process, shares, time)
+
+
+# Processes without a deadline (or a period) rank after all that have one
+_NEVER = float("inf")
+
+
+def _deadline_key(process: Process):
+    # Module-level functions (not lambdas), so queues keyed on them can be pickled
+    deadline = process.deadline if process.deadline is not None else _NEVER
+    return deadline, process.arrival_time, process.pid
+
+
+def _rate_key(process: Process):
+    task = process.task
+    if task is None:
+        return _NEVER, 0, process.arrival_time, process.pid
+    return task.period, task.task_id, process.arrival_time, process.pid
+
+
+class _KeyedPreemptive(SchedulerPolicy):
+    """A preemptive policy that always runs the process with the smallest ``_key``.
+
+    Waiting processes are kept in a heap on it. The key of a process never
+    changes, so a newly arrived process preempts the current one exactly
+    when its key is smaller, and nothing else can. Subclasses set ``_key``.
+    """
+
+    def create_ready_queue(self, _remaining_times):
+        """Ready queue ordered by the policy's key."""
+        return HeapQueue(key=type(self)._key)
+
+    def get_next_process(
+        self, ready_queue, current_process, _current_runtime, _remaining_times
+    ):
+        """Preempts the current process if a waiting one ranks higher.
+
+        Args:
+          ready_queue: The queue from ``create_ready_queue`` (O(log n)), or
+            any list of processes (scanned).
+          current_process: The process currently occupying the CPU.
+          _current_runtime: Unused.
+          _remaining_times: Unused.
+
+        Returns:
+          Process | None: The process to run next, or None for an idle CPU.
+        """
+        best = _peek_best(ready_queue, self._key)
+        if current_process is None:
+            return _pop_best(ready_queue, self._key) if best is not None else None
+        if best is not None and self._key(best) < self._key(current_process):
+            _pop_best(ready_queue, self._key)
+            ready_queue.append(current_process)
+            return best
+        return current_process
+
+    def preemption_horizon(
+        self, _ready_queue, _current_process, _current_runtime, _remaining_times
+    ):
+        """Only an arrival or a completion can change the decision."""
+        return None
+
+
+class EDF(_KeyedPreemptive):
+    """Earliest Deadline First (EDF) scheduling policy.
+
+    Always runs the process with the earliest absolute ``deadline``,
+    preempting the current one when a process with an earlier deadline
+    arrives. Ties go to the earlier arrival, then the lower PID; processes
+    without a deadline only run when nobody with one is waiting.
+
+    On one CPU without switch costs, EDF meets every deadline whenever any
+    policy can (see ``vance.realtime.check_schedulability``).
+    """
+
+    _key = staticmethod(_deadline_key)
+
+
+class RateMonotonic(_KeyedPreemptive):
+    """Rate-Monotonic (RM) scheduling policy.
+
+    A fixed-priority policy for jobs of periodic tasks (see
+    ``vance.realtime``): the shorter its task's period, the higher a job's
+    priority, and a higher-priority arrival preempts the current job. Equal
+    periods go by task ID, then arrival and PID; processes without a task
+    come last.
+    """
+
+    _key = staticmethod(_rate_key)
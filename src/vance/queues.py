@@ -0,0 +1,348 @@
+from .types import Process
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from collections import deque
+import heapq
+import random
+
+
+def pop_head(queue) -> Process:
+    """Removes and returns the head of the line of any ready queue.
+
+    The head is the process the queue would hand out next: the first in
+    line of a ``FIFOQueue`` or ``MultiLevelQueue``, the smallest key of a
+    ``HeapQueue``, the winner of a ``LotteryQueue`` draw. All of them have
+    ``popleft`` for it; any other queue, like a plain list, gets ``pop(0)``.
+
+    Args:
+      queue: The ready queue.
+    """
+    popleft = getattr(queue, "popleft", None)
+    return popleft() if popleft is not None else queue.pop(0)
+
+
+class FIFOQueue(deque):
+    """A first-come, first-served ready queue backed by a deque.
+
+    ``append`` and ``popleft`` are O(1). It also behaves like the plain list
+    that custom policies were written against: ``pop(0)`` takes the head of
+    the line in O(1), and indexing, ``remove``, ``insert`` and ``sort`` work
+    as they do on a list.
+    """
+
+    def peek(self) -> Optional[Process]:
+        """Returns the head of the line without removing it."""
+        return self[0] if self else None
+
+    def pop(self, index: int = -1) -> Process:
+        """Removes and returns the process at ``index`` (list semantics).
+
+        Args:
+          index: int: Position to pop, the tail by default. (Default value = -1)
+        """
+        if index == 0 or index == -len(self):
+            return self.popleft()
+        if index == -1 or index == len(self) - 1:
+            return super().pop()
+        if not -len(self) <= index < len(self):
+            raise IndexError("pop index out of range")
+        process = self[index]
+        del self[index]
+        return process
+
+    def sort(self, *, key=None, reverse: bool = False):
+        """Sorts the queue in place, like ``list.sort``."""
+        ordered = sorted(self, key=key, reverse=reverse)
+        self.clear()
+        self.extend(ordered)
+
+
+class HeapQueue:
+    """A ready queue that always hands out the process with the smallest key.
+
+    Backed by a binary heap, so ``append``, ``pop`` and ``remove`` cost
+    O(log n) instead of the O(n) ``min`` + ``list.remove`` scan. Entries are
+    ordered by ``key(process)`` and then by insertion order, which is exactly
+    how ``min`` breaks ties on a list that is appended to in arrival order.
+
+    Removing an arbitrary process is done lazily: its heap entry is only
+    marked as dead and gets discarded once it reaches the top.
+
+    Args:
+      key: Callable[[Process], Any]: Computes the ordering key of a process
+        at the time it enters the queue.
+    """
+
+    def __init__(self, key: Callable[[Process], Any]):
+        self._key = key
+        self._heap: List[list] = []  # [key, seq, process, alive]
+        self._entries: Dict[Process, List[list]] = {}
+        self._seq = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Process]:
+        """Yields the queued processes in no particular order."""
+        return (entry[2] for entry in self._heap if entry[3])
+
+    def __contains__(self, process: Process) -> bool:
+        return process in self._entries
+
+    def append(self, process: Process):
+        """Adds a process to the queue.
+
+        Args:
+          process: Process: The process that became ready.
+        """
+        entry = [self._key(process), self._seq, process, True]
+        self._seq += 1
+        heapq.heappush(self._heap, entry)
+        self._entries.setdefault(process, []).append(entry)
+        self._size += 1
+
+    def peek(self) -> Optional[Process]:
+        """Returns the process with the smallest key without removing it."""
+        self._drop_dead()
+        return self._heap[0][2] if self._heap else None
+
+    def pop(self) -> Process:
+        """Removes and returns the process with the smallest key."""
+        self._drop_dead()
+        if not self._heap:
+            raise IndexError("pop from an empty ready queue")
+        entry = heapq.heappop(self._heap)
+        self._forget(entry)
+        return entry[2]
+
+    def popleft(self) -> Process:
+        """Same as ``pop``: the head of the line has the smallest key."""
+        return self.pop()
+
+    def remove(self, process: Process):
+        """Removes a specific process from the queue.
+
+        Args:
+          process: Process: The process to take out of the queue.
+        """
+        entries = self._entries.get(process)
+        if not entries:
+            raise ValueError(f"P{process.pid} is not in the ready queue")
+        entries[0][3] = False
+        self._forget(entries[0])
+
+    def _forget(self, entry: list):
+        entries = self._entries[entry[2]]
+        entries.remove(entry)
+        if not entries:
+            del self._entries[entry[2]]
+        self._size -= 1
+
+    def _drop_dead(self):
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+
+
+class MultiLevelQueue:
+    """A ready queue split into priority levels, level 0 being the highest.
+
+    Every level is a FIFO deque, and a bitmap records which levels are
+    non-empty (like the O(1) scheduler in old Linux kernels), so ``pop``
+    finds the highest non-empty level with one bit trick instead of
+    scanning every level.
+
+    Args:
+      levels: int: Number of priority levels.
+      level_of: Callable[[Process], int]: The level a process is queued at
+        when it is appended.
+    """
+
+    def __init__(self, levels: int, level_of: Callable[[Process], int]):
+        self._queues: List[deque] = [deque() for _ in range(levels)]
+        self._level_of = level_of
+        self._bitmap = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Process]:
+        """Yields the queued processes from the highest level down."""
+        for queue in self._queues:
+            yield from queue
+
+    def __contains__(self, process: Process) -> bool:
+        return process in self._queues[self._level_of(process)]
+
+    def append(self, process: Process):
+        """Adds a process to the tail of its level.
+
+        Args:
+          process: Process: The process that became ready.
+        """
+        level = self._level_of(process)
+        self._queues[level].append(process)
+        self._bitmap |= 1 << level
+        self._size += 1
+
+    def top_level(self) -> Optional[int]:
+        """The highest non-empty level, or None if the queue is empty."""
+        bitmap = self._bitmap
+        return (bitmap & -bitmap).bit_length() - 1 if bitmap else None
+
+    def peek(self) -> Optional[Process]:
+        """Returns the head of the highest non-empty level without removing it."""
+        level = self.top_level()
+        return self._queues[level][0] if level is not None else None
+
+    def pop(self) -> Process:
+        """Removes and returns the head of the highest non-empty level."""
+        level = self.top_level()
+        if level is None:
+            raise IndexError("pop from an empty ready queue")
+        queue = self._queues[level]
+        process = queue.popleft()
+        if not queue:
+            self._bitmap &= ~(1 << level)
+        self._size -= 1
+        return process
+
+    popleft = pop
+
+    def remove(self, process: Process):
+        """Removes a specific process from the queue.
+
+        Args:
+          process: Process: The process to take out of the queue.
+        """
+        level = self._level_of(process)
+        queue = self._queues[level]
+        queue.remove(process)
+        if not queue:
+            self._bitmap &= ~(1 << level)
+        self._size -= 1
+
+    def boost(self):
+        """Moves every queued process to level 0, keeping their order."""
+        top = self._queues[0]
+        for queue in self._queues[1:]:
+            top.extend(queue)
+            queue.clear()
+        self._bitmap = 1 if top else 0
+
+
+class LotteryQueue:
+    """A ready queue that hands out a process at random, weighted by its tickets.
+
+    Every queued process owns a slot in a Fenwick (binary indexed) tree of
+    ticket counts, so ``append``, ``remove`` and drawing the winner in
+    ``pop`` all cost O(log n), instead of summing the tickets of the whole
+    queue for every draw. Freed slots are reused; the tree doubles (and is
+    rebuilt in O(n)) when it runs out.
+
+    Args:
+      tickets: Callable[[Process], int]: The tickets of a process (at least
+        1), read when it enters the queue.
+      rng: random.Random: Source of the draws. (Default value = None, a new
+        unseeded one)
+    """
+
+    def __init__(self, tickets: Callable[[Process], int], rng: Optional[random.Random] = None):
+        self._tickets = tickets
+        self._rng = rng if rng is not None else random.Random()
+        self._tree: List[int] = [0] * 9  # 1-based; _tree[0] is unused
+        self._weights: List[int] = [0] * 9
+        self._slots: List[Optional[Process]] = [None] * 9
+        self._slot_of: Dict[Process, int] = {}
+        self._free: List[int] = list(range(8, 0, -1))
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __iter__(self) -> Iterator[Process]:
+        """Yields the queued processes in slot order."""
+        return (process for process in self._slots if process is not None)
+
+    def __contains__(self, process: Process) -> bool:
+        return process in self._slot_of
+
+    def append(self, process: Process):
+        """Adds a process with its tickets.
+
+        Args:
+          process: Process: The process that became ready.
+        """
+        tickets = self._tickets(process)
+        if tickets < 1:
+            raise ValueError(f"P{process.pid} needs at least one ticket, got {tickets}.")
+        if process in self._slot_of:
+            raise ValueError(f"P{process.pid} is already in the ready queue")
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._slots[slot] = process
+        self._slot_of[process] = slot
+        self._weights[slot] = tickets
+        self._add(slot, tickets)
+
+    def pop(self) -> Process:
+        """Removes and returns a process drawn with probability proportional to its tickets."""
+        if not self._slot_of:
+            raise IndexError("pop from an empty ready queue")
+        process = self._slots[self._find(self._rng.randrange(self.total))]
+        self.remove(process)
+        return process
+
+    def popleft(self) -> Process:
+        """Same as ``pop``: the head of the line is the winner of a draw."""
+        return self.pop()
+
+    def remove(self, process: Process):
+        """Removes a specific process from the queue.
+
+        Args:
+          process: Process: The process to take out of the queue.
+        """
+        slot = self._slot_of.pop(process, None)
+        if slot is None:
+            raise ValueError(f"P{process.pid} is not in the ready queue")
+        self._add(slot, -self._weights[slot])
+        self._weights[slot] = 0
+        self._slots[slot] = None
+        self._free.append(slot)
+
+    def _add(self, slot: int, delta: int):
+        tree = self._tree
+        size = len(tree)
+        while slot < size:
+            tree[slot] += delta
+            slot += slot & -slot
+        self.total += delta
+
+    def _find(self, ticket: int) -> int:
+        """The slot holding the ``ticket``-th ticket (0-based), by binary lifting."""
+        tree = self._tree
+        slot = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = slot + step
+            if nxt < len(tree) and tree[nxt] <= ticket:
+                slot = nxt
+                ticket -= tree[nxt]
+            step >>= 1
+        return slot + 1
+
+    def _grow(self):
+        """Doubles the number of slots and rebuilds the tree."""
+        old = len(self._weights) - 1
+        new = 2 * old
+        self._weights.extend([0] * old)
+        self._slots.extend([None] * old)
+        self._free.extend(range(new, old, -1))
+        tree = list(self._weights)
+        for slot in range(1, new + 1):
+            parent = slot + (slot & -slot)
+            if parent <= new:
+                tree[parent] += tree[slot]
+        self._tree = tree
@@ -0,0 +1,324 @@
+"""Real-time tasks: job releases, deadline accounting and schedulability.
+
+A ``PeriodicTask`` releases a job every ``period`` ticks, a
+``SporadicTask`` at least that far apart. ``releases`` expands tasks into
+jobs lazily and in release order, so an endless stream can go straight to
+``StreamingEngine.stream``. Every job is a ``Process`` with an absolute
+``deadline``, and engines sum up how the deadlines went in the output's
+``deadlines`` entry (see ``DeadlineStats``).
+
+``check_schedulability`` tells whether a task set provably meets every
+deadline under ``EDF`` or ``RateMonotonic``, and ``simulate`` can skip
+the simulation when it does.
+
+Example:
+
+    from vance import EventEngine, EDF, PeriodicTask
+    from vance.realtime import check_schedulability, releases
+
+    tasks = [PeriodicTask(0, period=10, wcet=3), PeriodicTask(1, period=15, wcet=5, deadline=12)]
+    print(check_schedulability(tasks, EDF()).feasible)
+    res = EventEngine(EDF(), trace_level="OFF").run(list(releases(tasks, horizon=300)))
+    print(res["deadlines"]["miss_ratio"], res["deadlines"]["max_lateness"])
+"""
+from .types import PeriodicTask, Process, SporadicTask
+from .policies import EDF, RateMonotonic, SchedulerPolicy
+from .stats import ExactQuantiles, KLLSketch, PERCENTILES
+from dataclasses import asdict, dataclass
+from fractions import Fraction
+from typing import Dict, Iterable, Iterator, List, Optional
+import heapq
+import math
+import random
+
+
+def _validate(tasks: List[PeriodicTask]):
+    seen = set()
+    for task in tasks:
+        if task.period < 1 or task.wcet < 1 or task.relative_deadline < 1:
+            raise ValueError(f"Task {task.task_id} needs a positive period, wcet and deadline.")
+        if task.offset < 0:
+            raise ValueError(f"Task {task.task_id} has a negative offset.")
+        if isinstance(task, SporadicTask) and task.max_delay is not None and task.max_delay < 0:
+            raise ValueError(f"Task {task.task_id} has a negative max_delay.")
+        if task.task_id in seen:
+            raise ValueError(f"Task ID {task.task_id} is used twice.")
+        seen.add(task.task_id)
+
+
+def _task_releases(task: PeriodicTask, seed: Optional[int]) -> Iterator[tuple]:
+    """Endless ``(release, task_id, task)`` of one task."""
+    release = task.offset
+    if isinstance(task, SporadicTask):
+        # One generator per task, so its releases do not depend on the others
+        rng = random.Random(f"{seed}:{task.task_id}")
+        max_delay = task.max_delay if task.max_delay is not None else task.period
+        while True:
+            yield release, task.task_id, task
+            release += task.period + rng.randint(0, max_delay)
+    while True:
+        yield release, task.task_id, task
+        release += task.period
+
+
+def releases(
+    tasks: Iterable[PeriodicTask],
+    horizon: Optional[int] = None,
+    first_pid: int = 0,
+    seed: Optional[int] = 0,
+) -> Iterator[Process]:
+    """The jobs of ``tasks``, one ``Process`` per release, in release order.
+
+    Jobs are created as they are taken, so memory does not grow with the
+    horizon. PIDs count up from ``first_pid`` in release order; jobs
+    released at the same time go by task ID.
+
+    Args:
+      tasks: Iterable[PeriodicTask]: The task set.
+      horizon: Optional[int]: Only jobs released before it.
+        (Default value = None, endless)
+      first_pid: int: PID of the first job. (Default value = 0)
+      seed: Optional[int]: Seed of the sporadic tasks' gaps. (Default value = 0)
+
+    Yields:
+      Process: Jobs needing ``wcet`` ticks, with their absolute deadline and task.
+    """
+    tasks = list(tasks)
+    _validate(tasks)
+    pid = first_pid
+    for release, _, task in heapq.merge(*(_task_releases(task, seed) for task in tasks)):
+        if horizon is not None and release >= horizon:
+            return
+        yield Process(pid, task.wcet, release, deadline=release + task.relative_deadline, task=task)
+        pid += 1
+
+
+def utilization(tasks: Iterable[PeriodicTask]) -> float:
+    """The share of a CPU the tasks need: the sum of ``wcet / period``."""
+    return float(sum(Fraction(task.wcet, task.period) for task in tasks))
+
+
+class DeadlineStats:
+    """Deadline misses, lateness and per-task response times of completed jobs.
+
+    Engines keep one for runs with deadlines and put its ``summary`` in the
+    output as ``deadlines``. A job misses its deadline when it completes
+    after it; its lateness is the completion time minus the deadline, so
+    negative for jobs that made it.
+
+    Args:
+      exact: Keep every response time instead of sketching them.
+        (Default value = True)
+    """
+
+    def __init__(self, exact: bool = True):
+        self.exact = exact
+        self.jobs = 0
+        self.missed = 0
+        self.max_lateness: Optional[int] = None
+        # Task ID -> [jobs, missed, response time estimator]
+        self.tasks: Dict[int, list] = {}
+
+    def record(self, process: Process, finish_time: int):
+        """Adds a completed process that has a deadline."""
+        lateness = finish_time - process.deadline
+        missed = lateness > 0
+        self.jobs += 1
+        self.missed += missed
+        if self.max_lateness is None or lateness > self.max_lateness:
+            self.max_lateness = lateness
+        task = process.task
+        if task is not None:
+            entry = self.tasks.get(task.task_id)
+            if entry is None:
+                entry = self.tasks[task.task_id] = [0, 0, ExactQuantiles() if self.exact else KLLSketch()]
+            entry[0] += 1
+            entry[1] += missed
+            entry[2].add(finish_time - process.arrival_time)
+
+    def summary(self) -> Dict:
+        """Totals plus, per task ID, its jobs, misses and response time percentiles.
+
+        Returns:
+          dict: ``{"jobs", "missed", "miss_ratio", "max_lateness", "tasks"}``,
+          where ``tasks`` maps task IDs to ``{"jobs", "missed", "miss_ratio",
+          "response"}``.
+        """
+        tasks = {}
+        for task_id in sorted(self.tasks):
+            jobs, missed, response = self.tasks[task_id]
+            row = {f"p{p:g}": response.quantile(p / 100) or 0 for p in PERCENTILES}
+            row["max"] = response.max or 0
+            tasks[task_id] = {"jobs": jobs, "missed": missed, "miss_ratio": missed / jobs, "response": row}
+        return {
+            "jobs": self.jobs,
+            "missed": self.missed,
+            "miss_ratio": self.missed / self.jobs if self.jobs else 0.0,
+            "max_lateness": self.max_lateness if self.max_lateness is not None else 0,
+            "tasks": tasks,
+        }
+
+
+@dataclass(frozen=True)
+class Schedulability:
+    """The verdict of ``check_schedulability``.
+
+    Attributes:
+      feasible: Every job provably meets its deadline, however the releases
+        of sporadic tasks and the offsets of periodic ones fall.
+      exact: The test is exact, so when not ``feasible`` some job misses its
+        deadline if all tasks release at once and as often as they may.
+      test: The test that decided: ``"utilization"``, ``"utilization bound"``,
+        ``"density"``, ``"processor demand"`` or ``"response time"``.
+      utilization: The share of the CPU the tasks need.
+      response_times: Task ID -> worst-case response time, or None where it
+        exceeds the deadline (or the period), from response-time analysis.
+        (Default value = None, not computed)
+    """
+
+    feasible: bool
+    exact: bool
+    test: str
+    utilization: float
+    response_times: Optional[Dict[int, Optional[int]]] = None
+
+
+def check_schedulability(tasks: Iterable[PeriodicTask], policy: SchedulerPolicy) -> Schedulability:
+    """Tells whether ``tasks`` provably meet every deadline on one CPU.
+
+    For ``EDF``, implicit deadlines (no shorter than the period) are met
+    exactly when the utilization is at most 1; otherwise the density test
+    is tried first, then processor demand analysis (with Zhang and Burns'
+    QPA). For ``RateMonotonic``, the Liu and Layland utilization bound is
+    tried first, then response-time analysis. Switch costs are not taken
+    into account.
+
+    Args:
+      tasks: Iterable[PeriodicTask]: The task set.
+      policy: SchedulerPolicy: An ``EDF`` or ``RateMonotonic`` policy.
+
+    Returns:
+      Schedulability: The verdict and how it was reached.
+    """
+    tasks = list(tasks)
+    _validate(tasks)
+    if not isinstance(policy, (EDF, RateMonotonic)):
+        raise ValueError(f"No schedulability test for {type(policy).__name__}; use EDF or RateMonotonic.")
+    load = sum(Fraction(task.wcet, task.period) for task in tasks)
+    if load > 1:
+        return Schedulability(False, True, "utilization", float(load))
+    if isinstance(policy, EDF):
+        return _check_edf(tasks, load)
+    return _check_rate_monotonic(tasks, load)
+
+
+def _check_edf(tasks: List[PeriodicTask], load: Fraction) -> Schedulability:
+    if all(task.relative_deadline >= task.period for task in tasks):
+        return Schedulability(True, True, "utilization", float(load))
+    density = sum(Fraction(task.wcet, min(task.relative_deadline, task.period)) for task in tasks)
+    if density <= 1:
+        return Schedulability(True, False, "density", float(load))
+    return Schedulability(_demand_feasible(tasks, load), True, "processor demand", float(load))
+
+
+def _demand(tasks: List[PeriodicTask], t: int) -> int:
+    """The CPU time of the jobs with both release and deadline in [0, t]."""
+    return sum(
+        ((t - task.relative_deadline) // task.period + 1) * task.wcet
+        for task in tasks
+        if t >= task.relative_deadline
+    )
+
+
+def _last_deadline(tasks: List[PeriodicTask], t: int) -> int:
+    """The latest absolute deadline before ``t`` (0 if there is none)."""
+    latest = 0
+    for task in tasks:
+        deadline = task.relative_deadline
+        if deadline < t:
+            latest = max(latest, deadline + (t - 1 - deadline) // task.period * task.period)
+    return latest
+
+
+def _demand_feasible(tasks: List[PeriodicTask], load: Fraction) -> bool:
+    """Processor demand analysis of a synchronous release, by Quick Processor-demand Analysis."""
+    longest = max(task.relative_deadline for task in tasks)
+    if load < 1:
+        # No deadline can be missed for the first time after this bound
+        bound = max(longest, math.ceil(sum(
+            (task.period - task.relative_deadline) * Fraction(task.wcet, task.period) for task in tasks
+        ) / (1 - load)))
+    else:
+        bound = math.lcm(*(task.period for task in tasks)) + longest
+    shortest = min(task.relative_deadline for task in tasks)
+    t = _last_deadline(tasks, bound + 1)
+    demand = _demand(tasks, t)
+    while shortest < demand <= t:
+        t = demand if demand < t else _last_deadline(tasks, t)
+        demand = _demand(tasks, t)
+    return demand <= shortest
+
+
+def _check_rate_monotonic(tasks: List[PeriodicTask], load: Fraction) -> Schedulability:
+    n = len(tasks)
+    if all(task.relative_deadline >= task.period for task in tasks) and load <= n * (2 ** (1 / n) - 1):
+        return Schedulability(True, False, "utilization bound", float(load))
+    # Highest priority first, as RateMonotonic ranks them
+    ordered = sorted(tasks, key=lambda task: (task.period, task.task_id))
+    response_times: Dict[int, Optional[int]] = {}
+    for i, task in enumerate(ordered):
+        # A job finishing after the next release would delay it; not covered here
+        limit = min(task.relative_deadline, task.period)
+        higher = ordered[:i]
+        response = task.wcet + sum(other.wcet for other in higher)
+        while response <= limit:
+            interference = sum(-(-response // other.period) * other.wcet for other in higher)
+            if task.wcet + interference == response:
+                break
+            response = task.wcet + interference
+        response_times[task.task_id] = response if response <= limit else None
+    feasible = all(response is not None for response in response_times.values())
+    exact = all(task.relative_deadline <= task.period for task in tasks)
+    return Schedulability(feasible, exact, "response time", float(load), response_times)
+
+
+def simulate(
+    engine,
+    tasks: Iterable[PeriodicTask],
+    horizon: int,
+    seed: Optional[int] = 0,
+    skip_if_feasible: bool = False,
+) -> Dict:
+    """Runs the jobs ``tasks`` release before ``horizon``, after checking them.
+
+    For ``EDF`` and ``RateMonotonic`` engines the output gets the
+    ``schedulability`` verdict (as a dict). With ``skip_if_feasible`` a task
+    set that provably meets every deadline is not simulated at all, as
+    long as the engine has one CPU and switches for free (which the
+    analysis assumes); the output then only holds ``schedulability``.
+
+    Args:
+      engine: A fresh engine.
+      tasks: Iterable[PeriodicTask]: The task set.
+      horizon: int: Only jobs released before it.
+      seed: Optional[int]: Seed of the sporadic tasks' gaps. (Default value = 0)
+      skip_if_feasible: bool: Skip provably feasible runs. (Default value = False)
+
+    Returns:
+      The engine output, or ``{"schedulability": ...}`` when skipped.
+    """
+    tasks = list(tasks)
+    verdict = None
+    if isinstance(engine.policy, (EDF, RateMonotonic)):
+        verdict = check_schedulability(tasks, engine.policy)
+        free = (
+            engine.dispatcher.dispatch_latency == 0
+            and engine.dispatcher.cost_model is None
+            and getattr(engine, "n_cores", 1) == 1
+        )
+        if skip_if_feasible and verdict.feasible and free:
+            return {"schedulability": asdict(verdict)}
+    res = engine.run(list(releases(tasks, horizon, seed=seed)))
+    if verdict is not None:
+        res["schedulability"] = asdict(verdict)
+    return res
@@ -0,0 +1,344 @@
+"""The object engines return from ``run``.
+
+``SimulationResult`` reads like the dict engines always returned
+(``res["averages"]``, ``res["individual_results"]``, ...), but nothing is
+built until it is asked for: per-process results stay in the typed columns
+of a ``ResultTable``, and the averages, percentiles and per-process dicts
+are computed on first access. Metrics are plain numbers (utilization is a
+percentage as a float, not a string).
+
+It pickles as its columns, so a result with a million processes travels
+from a worker process as a few arrays rather than a million dicts.
+
+Example:
+
+    res = EventEngine(RR(time_quantum=4), trace_level="OFF").run(processes)
+    res["averages"]["cpu_utilization"]    # 97.5
+    cols = res.to_numpy()                 # pid, arrival, ..., wait, turnaround, response
+    df = res.to_pandas()                  # needs pandas
+"""
+from .table import ResultTable, _require_numpy
+from .stats import LatencyStats, METRICS, PERCENTILES
+from collections.abc import MutableMapping, Sequence
+from typing import Dict, Iterator, List, Optional
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Keys of an engine output that are computed on first access
+_COMPUTED = ("individual_results", "averages", "percentiles")
+
+
+def summarize(
+    n_results: int,
+    total_wait: int,
+    total_tat: int,
+    total_burst: int,
+    total_time: int,
+    total_switch_time: int,
+    cores: int = 1,
+):
+    """Computes the averages block and the throughput from run totals.
+
+    Utilization is relative to ``cores`` CPUs being available all the time.
+
+    Returns:
+      tuple: ``(averages, throughput)``.
+    """
+    # Guard against zero-division if results are empty
+    if not n_results:
+        avg_wait = 0
+        avg_tat = 0
+    else:
+        avg_wait = total_wait / n_results
+        avg_tat = total_tat / n_results
+
+    if total_time > 0:
+        utilization = (total_burst / (total_time * cores)) * 100
+    else:
+        utilization = 0.0
+
+    if (total_burst + total_switch_time) > 0:
+        efficiency = (total_burst / (total_burst + total_switch_time)) * 100
+    else:
+        efficiency = 0.0
+
+    if total_time > 0:
+        throughput = n_results / total_time
+    else:
+        throughput = 0
+
+    averages = {
+        "avg_waiting_time": round(avg_wait, 2),
+        "avg_turnaround_time": round(avg_tat, 2),
+        "cpu_utilization": utilization,
+        "hardware_efficiency": efficiency,
+    }
+    return averages, throughput
+
+
+class ResultRows(Sequence):
+    """``individual_results``: one dict per completed process, built on access.
+
+    Compares equal to a list holding the same dicts.
+
+    Args:
+      table: The results.
+      io: Add the time each process spent ``blocked`` on I/O. (Default value = False)
+    """
+
+    def __init__(self, table: ResultTable, io: bool = False):
+        self.table = table
+        self.io = io
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def _row(self, pid, arrival, burst, completion, first_run, blocked) -> Dict:
+        row = {
+            "pid": pid,
+            "arrival": arrival,
+            "burst": burst,
+            "wait": completion - arrival - burst - blocked,
+            "turnaround": completion - arrival,
+            "completion": completion,
+            "response": first_run - arrival if first_run >= 0 else None,
+        }
+        if self.io:
+            row["blocked"] = blocked
+        return row
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+        t = self.table
+        if index < 0:
+            index += len(t)
+        return self._row(
+            t.pid[index], t.arrival[index], t.burst[index], t.completion[index], t.first_run[index], t.blocked[index]
+        )
+
+    def __iter__(self) -> Iterator[Dict]:
+        t = self.table
+        row = self._row
+        for values in zip(t.pid, t.arrival, t.burst, t.completion, t.first_run, t.blocked):
+            yield row(*values)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ResultRows, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ResultRows({len(self)} processes)"
+
+
+class SimulationResult(MutableMapping):
+    """The output of a run, as a lazily computed mapping.
+
+    Keys: ``individual_results`` (a ``ResultRows``), ``averages``,
+    ``percentiles``, ``structured_trace``, ``total_time``, ``throughput``,
+    ``io`` for runs with I/O devices (see ``vance.io``), ``deadlines`` for
+    runs with deadlines (see ``vance.realtime``), plus whatever an
+    engine adds (e.g. ``cores`` for ``SMPEngine``) or the policy reports
+    (e.g. ``fairness`` for ``Lottery``).
+
+    Args:
+      table: The completed processes; the result keeps it as its own, so
+        pass a copy if the engine goes on filling it.
+      total_time: The simulated time.
+      total_burst: CPU time of all processes, completed or not.
+      total_switch_time: Time spent switching contexts.
+      cores: CPUs the utilization refers to. (Default value = 1)
+      trace: The structured trace. (Default value = None)
+      percentiles: Ready-made percentiles, e.g. from sketches.
+        (Default value = None, computed exactly from the table)
+      io: The ``IOSystem.summary`` of the run, if it had I/O. (Default value = None)
+    """
+
+    def __init__(
+        self,
+        table: ResultTable,
+        total_time: int,
+        total_burst: int,
+        total_switch_time: int,
+        cores: int = 1,
+        trace=None,
+        percentiles: Optional[Dict] = None,
+        io: Optional[Dict] = None,
+    ):
+        self.table = table
+        self.total_burst = total_burst
+        self.total_switch_time = total_switch_time
+        self.cores = cores
+        throughput = len(table) / total_time if total_time > 0 else 0
+        self._data = {"structured_trace": trace, "total_time": total_time, "throughput": throughput}
+        if percentiles is not None:
+            self._data["percentiles"] = percentiles
+        self._keys: List[str] = [
+            "individual_results", "averages", "percentiles", "structured_trace", "total_time", "throughput"
+        ]
+        self._cache: Dict = {}
+        self.has_io = io is not None
+        if io is not None:
+            self["io"] = io
+
+    # Mapping protocol
+
+    def __getitem__(self, key):
+        if key in self._data:
+            return self._data[key]
+        if key in _COMPUTED and key in self._keys:
+            if key not in self._cache:
+                self._cache[key] = getattr(self, "_" + key)()
+            return self._cache[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._cache.pop(key, None)
+        self._data[key] = value
+        if key not in self._keys:
+            self._keys.append(key)
+
+    def __delitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        self._keys.remove(key)
+        self._data.pop(key, None)
+        self._cache.pop(key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __getstate__(self):
+        # Computed entries are cheaper to recompute than to ship
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
+
+    def __repr__(self) -> str:
+        return (
+            f"SimulationResult({len(self.table)} processes, total_time={self['total_time']}, "
+            f"keys={self._keys})"
+        )
+
+    def copy(self) -> "SimulationResult":
+        """A shallow copy; removing or replacing keys in it leaves this one as is."""
+        other = type(self).__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other._data = dict(self._data)
+        other._keys = list(self._keys)
+        other._cache = dict(self._cache)
+        return other
+
+    # Computed entries
+
+    def _individual_results(self) -> ResultRows:
+        return ResultRows(self.table, self.has_io)
+
+    def _averages(self) -> Dict:
+        t = self.table
+        total_tat = sum(t.completion) - sum(t.arrival)
+        averages, _ = summarize(
+            len(t),
+            total_tat - sum(t.burst) - sum(t.blocked),
+            total_tat,
+            self.total_burst,
+            self._data["total_time"],
+            self.total_switch_time,
+            self.cores,
+        )
+        return averages
+
+    def _percentiles(self) -> Dict:
+        if np is None:
+            columns = self._columns()
+            stats = LatencyStats(exact=True)
+            stats.metrics["waiting_time"].extend(columns["wait"])
+            stats.metrics["turnaround_time"].extend(columns["turnaround"])
+            stats.metrics["response_time"].extend(r for r in columns["response"] if r is not None)
+            return stats.summary()
+        # Same nearest-rank rule as ExactQuantiles, on sorted arrays
+        columns = self.to_numpy()
+        metrics = {
+            "waiting_time": columns["wait"],
+            "turnaround_time": columns["turnaround"],
+            "response_time": columns["response"][columns["first_run"] >= 0],
+        }
+        out = {}
+        for name in METRICS:
+            ordered = np.sort(metrics[name])
+            n = len(ordered)
+            row = {
+                f"p{p:g}": int(ordered[max(math.ceil(p / 100 * n), 1) - 1]) if n else 0
+                for p in PERCENTILES
+            }
+            row["max"] = int(ordered[-1]) if n else 0
+            out[name] = row
+        return out
+
+    def _columns(self) -> Dict[str, list]:
+        t = self.table
+        return {
+            "first_run": t.first_run,
+            "wait": [c - a - b - x for a, b, c, x in zip(t.arrival, t.burst, t.completion, t.blocked)],
+            "turnaround": [c - a for a, c in zip(t.arrival, t.completion)],
+            "response": [f - a if f >= 0 else None for a, f in zip(t.arrival, t.first_run)],
+        }
+
+    # Export
+
+    def to_numpy(self) -> Dict[str, "np.ndarray"]:
+        """The per-process results as NumPy arrays, in completion order.
+
+        The stored columns (pid, arrival, burst, priority, first_run,
+        completion, blocked) are views of the result's memory, not copies; wait,
+        turnaround and response are computed. ``first_run`` and
+        ``response`` are -1 for processes that never got the CPU.
+
+        Returns:
+          dict[str, numpy.ndarray]: Column name to int64 array.
+        """
+        _require_numpy()
+        columns = self.table.to_numpy()
+        arrival, completion = columns["arrival"], columns["completion"]
+        columns["turnaround"] = completion - arrival
+        columns["wait"] = columns["turnaround"] - columns["burst"] - columns["blocked"]
+        first_run = columns["first_run"]
+        columns["response"] = np.where(first_run >= 0, first_run - arrival, -1)
+        return columns
+
+    def to_pandas(self):
+        """The per-process results as a ``pandas.DataFrame`` (needs pandas)."""
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("to_pandas needs pandas. Install it with `pip install pandas`.") from None
+        return pd.DataFrame(self.to_numpy(), copy=False)
+
+    def to_arrow(self):
+        """The per-process results as a ``pyarrow.Table`` (needs pyarrow).
+
+        ``first_run`` and ``response`` are null where unknown.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("to_arrow needs pyarrow. Install it with `pip install pyarrow`.") from None
+        columns = self.to_numpy()
+        unknown = columns["first_run"] < 0
+        return pa.table(
+            {
+                name: pa.array(values, mask=unknown if name in ("first_run", "response") else None)
+                for name, values in columns.items()
+            }
+        )
@@ -0,0 +1,469 @@
+"""Multi-core (SMP) simulation.
+
+Every core has its own ``Dispatcher`` (and latency), its own current process
+and, depending on the placement, its own run queue. All cores share one event
+heap: a core is only looked at when something can change for it (a switch
+ends, its job finishes, the policy's preemption horizon runs out, or work
+arrives for it), so idle or long-running cores cost nothing in between.
+
+Placements:
+
+- ``"global"``: one ready queue shared by all cores.
+- ``"steal"``: a run queue per core; arrivals go to the least loaded core and
+  a core that runs dry steals the head of the longest queue.
+- ``"balance"``: a run queue per core; every ``balance_interval`` ticks work
+  is moved from the longest queues to the shortest ones.
+
+A process that starts running on a different core than it last ran on counts
+as a migration and pays ``migration_cost`` extra switch ticks there. With a
+``switch_cost`` model every core keeps its own copy, i.e. its own cache, so a
+migrated process also finds its working set cold. A process moved between
+run queues leaves the accounting of the policy it leaves and takes its state
+(vruntime, level, pass, ...) along; see ``SchedulerPolicy.on_migrate_out``.
+"""
+from .types import Process
+from .policies import SchedulerPolicy, policy_hook
+from .engine import BaseEngine
+from .result import SimulationResult
+from .core import Dispatcher, Tracer, TraceLevel
+from .switching import SwitchCostModel
+from .queues import pop_head
+from copy import deepcopy
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+import heapq
+
+PLACEMENTS = ("global", "steal", "balance")
+
+# Heap entries for the periodic balancer use this in place of a core id
+_BALANCE = -1
+
+
+class Core:
+    """The state of one CPU core.
+
+    Args:
+      core_id: Index of the core.
+      policy: The policy deciding for this core.
+      ready_queue: The queue the core picks from (may be shared).
+      dispatch_latency: Context switch cost on this core.
+      trace_level: How much this core's tracer keeps.
+      cost_model: This core's switch cost model. (Default value = None)
+    """
+
+    def __init__(
+        self,
+        core_id: int,
+        policy: SchedulerPolicy,
+        ready_queue,
+        dispatch_latency: int,
+        trace_level: Union[TraceLevel, str],
+        cost_model: Optional[SwitchCostModel] = None,
+    ):
+        self.core_id = core_id
+        self.policy = policy
+        self.on_clock = policy_hook(policy, "on_clock")
+        self.on_finish = policy_hook(policy, "on_finish")
+        self.on_migrate_out = policy_hook(policy, "on_migrate_out")
+        self.on_migrate_in = policy_hook(policy, "on_migrate_in")
+        self.ready_queue = ready_queue
+        self.dispatcher = Dispatcher(dispatch_latency=dispatch_latency, cost_model=cost_model)
+        self.tracer = Tracer(level=trace_level)
+        self.current_process: Optional[Process] = None
+        self.next_process: Optional[Process] = None
+        self.current_job_runtime = 0
+        # Time up to which this core's state has been accounted for
+        self.since = 0
+        # Bumped on every reschedule, so older heap entries can be skipped
+        self.version = 0
+        self.busy_time = 0
+        self.switch_time = 0
+        self.idle_time = 0
+        self.dispatches = 0
+
+    @property
+    def load(self) -> int:
+        """Queued processes plus the one running or being switched in."""
+        running = self.current_process is not None or self.dispatcher.is_currently_switching
+        return len(self.ready_queue) + running
+
+
+class SMPEngine(BaseEngine):
+    """
+    Simulates ``cores`` CPUs scheduling one workload.
+
+    Each core asks the policy for its next process exactly like the
+    single-CPU engines do; with one core and the global queue the results
+    match the EventEngine.
+
+    Args:
+      policy: The scheduling policy. Per-core placements give every core its
+        own copy.
+      cores: Number of cores. (Default value = 2)
+      dispatch_latency: Context switch cost, for all cores or one per core.
+        (Default value = 0)
+      placement: ``"global"``, ``"steal"`` or ``"balance"``. (Default value = "global")
+      migration_cost: Extra switch ticks when a process moves to another core.
+        (Default value = 0)
+      balance_interval: Ticks between load balancing passes, for ``"balance"``.
+        (Default value = 100)
+      switch_cost: Switch cost model; every core gets its own copy.
+        (Default value = None)
+      trace_level: How much every tracer keeps. Arrivals go to ``self.tracer``,
+        everything else to the per-core tracers. (Default value = TraceLevel.FULL)
+    """
+
+    def __init__(
+        self,
+        policy: SchedulerPolicy,
+        cores: int = 2,
+        dispatch_latency: Union[int, Sequence[int]] = 0,
+        placement: str = "global",
+        migration_cost: int = 0,
+        balance_interval: int = 100,
+        trace_level: Union[TraceLevel, str] = TraceLevel.FULL,
+        switch_cost: Optional[SwitchCostModel] = None,
+    ):
+        if cores < 1:
+            raise ValueError("An SMPEngine needs at least one core.")
+        if placement not in PLACEMENTS:
+            raise ValueError(f"Unknown placement {placement!r}, expected one of {PLACEMENTS}.")
+        if balance_interval < 1:
+            raise ValueError("balance_interval must be at least 1.")
+        if isinstance(dispatch_latency, int):
+            latencies = [dispatch_latency] * cores
+        else:
+            latencies = list(dispatch_latency)
+            if len(latencies) != cores:
+                raise ValueError("Give one dispatch latency per core.")
+        super().__init__(dispatch_latency=latencies[0], trace_level=trace_level, switch_cost=switch_cost)
+        self.policy = policy
+        self.n_cores = cores
+        self.latencies = latencies
+        self.placement = placement
+        self.migration_cost = max(migration_cost, 0)
+        self.balance_interval = balance_interval
+        self.trace_level = trace_level
+        self.cores: List[Core] = []
+        self.migrations = 0
+        self.rebalanced = 0
+
+    def cache_key(self) -> Dict:
+        """The engine settings that shape its output, for the result cache."""
+        key = super().cache_key()
+        key.update(
+            latencies=self.latencies,
+            placement=self.placement,
+            migration_cost=self.migration_cost,
+            balance_interval=self.balance_interval,
+        )
+        return key
+
+    def run(self, processes: List[Process]) -> SimulationResult:
+        incoming = sorted(processes, key=lambda p: (p.arrival_time, p.pid))
+        if any(p.io for p in incoming):
+            raise ValueError("The SMPEngine does not simulate I/O bursts; use a BasicEngine or EventEngine.")
+        next_arrival = 0
+        remaining_times = {p.pid: p.burst_time for p in incoming}
+        self._setup_cores(remaining_times)
+        cores = self.cores
+        tracing = self.tracer.level > TraceLevel.OFF
+
+        # (time, seq, core id or _BALANCE, version)
+        self._heap: List[tuple] = []
+        self._seq = 0
+        self._last_core: Dict[int, int] = {}
+        if self.placement == "balance":
+            self._push(self.balance_interval, _BALANCE, 0)
+
+        time = 0
+        wake = set(range(len(cores)))
+        while True:
+            # 1. Arrivals go to the global queue or the least loaded core
+            while next_arrival < len(incoming) and incoming[next_arrival].arrival_time <= time:
+                new_proc = incoming[next_arrival]
+                next_arrival += 1
+                if self.placement == "global":
+                    cores[0].ready_queue.append(new_proc)
+                    wake.update(range(len(cores)))
+                else:
+                    target = min(cores, key=lambda c: c.load)
+                    target.ready_queue.append(new_proc)
+                    wake.add(target.core_id)
+                if tracing:
+                    self.tracer.record(time, "ARRIVAL", new_proc.pid)
+
+            # 2. Due events
+            heap = self._heap
+            while heap and heap[0][0] <= time:
+                _, _, core_id, version = heapq.heappop(heap)
+                if core_id == _BALANCE:
+                    self._balance(time)
+                    wake.update(range(len(cores)))
+                elif version == cores[core_id].version:
+                    wake.add(core_id)
+
+            # 3. Every touched core decides, in core order
+            for core_id in sorted(wake):
+                self._decide(cores[core_id], time, remaining_times)
+            wake.clear()
+
+            if next_arrival == len(incoming) and not any(
+                c.current_process or c.dispatcher.is_currently_switching or c.ready_queue
+                for c in cores
+            ):
+                break
+
+            # 4. Jump to the next event
+            next_time = None
+            while heap and heap[0][2] != _BALANCE and heap[0][3] != cores[heap[0][2]].version:
+                heapq.heappop(heap)
+            if heap:
+                next_time = heap[0][0]
+            if next_arrival < len(incoming):
+                arrival = max(incoming[next_arrival].arrival_time, time + 1)
+                next_time = arrival if next_time is None else min(next_time, arrival)
+            if next_time is None:
+                # Every core is idling on queued work; poll every tick like
+                # the single-CPU engines would.
+                next_time = time + 1
+                wake.update(range(len(cores)))
+            time = next_time
+
+        for core in cores:
+            self._settle(core, time, remaining_times)
+        self.clock.advance(time - self.clock.time)
+        self.total_switch_time = sum(c.switch_time for c in cores)
+        self.total_idle_time = sum(c.idle_time for c in cores)
+
+        res = self._get_output(sum(p.burst_time for p in processes), cores=len(cores))
+        res["cores"] = [
+            {
+                "core": c.core_id,
+                "busy_time": c.busy_time,
+                "switch_time": c.switch_time,
+                "idle_time": c.idle_time,
+                "dispatches": c.dispatches,
+                "utilization": (c.busy_time / time * 100) if time else 0.0,
+            }
+            for c in cores
+        ]
+        res["migrations"] = self.migrations
+        res["rebalanced"] = self.rebalanced
+        res["core_traces"] = [c.tracer.get_structured_data() for c in cores]
+        return res
+
+    def _setup_cores(self, remaining_times: Dict[int, int]):
+        """Creates the cores and their queues for a fresh run."""
+        self.migrations = 0
+        self.rebalanced = 0
+        if self.placement == "global":
+            shared = self.policy.create_ready_queue(remaining_times)
+            self.cores = [
+                Core(i, self.policy, shared, latency, self.trace_level, self._core_cost_model())
+                for i, latency in enumerate(self.latencies)
+            ]
+        else:
+            self.cores = []
+            for i, latency in enumerate(self.latencies):
+                policy = deepcopy(self.policy)
+                queue = policy.create_ready_queue(remaining_times)
+                self.cores.append(Core(i, policy, queue, latency, self.trace_level, self._core_cost_model()))
+
+    def _policy_report(self) -> Dict:
+        """The policy's report, merged over the per-core copies if there are any."""
+        if self.placement == "global":
+            return self.policy.report()
+        return self.policy.merge_reports([core.policy for core in self.cores])
+
+    def _core_cost_model(self) -> Optional[SwitchCostModel]:
+        """A fresh copy of the switch cost model for one core, if there is one."""
+        model = self.dispatcher.cost_model
+        if model is None:
+            return None
+        model = deepcopy(model)
+        model.reset()
+        return model
+
+    def _push(self, time: int, core_id: int, version: int):
+        self._seq += 1
+        heapq.heappush(self._heap, (time, self._seq, core_id, version))
+
+    def _settle(self, core: Core, time: int, remaining_times: Dict[int, int]):
+        """Accounts for what ``core`` did since it was last looked at.
+
+        The heap always wakes a core at the end of a switch or job, so the
+        whole stretch is spent in a single state.
+        """
+        step = time - core.since
+        if step <= 0:
+            return
+        core.since = time
+        tracing = core.tracer.level > TraceLevel.OFF
+        if core.dispatcher.is_currently_switching:
+            core.switch_time += step
+            if tracing:
+                core.tracer.record_span(
+                    time - step,
+                    step,
+                    "SWITCH",
+                    core.next_process.pid if core.next_process else "Idle",
+                )
+            core.dispatcher.advance(step)
+            if not core.dispatcher.is_currently_switching:
+                core.current_process = core.next_process
+                core.current_job_runtime = 0
+                self._record_dispatch(core.current_process, time)
+        elif core.current_process:
+            process = core.current_process
+            if tracing:
+                core.tracer.record_span(time - step, step, "EXEC", process.pid)
+            remaining_times[process.pid] -= step
+            core.current_job_runtime += step
+            core.busy_time += step
+            if remaining_times[process.pid] == 0:
+                self._record_completion(process, time)
+                if core.on_finish:
+                    core.on_finish(process, time)
+                core.current_process = None
+                core.current_job_runtime = 0
+        else:
+            core.idle_time += step
+            if tracing:
+                core.tracer.record_span(time - step, step, "IDLE")
+
+    def _decide(self, core: Core, time: int, remaining_times: Dict[int, int]):
+        """Brings ``core`` up to ``time``, asks its policy and reschedules it."""
+        self._settle(core, time, remaining_times)
+        if core.dispatcher.is_currently_switching:
+            # Its wake-up at the end of the switch is still in the heap
+            return
+
+        policy = core.policy
+        if core.on_clock:
+            core.on_clock(time)
+        potential_next = policy.get_next_process(
+            core.ready_queue, core.current_process, core.current_job_runtime, remaining_times
+        )
+        if potential_next is None and core.current_process is None and self._steal(core, time):
+            potential_next = policy.get_next_process(
+                core.ready_queue, None, core.current_job_runtime, remaining_times
+            )
+
+        if potential_next != core.current_process:
+            cost = core.dispatcher.switch_cost(
+                core.current_process,
+                potential_next,
+                remaining_times[potential_next.pid] if potential_next is not None else 0,
+            )
+            if potential_next is not None:
+                core.dispatches += 1
+                last = self._last_core.get(potential_next.pid, core.core_id)
+                if last != core.core_id:
+                    self.migrations += 1
+                    cost += self.migration_cost
+                self._last_core[potential_next.pid] = core.core_id
+            if cost > 0:
+                core.dispatcher.start_switch(potential_next.pid if potential_next else None, cost)
+                core.next_process = potential_next
+                if core.tracer.level > TraceLevel.OFF:
+                    core.tracer.record(
+                        time, "SWITCH_START", potential_next.pid if potential_next else "Idle"
+                    )
+            else:
+                core.current_process = potential_next
+                core.current_job_runtime = 0
+                self._record_dispatch(potential_next, time)
+
+        # Find the next time anything can change on this core
+        if core.dispatcher.is_currently_switching:
+            span = core.dispatcher.current_switch_remaining
+        else:
+            span = policy.preemption_horizon(
+                core.ready_queue, core.current_process, core.current_job_runtime, remaining_times
+            )
+            if core.current_process:
+                job_left = remaining_times[core.current_process.pid]
+                span = job_left if span is None else min(span, job_left)
+        core.version += 1
+        if span is not None:
+            self._push(time + max(span, 1), core.core_id, core.version)
+
+    def _steal(self, core: Core, time: int) -> bool:
+        """Moves one process from the longest other queue to ``core``'s."""
+        if self.placement != "steal":
+            return False
+        victim = max(self.cores, key=lambda c: len(c.ready_queue))
+        if victim is core or not victim.ready_queue:
+            return False
+        self._migrate(victim, core, time)
+        return True
+
+    def _balance(self, time: int):
+        """Evens out the run queues and schedules the next pass."""
+        cores = self.cores
+        while True:
+            busiest = max(cores, key=lambda c: c.load)
+            idlest = min(cores, key=lambda c: c.load)
+            if busiest.load - idlest.load <= 1 or not busiest.ready_queue:
+                break
+            self._migrate(busiest, idlest, time)
+        self._push(time + self.balance_interval, _BALANCE, 0)
+
+    def _migrate(self, source: Core, target: Core, time: int):
+        """Moves the head of ``source``'s run queue to ``target``'s.
+
+        The head is the process ``source`` would have run next (see
+        ``vance.queues.pop_head``), for every kind of queue, so it does not
+        have to wait for ``source`` any longer. Both policies are told, so
+        the process leaves the accounting of the one it leaves (e.g. the CFS
+        load) and takes its state to the other.
+        """
+        process = pop_head(source.ready_queue)
+        state = source.on_migrate_out(process, time) if source.on_migrate_out else None
+        if target.on_migrate_in:
+            target.on_migrate_in(process, state, time)
+        target.ready_queue.append(process)
+        self.rebalanced += 1
+
+
+def speedup_curve(
+    policy: SchedulerPolicy,
+    processes: List[Process],
+    core_counts: Iterable[int] = (1, 2, 4, 8),
+    **engine_kwargs,
+) -> List[Dict]:
+    """Runs the same workload on a growing number of cores.
+
+    Args:
+      policy: The scheduling policy (copied for every run).
+      processes: The workload.
+      core_counts: Core counts to try. (Default value = (1, 2, 4, 8))
+      **engine_kwargs: Passed on to ``SMPEngine``, e.g. ``placement``.
+
+    Returns:
+      list[dict]: One row per core count with ``cores``, ``total_time``,
+      ``speedup`` and ``efficiency`` (relative to one core), and the
+      average waiting and turnaround times.
+    """
+    engine_kwargs.setdefault("trace_level", TraceLevel.OFF)
+
+    def simulate(n: int) -> Dict:
+        return SMPEngine(deepcopy(policy), cores=n, **engine_kwargs).run(processes)
+
+    core_counts = list(core_counts)
+    runs = {n: simulate(n) for n in core_counts}
+    baseline = runs[1] if 1 in runs else simulate(1)
+    rows = []
+    for n in core_counts:
+        res = runs[n]
+        speedup = baseline["total_time"] / res["total_time"] if res["total_time"] else 0
+        rows.append({
+            "cores": n,
+            "total_time": res["total_time"],
+            "speedup": round(speedup, 3),
+            "efficiency": round(speedup / n, 3),
+            "avg_waiting_time": res["averages"]["avg_waiting_time"],
+            "avg_turnaround_time": res["averages"]["avg_turnaround_time"],
+            "migrations": res["migrations"],
+        })
+    return rows
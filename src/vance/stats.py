@@ -0,0 +1,267 @@
+"""Percentiles of per-process metrics.
+
+Two interchangeable quantile estimators are provided:
+
+- ``ExactQuantiles`` keeps every value. Exact, but memory grows with the run.
+- ``KLLSketch`` is a KLL sketch (Karnin, Lang & Liberty, 2016): it keeps about
+  ``3 * k`` values however many are added, and two sketches can be merged
+  into one that summarizes both inputs. Answers are within about ``3.3 / k``
+  of the true rank (1.65% for the default ``k=200``) with high probability.
+
+``LatencyStats`` bundles one estimator per metric (waiting, turnaround and
+first-response time) and is what the engines fill in as processes complete.
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+import math
+import random
+
+# Percentiles reported by default, besides the max
+PERCENTILES = (50, 90, 95, 99)
+
+# The metrics tracked by LatencyStats, as named in the engine output
+METRICS = ("waiting_time", "turnaround_time", "response_time")
+
+
+class ExactQuantiles:
+    """Stores every value and answers quantiles exactly (nearest rank).
+
+    Integers (the usual case) are kept in a typed array at 8 bytes each; the
+    first non-integer switches the store to a plain list.
+    """
+
+    def __init__(self):
+        self._values: Union[array, List[float]] = array("q")
+        self._sorted = True
+        self._max: Optional[float] = None
+
+    @property
+    def count(self) -> int:
+        """How many values have been added."""
+        return len(self._values)
+
+    @property
+    def max(self) -> Optional[float]:
+        """The largest value added, or None if empty."""
+        return self._max
+
+    def add(self, value: float):
+        """Adds one value."""
+        try:
+            self._values.append(value)
+        except (TypeError, OverflowError):
+            self._values = list(self._values)
+            self._values.append(value)
+        self._sorted = False
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def extend(self, values: Iterable[float]):
+        """Adds many values."""
+        values = list(values)
+        if values:
+            if isinstance(self._values, array):
+                try:
+                    values = array("q", values)
+                except (TypeError, OverflowError):
+                    self._values = list(self._values)
+            self._values.extend(values)
+            self._sorted = False
+            top = max(values)
+            if self._max is None or top > self._max:
+                self._max = top
+
+    def merge(self, other: "ExactQuantiles") -> "ExactQuantiles":
+        """Adds everything from ``other`` to this estimator, and returns it."""
+        self.extend(other._values)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The smallest value with at least a fraction ``q`` of the values at or below it.
+
+        Args:
+          q: float: Between 0 and 1.
+        """
+        if not self._values:
+            return None
+        if not self._sorted:
+            if isinstance(self._values, array):
+                self._values = array("q", sorted(self._values))
+            else:
+                self._values.sort()
+            self._sorted = True
+        rank = max(math.ceil(q * len(self._values)), 1)
+        return self._values[rank - 1]
+
+
+class KLLSketch:
+    """A mergeable quantile sketch with bounded memory.
+
+    Values are kept in levels; a value at level ``h`` stands for ``2**h``
+    original values. When a level fills up it is sorted and every other
+    value (odd or even positions, picked at random) is promoted one level
+    up, halving its size.
+
+    Args:
+      k: Size of the top level, trading memory for accuracy. (Default value = 200)
+      seed: Seed for the compaction coin flips, so runs are reproducible.
+        (Default value = 0)
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = 0):
+        if k < 8:
+            raise ValueError("k must be at least 8.")
+        self.k = k
+        self._rng = random.Random(seed)
+        self._levels: List[list] = [[]]
+        self._capacities = [k]
+        self._limit = k  # compact once this many values are stored
+        self._size = 0
+        self._count = 0
+        self._max: Optional[float] = None
+
+    @property
+    def count(self) -> int:
+        """How many values have been added."""
+        return self._count
+
+    @property
+    def max(self) -> Optional[float]:
+        """The largest value added (exact), or None if empty."""
+        return self._max
+
+    @property
+    def rank_error(self) -> float:
+        """Approximate normalized rank error of answers (99% confidence)."""
+        return 3.3 / self.k
+
+    def __len__(self) -> int:
+        """How many values are actually stored."""
+        return self._size
+
+    def _grow(self):
+        """Adds a level on top; lower levels get smaller capacities."""
+        self._levels.append([])
+        depth = len(self._levels)
+        self._capacities = [
+            max(int(self.k * (2 / 3) ** (depth - height - 1)), 2) for height in range(depth)
+        ]
+        self._limit = sum(self._capacities)
+
+    def add(self, value: float):
+        """Adds one value."""
+        self._levels[0].append(value)
+        self._size += 1
+        self._count += 1
+        if self._max is None or value > self._max:
+            self._max = value
+        if self._size >= self._limit:
+            self._compress()
+
+    def extend(self, values: Iterable[float]):
+        """Adds many values."""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Adds everything ``other`` summarizes to this sketch, and returns it."""
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for height, level in enumerate(other._levels):
+            self._levels[height].extend(level)
+        self._size += other._size
+        self._count += other._count
+        if other._max is not None and (self._max is None or other._max > self._max):
+            self._max = other._max
+        while self._size >= self._limit:
+            self._compress()
+        return self
+
+    def _compress(self):
+        """Compacts the lowest level that is over capacity."""
+        for height, level in enumerate(self._levels):
+            if len(level) >= self._capacities[height]:
+                break
+        if height + 1 == len(self._levels):
+            self._grow()
+        level.sort()
+        # An odd one out stays behind at this level
+        leftover = [level.pop()] if len(level) % 2 else []
+        promoted = level[self._rng.random() < 0.5::2]
+        self._levels[height + 1].extend(promoted)
+        self._levels[height] = leftover
+        self._size -= len(level) - len(promoted)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The smallest stored value whose estimated rank reaches ``q``.
+
+        Args:
+          q: float: Between 0 and 1.
+        """
+        if not self._count:
+            return None
+        weighted = sorted(
+            (value, 1 << height)
+            for height, level in enumerate(self._levels)
+            for value in level
+        )
+        target = q * sum(weight for _, weight in weighted)
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return weighted[-1][0]
+
+
+class LatencyStats:
+    """Percentile estimators for waiting, turnaround and first-response time.
+
+    Args:
+      exact: Keep every value instead of sketching. (Default value = True)
+      k: Accuracy of the sketches when not exact. (Default value = 200)
+    """
+
+    def __init__(self, exact: bool = True, k: int = 200):
+        self.exact = exact
+        self.k = k
+        if exact:
+            self.metrics = {name: ExactQuantiles() for name in METRICS}
+        else:
+            self.metrics = {name: KLLSketch(k, seed=i) for i, name in enumerate(METRICS)}
+
+    def record(self, waiting_time: int, turnaround_time: int, response_time: Optional[int]):
+        """Adds the metrics of one completed process."""
+        self.metrics["waiting_time"].add(waiting_time)
+        self.metrics["turnaround_time"].add(turnaround_time)
+        if response_time is not None:
+            self.metrics["response_time"].add(response_time)
+
+    def merge(self, other: "LatencyStats") -> "LatencyStats":
+        """Folds ``other`` (e.g. from a parallel run) into these stats, and returns them.
+
+        Exact stats can only be merged with exact ones; merging sketches
+        keeps the same error bound.
+        """
+        if self.exact != other.exact:
+            raise ValueError("Cannot merge exact stats with sketched ones.")
+        for name, estimator in self.metrics.items():
+            estimator.merge(other.metrics[name])
+        return self
+
+    def summary(self, percentiles: Sequence[float] = PERCENTILES) -> Dict[str, Dict[str, float]]:
+        """Percentiles and max of every metric.
+
+        Args:
+          percentiles: Which percentiles to report. (Default value = (50, 90, 95, 99))
+
+        Returns:
+          dict: ``{"waiting_time": {"p50": ..., "p99": ..., "max": ...}, ...}``,
+          with zeros for metrics that have no values yet.
+        """
+        out = {}
+        for name, estimator in self.metrics.items():
+            row = {f"p{p:g}": estimator.quantile(p / 100) or 0 for p in percentiles}
+            row["max"] = estimator.max or 0
+            out[name] = row
+        return out
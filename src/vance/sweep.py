@@ -0,0 +1,199 @@
+"""Run many simulations over a grid of policies, latencies and workloads.
+
+Example:
+
+    from vance import RR, STCF, SJF
+    from vance.sweep import run_sweep, policy_grid
+
+    table = run_sweep(
+        policies=policy_grid(RR, time_quantum=[2, 4, 8]) + [STCF(), SJF()],
+        workloads={"light": light, "heavy": heavy},
+        dispatch_latencies=[0, 1, 3],
+    )
+    # table["policy"], table["avg_waiting_time"], ... one entry per run
+"""
+from .types import Process
+from .policies import SchedulerPolicy
+from .engine import EventEngine
+from .core import TraceLevel
+from .cache import ResultCache, workload_digest
+from .switching import SwitchCostModel
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from typing import Callable, Dict, Iterable, List, Optional, Union
+import math
+import os
+
+# Columns of the table returned by run_sweep, in order.
+COLUMNS = [
+    "policy",
+    "workload",
+    "dispatch_latency",
+    "avg_waiting_time",
+    "avg_turnaround_time",
+    "cpu_utilization",
+    "hardware_efficiency",
+    "throughput",
+    "total_time",
+]
+
+# Workloads are shipped to every worker once, not with every task.
+_worker_workloads: Dict[str, List[Process]] = {}
+# Their digests, when runs go through a result cache
+_worker_digests: Dict[str, str] = {}
+
+
+def policy_grid(policy_cls, **params: Iterable) -> List[SchedulerPolicy]:
+    """Builds one policy per combination of the given parameter values.
+
+    Args:
+      policy_cls: The policy class, e.g. ``RR``.
+      **params: Parameter name to the values to try, e.g. ``time_quantum=[2, 4]``.
+
+    Returns:
+      list[SchedulerPolicy]: The policies, in grid order.
+    """
+    names = list(params)
+    return [
+        policy_cls(**dict(zip(names, values)))
+        for values in product(*(params[name] for name in names))
+    ]
+
+
+def policy_label(policy: SchedulerPolicy) -> str:
+    """A readable name for a policy and its parameters, e.g. ``RR(time_quantum=4)``."""
+    params = ", ".join(f"{k}={v!r}" for k, v in vars(policy).items() if not k.startswith("_"))
+    return f"{type(policy).__name__}({params})"
+
+
+def _init_worker(workloads: Dict[str, List[Process]], digests: Optional[Dict[str, str]] = None):
+    global _worker_workloads, _worker_digests
+    _worker_workloads = workloads
+    _worker_digests = digests or {}
+
+
+def _run_chunk(
+    chunk: list,
+    engine_cls,
+    trace_level,
+    keep_results: bool,
+    cache: Optional[ResultCache] = None,
+    switch_cost: Optional[SwitchCostModel] = None,
+) -> list:
+    """Runs a batch of simulations inside a worker and returns their rows."""
+    rows = []
+    extra = {"switch_cost": switch_cost} if switch_cost is not None else {}
+    for index, policy, workload_name, latency in chunk:
+        engine = engine_cls(policy, dispatch_latency=latency, trace_level=trace_level, **extra)
+        if cache is not None:
+            res = cache.run(engine, _worker_workloads[workload_name], _worker_digests[workload_name])
+        else:
+            res = engine.run(_worker_workloads[workload_name])
+        avgs = res["averages"]
+        row = {
+            "policy": policy_label(policy),
+            "workload": workload_name,
+            "dispatch_latency": latency,
+            "avg_waiting_time": avgs["avg_waiting_time"],
+            "avg_turnaround_time": avgs["avg_turnaround_time"],
+            "cpu_utilization": float(avgs["cpu_utilization"]),
+            "hardware_efficiency": float(avgs["hardware_efficiency"]),
+            "throughput": res["throughput"],
+            "total_time": res["total_time"],
+        }
+        if keep_results:
+            row["result"] = res
+        rows.append((index, row))
+    return rows
+
+
+def run_sweep(
+    policies: Iterable[SchedulerPolicy],
+    workloads: Union[Dict[str, List[Process]], List[List[Process]]],
+    dispatch_latencies: Iterable[int] = (0,),
+    engine_cls=EventEngine,
+    trace_level: Union[TraceLevel, str] = TraceLevel.OFF,
+    keep_results: bool = False,
+    max_workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cache: Optional[ResultCache] = None,
+    switch_cost: Optional[SwitchCostModel] = None,
+) -> Dict[str, list]:
+    """Simulates every (policy, workload, dispatch latency) combination.
+
+    Runs are grouped into chunks and fanned out over a ``ProcessPoolExecutor``,
+    so many small runs are not dominated by inter-process communication.
+    By default tracing is off and workers only send the aggregates back.
+
+    Policies (including custom ones) must be picklable, i.e. defined in an
+    importable module rather than in ``__main__`` of an interactive session.
+
+    Args:
+      policies: The policy instances to evaluate (see ``policy_grid``).
+      workloads: Named workloads, or a list of them (named "0", "1", ...).
+      dispatch_latencies: Latencies to try. (Default value = (0,))
+      engine_cls: Engine used for every run. (Default value = EventEngine)
+      trace_level: Trace level of every run. (Default value = TraceLevel.OFF)
+      keep_results: Also return each run's full output dict in a "result"
+        column. (Default value = False)
+      max_workers: Worker processes; 0 or 1 runs everything in this process.
+        (Default value = None, one per CPU)
+      chunksize: Runs per task. (Default value = None, about four tasks per worker)
+      progress: Called as ``progress(done, total)`` whenever runs finish.
+      cache: Reuse the output of runs that were simulated before (see
+        ``vance.cache``). (Default value = None)
+      switch_cost: Switch cost model for every run, on top of its dispatch
+        latency (see ``vance.switching``). (Default value = None)
+
+    Returns:
+      dict[str, list]: Column name to values, one entry per run in grid
+      order (policies, then workloads, then latencies).
+    """
+    if not isinstance(workloads, dict):
+        workloads = {str(i): w for i, w in enumerate(workloads)}
+    runs = [
+        (index, policy, workload_name, latency)
+        for index, (policy, workload_name, latency) in enumerate(
+            product(list(policies), list(workloads), list(dispatch_latencies))
+        )
+    ]
+    total = len(runs)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, total or 1))
+    if chunksize is None:
+        chunksize = max(1, math.ceil(total / (max_workers * 4)))
+    chunks = [runs[i:i + chunksize] for i in range(0, total, chunksize)]
+
+    digests = {name: workload_digest(w) for name, w in workloads.items()} if cache is not None else None
+
+    rows: List[Optional[dict]] = [None] * total
+    done = 0
+
+    def collect(chunk_rows):
+        nonlocal done
+        for index, row in chunk_rows:
+            rows[index] = row
+        done += len(chunk_rows)
+        if progress:
+            progress(done, total)
+
+    if max_workers == 1:
+        _init_worker(workloads, digests)
+        for chunk in chunks:
+            collect(_run_chunk(chunk, engine_cls, trace_level, keep_results, cache, switch_cost))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(workloads, digests)
+        ) as pool:
+            futures = [
+                pool.submit(_run_chunk, chunk, engine_cls, trace_level, keep_results, cache, switch_cost)
+                for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    columns = COLUMNS + (["result"] if keep_results else [])
+    return {name: [row[name] for row in rows] for name in columns}
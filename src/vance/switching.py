@@ -0,0 +1,146 @@
+"""Context-switch cost models.
+
+By default every switch costs the engine's ``dispatch_latency``. Real
+switches cost more when the incoming process finds the cache cold: it
+first runs slowly while it reloads its working set. A ``SwitchCostModel``
+passed as ``switch_cost`` to an engine decides the cost of every switch, so
+``total_switch_time`` and ``hardware_efficiency`` count that lost work too.
+
+Example:
+
+    from vance import EventEngine, RR, Process
+    from vance.switching import CacheAffinityModel
+
+    processes = [Process(pid=i, burst_time=40, working_set=128) for i in range(8)]
+    model = CacheAffinityModel(cache_size=512, refill_rate=16, speed=0.25)
+    for q in (1, 2, 4, 8, 16):
+        res = EventEngine(RR(time_quantum=q), dispatch_latency=1, switch_cost=model).run(processes)
+        print(q, res["averages"]["hardware_efficiency"])
+"""
+from .types import Process
+from typing import Dict, Optional
+import math
+
+# Processes the cache has seen this many cache sizes of other traffic since
+# are forgotten: less than a millionth of their working set survives.
+_FORGET_AFTER = 16
+
+
+class SwitchCostModel:
+    """Decides how many ticks a context switch takes.
+
+    The base model charges the dispatcher's fixed latency, which is what
+    engines do without a model. Subclasses override ``cost``; engines call
+    ``reset`` when a run starts, so one model can configure many engines.
+    """
+
+    def reset(self):
+        """Forgets everything from previous runs."""
+
+    def cost(self, outgoing: Optional[Process], incoming: Optional[Process], remaining: int, latency: int) -> int:
+        """The length of one switch.
+
+        Args:
+          outgoing: Optional[Process]: The process leaving the CPU, if any.
+          incoming: Optional[Process]: The process switched in, or None for
+            a switch to an idle CPU.
+          remaining: int: What is left of the incoming process's CPU burst
+            (0 if there is none).
+          latency: int: The dispatcher's fixed ``dispatch_latency``.
+
+        Returns:
+          int: Switch ticks; 0 switches instantly.
+        """
+        return latency
+
+    def cache_key(self):
+        """What identifies this model's costs, for the result cache.
+
+        Like ``SchedulerPolicy.cache_key``: the public attributes by default,
+        or None when runs must never be cached.
+        """
+        return {name: value for name, value in vars(self).items() if not name.startswith("_")}
+
+
+class CacheAffinityModel(SwitchCostModel):
+    """Switches cost more when the incoming process's working set went cold.
+
+    The CPU's cache holds ``cache_size`` units (the unit of
+    ``Process.working_set``, e.g. KiB). Every switch-in loads the cold part
+    of a working set, and loading evicts what was there: of what a process
+    left behind, a share of ``exp(-other / cache_size)`` is still warm,
+    where ``other`` is how much the other processes loaded since. A process
+    that gets the CPU back right away finds its cache warm; one that waited
+    behind many others finds it cold.
+
+    After the switch the process reloads the cold part at ``refill_rate``
+    units per tick, running at ``speed`` times its normal rate meanwhile.
+    The work lost to that slowdown is charged as extra switch time, after
+    which the process runs at full speed. That is the same total as running
+    slowly through the warm-up, but a process preempted during its warm-up
+    is not refunded the part it did not get to.
+
+    Processes without a ``working_set`` cost the fixed latency only.
+
+    Args:
+      cache_size: Cache capacity, in working-set units. (Default value = 512)
+      refill_rate: Units reloaded per tick after a switch. (Default value = 16)
+      speed: Execution speed while warming up, between 0 (exclusive) and 1.
+        (Default value = 0.5)
+    """
+
+    def __init__(self, cache_size: int = 512, refill_rate: int = 16, speed: float = 0.5):
+        if cache_size <= 0 or refill_rate <= 0:
+            raise ValueError("cache_size and refill_rate must be positive.")
+        if not 0 < speed <= 1:
+            raise ValueError("speed must be in (0, 1].")
+        self.cache_size = cache_size
+        self.refill_rate = refill_rate
+        self.speed = speed
+        self.reset()
+
+    def reset(self):
+        # Total loaded into the cache so far, and its value right after each
+        # process last loaded its working set
+        self._traffic = 0.0
+        self._loaded: Dict[int, float] = {}
+        self._forget_at = 1024
+
+    def warmth(self, process: Process) -> float:
+        """The share of ``process``'s working set still in the cache (0 to 1)."""
+        working_set = process.working_set
+        mark = self._loaded.get(process.pid)
+        if mark is None or working_set <= 0:
+            return 0.0
+        other = self._traffic - mark
+        if other > _FORGET_AFTER * self.cache_size:
+            return 0.0
+        # A working set larger than the cache never fits completely
+        fits = min(working_set, self.cache_size) / working_set
+        return fits * math.exp(-other / self.cache_size)
+
+    def warmup_loss(self, cold: float, remaining: int) -> float:
+        """Ticks of work lost to reloading ``cold`` units before ``remaining`` is done."""
+        warmup = cold / self.refill_rate
+        lost = warmup * (1 - self.speed)
+        if remaining * (1 - self.speed) / self.speed < lost:
+            # The burst ends before the warm-up does
+            lost = remaining * (1 - self.speed) / self.speed
+        return lost
+
+    def cost(self, outgoing, incoming, remaining, latency):
+        """The fixed latency plus the work lost to warming up ``incoming``."""
+        if incoming is None or incoming.working_set <= 0:
+            return latency
+        cold = incoming.working_set * (1 - self.warmth(incoming))
+        self._traffic += cold
+        self._loaded[incoming.pid] = self._traffic
+        if len(self._loaded) > self._forget_at:
+            self._forget()
+        return latency + int(self.warmup_loss(cold, remaining) + 0.5)
+
+    def _forget(self):
+        """Drops the processes whose working set is long gone from the cache."""
+        horizon = self._traffic - _FORGET_AFTER * self.cache_size
+        self._loaded = {pid: mark for pid, mark in self._loaded.items() if mark >= horizon}
+        self._forget_at = max(1024, 2 * len(self._loaded))
@@ -0,0 +1,260 @@
+"""Process data stored column by column.
+
+A ``Process`` or ``ProcessResult`` object costs a couple of hundred bytes;
+with millions of processes that adds up. The tables here keep the same
+fields in parallel typed arrays (8 bytes per field) and only create the
+objects when somebody looks at them.
+
+- ``ProcessTable`` holds workloads. Engines accept one wherever they take a
+  list of processes, and then create each ``Process`` only when it arrives.
+- ``ResultTable`` is where engines keep completed processes (``engine.results``).
+  It behaves like a list of ``ProcessResult``.
+
+Example:
+
+    from vance.table import ProcessTable
+
+    table = ProcessTable.from_arrays(burst=bursts, arrival=arrivals)   # lists or NumPy arrays
+    res = EventEngine(RR(time_quantum=4)).run(table)
+"""
+from .types import Process, ProcessResult
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+def _column(values) -> array:
+    """A typed int64 column from a list, range or NumPy array."""
+    if np is not None and isinstance(values, np.ndarray):
+        column = array("q")
+        column.frombytes(np.ascontiguousarray(values, dtype=np.int64).tobytes())
+        return column
+    return array("q", values)
+
+
+class ProcessTable:
+    """A workload as parallel int64 columns ``pid``, ``arrival``, ``burst``
+    and ``priority``.
+
+    Indexing or iterating it yields ``Process`` objects, created on the fly.
+    """
+
+    COLUMNS = ("pid", "arrival", "burst", "priority")
+
+    def __init__(self):
+        self.pid = array("q")
+        self.arrival = array("q")
+        self.burst = array("q")
+        self.priority = array("q")
+
+    @classmethod
+    def from_processes(cls, processes: Iterable[Process]) -> "ProcessTable":
+        """Packs ``Process`` objects into a table, keeping their order."""
+        table = cls()
+        for process in processes:
+            table.append(process)
+        return table
+
+    @classmethod
+    def from_arrays(
+        cls,
+        burst: Sequence[int],
+        arrival: Optional[Sequence[int]] = None,
+        priority: Optional[Sequence[int]] = None,
+        pid: Optional[Sequence[int]] = None,
+    ) -> "ProcessTable":
+        """Builds a table from columns, e.g. ``Workload.arrays``.
+
+        Args:
+          burst: Burst times.
+          arrival: Arrival times. (Default value = None, all 0)
+          priority: Priorities. (Default value = None, all 0)
+          pid: PIDs. (Default value = None, 0, 1, 2, ...)
+        """
+        table = cls()
+        table.burst = _column(burst)
+        n = len(table.burst)
+        table.arrival = _column(arrival) if arrival is not None else array("q", bytes(8 * n))
+        table.priority = _column(priority) if priority is not None else array("q", bytes(8 * n))
+        table.pid = _column(pid) if pid is not None else array("q", range(n))
+        if not len(table.arrival) == len(table.priority) == len(table.pid) == n:
+            raise ValueError("All columns must have the same length.")
+        return table
+
+    def append(self, process: Process):
+        """Adds one process at the end."""
+        if process.io:
+            raise ValueError(f"P{process.pid} has I/O bursts, which a ProcessTable cannot hold.")
+        if process.working_set:
+            raise ValueError(f"P{process.pid} has a working set, which a ProcessTable cannot hold.")
+        if process.deadline is not None or process.task is not None:
+            raise ValueError(f"P{process.pid} has a deadline, which a ProcessTable cannot hold.")
+        self.pid.append(process.pid)
+        self.arrival.append(process.arrival_time)
+        self.burst.append(process.burst_time)
+        self.priority.append(process.priority_time)
+
+    def __len__(self) -> int:
+        return len(self.pid)
+
+    def copy(self):
+        """An independent copy of the table."""
+        table = type(self)()
+        for name in self.COLUMNS:
+            setattr(table, name, getattr(self, name)[:])
+        return table
+
+    def process(self, row: int) -> Process:
+        """The ``Process`` in row ``row``."""
+        return Process(self.pid[row], self.burst[row], self.arrival[row], self.priority[row])
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self.process(row) for row in range(*index.indices(len(self)))]
+        return self.process(index)
+
+    def __iter__(self) -> Iterator[Process]:
+        for pid, burst, arrival, priority in zip(self.pid, self.burst, self.arrival, self.priority):
+            yield Process(pid, burst, arrival, priority)
+
+    def arrival_order(self) -> array:
+        """Row numbers sorted by (arrival time, PID), the order engines admit them in."""
+        if np is not None and len(self) > 1:
+            return _column(np.lexsort((self.column("pid"), self.column("arrival"))))
+        arrival, pid = self.arrival, self.pid
+        return array("q", sorted(range(len(self)), key=lambda row: (arrival[row], pid[row])))
+
+    def arrivals(self) -> "TableArrivals":
+        """An iterator over the processes in order of arrival, created as they are needed."""
+        return TableArrivals(self, self.arrival_order())
+
+    def column(self, name: str):
+        """A column as a NumPy array sharing the table's memory (no copy).
+
+        While such an array is alive the table cannot grow, so take a
+        ``copy`` first if the run goes on.
+
+        Args:
+          name: str: One of ``COLUMNS``.
+        """
+        _require_numpy()
+        if name not in self.COLUMNS:
+            raise KeyError(name)
+        values = getattr(self, name)
+        return np.frombuffer(values, dtype=np.int64) if len(values) else np.empty(0, np.int64)
+
+    def to_numpy(self) -> Dict[str, "np.ndarray"]:
+        """Every column as a NumPy array (no copy)."""
+        return {name: self.column(name) for name in self.COLUMNS}
+
+
+class TableArrivals:
+    """Iterates a ``ProcessTable`` in a given row order, one ``Process`` at a time.
+
+    Unlike a generator it can be pickled, so engine snapshots stay compact.
+
+    Args:
+      table: The table.
+      order: Row numbers in the order to yield them.
+    """
+
+    def __init__(self, table: ProcessTable, order: Sequence[int]):
+        self.table = table
+        self.order = order
+        self.position = 0
+
+    def __iter__(self) -> "TableArrivals":
+        return self
+
+    def __next__(self) -> Process:
+        if self.position >= len(self.order):
+            raise StopIteration
+        row = self.order[self.position]
+        self.position += 1
+        return self.table.process(row)
+
+
+class ResultTable(ProcessTable):
+    """Completed processes, one row each, in order of completion.
+
+    On top of the workload columns it has ``first_run`` (when the process
+    first got the CPU, -1 if unknown), ``completion`` and ``blocked`` (time
+    spent waiting for or doing I/O). ``burst`` is the CPU time over all
+    bursts. Waiting, turnaround and response times are derived from these
+    when a ``ProcessResult`` is looked at.
+
+    It supports the list operations engines' ``results`` always offered:
+    ``len``, indexing, iteration and ``append``.
+    """
+
+    COLUMNS = ProcessTable.COLUMNS + ("first_run", "completion", "blocked")
+
+    def __init__(self):
+        super().__init__()
+        self.first_run = array("q")
+        self.completion = array("q")
+        self.blocked = array("q")
+
+    def record(
+        self, process: Process, completion: int, first_run: Optional[int] = None, blocked: int = 0
+    ):
+        """Adds a completed process.
+
+        Args:
+          process: Process: The process.
+          completion: int: Its completion time.
+          first_run: Optional[int]: When it first got the CPU. (Default value = None)
+          blocked: int: Time it spent blocked on I/O. (Default value = 0)
+        """
+        self.pid.append(process.pid)
+        self.arrival.append(process.arrival_time)
+        self.burst.append(process.cpu_time if process.io else process.burst_time)
+        self.priority.append(process.priority_time)
+        self.completion.append(completion)
+        self.first_run.append(-1 if first_run is None else first_run)
+        self.blocked.append(blocked)
+
+    def append(self, result: ProcessResult):
+        """Adds a ``ProcessResult``."""
+        process = result.process
+        first_run = None
+        if result.response_time is not None:
+            first_run = process.arrival_time + result.response_time
+        blocked = result.turnaround_time - result.waiting_time - process.cpu_time
+        self.record(process, result.completion_time, first_run, blocked)
+
+    def process(self, row: int) -> ProcessResult:
+        """The ``ProcessResult`` in row ``row`` (its process shows the total CPU time)."""
+        process = Process(self.pid[row], self.burst[row], self.arrival[row], self.priority[row])
+        return self._result(process, self.completion[row], self.first_run[row], self.blocked[row])
+
+    @staticmethod
+    def _result(process: Process, completion: int, first_run: int, blocked: int) -> ProcessResult:
+        turnaround = completion - process.arrival_time
+        response = first_run - process.arrival_time if first_run >= 0 else None
+        waiting = turnaround - process.burst_time - blocked
+        return ProcessResult(process, waiting, turnaround, completion, response)
+
+    def __iter__(self) -> Iterator[ProcessResult]:
+        for pid, burst, arrival, priority, completion, first_run, blocked in zip(
+            self.pid, self.burst, self.arrival, self.priority, self.completion, self.first_run, self.blocked
+        ):
+            yield self._result(Process(pid, burst, arrival, priority), completion, first_run, blocked)
+
+    def arrivals(self):
+        raise TypeError("A ResultTable holds results, not a workload.")
+
+    def processes(self) -> List[Process]:
+        """The completed processes (without results)."""
+        return list(ProcessTable.__iter__(self))
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "NumPy views of a table need NumPy. Install it with `pip install vance[numpy]`."
+        )
@@ -0,0 +1,256 @@
+"""Writing traces to disk.
+
+Two formats:
+
+- A fixed-width binary trace (``.vtrace``), written while the simulation runs
+  through a buffered sink, so its size is only limited by the disk. Read it
+  back with ``read_binary_trace``, which memory-maps it as a NumPy record
+  array without copying.
+- Chrome Trace Event JSON, for zooming through a run in Perfetto
+  (https://ui.perfetto.dev) or ``chrome://tracing``. There is one track per
+  process plus a CPU track showing what the dispatcher was doing.
+
+Example:
+
+    from vance.tracefile import record_trace, read_binary_trace, write_chrome_trace
+
+    engine = EventEngine(RR(time_quantum=4), dispatch_latency=1)
+    with record_trace(engine, "run.vtrace"):
+        res = engine.run(processes)
+
+    trace = read_binary_trace("run.vtrace")          # needs NumPy
+    busy = trace[trace["kind"] == KIND_CODES["EXEC"]]
+    write_chrome_trace("run.vtrace", "run.json")      # or write_chrome_trace(res, ...)
+"""
+from .core import TraceEvent, TraceInterval
+from contextlib import contextmanager
+from collections.abc import Mapping
+from typing import Iterator, Optional, Tuple, Union
+import json
+import os
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Record kinds, in the order of their codes
+KINDS = ("EXEC", "SWITCH", "IDLE", "ARRIVAL", "SWITCH_START", "BLOCK", "WAKE")
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+# Point events drawn on the process' own track rather than the CPU's
+_PROCESS_EVENTS = frozenset(("ARRIVAL", "BLOCK", "WAKE"))
+
+# File header: magic, record size, reserved
+MAGIC = b"VNCTRACE"
+_HEADER = struct.Struct("<8sII")
+# One record: start, end (exclusive; equal to start for point events), pid
+# (-1 when there is none, e.g. idle), kind, padding to 32 bytes
+_RECORD = struct.Struct("<qqqB7x")
+
+if np is not None:
+    RECORD_DTYPE = np.dtype(
+        [("start", "<i8"), ("end", "<i8"), ("pid", "<i8"), ("kind", "u1"), ("_pad", "V7")]
+    )
+
+
+class BinaryTraceWriter:
+    """A trace sink that appends fixed-width records to a file.
+
+    Records are packed into a preallocated buffer and written out whenever
+    it fills up, so memory stays at ``buffer_records * 32`` bytes. Intervals
+    arrive once they are closed, which means records are in the order they
+    were finished, not strictly sorted by start time.
+
+    Args:
+      path: Where to write the trace.
+      buffer_records: Records per write. (Default value = 65536)
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], buffer_records: int = 1 << 16):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, _RECORD.size, 0))
+        self._buffer = bytearray(_RECORD.size * buffer_records)
+        self._capacity = buffer_records
+        self._pending = 0
+        self.records = 0
+
+    def __enter__(self) -> "BinaryTraceWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, start: int, end: int, pid, kind: str):
+        if self._pending == self._capacity:
+            self.flush()
+        _RECORD.pack_into(
+            self._buffer,
+            self._pending * _RECORD.size,
+            start,
+            end,
+            pid if isinstance(pid, int) else -1,
+            KIND_CODES[kind],
+        )
+        self._pending += 1
+        self.records += 1
+
+    def write_interval(self, interval: TraceInterval):
+        """Appends a closed interval."""
+        self._write(interval.start, interval.end, interval.pid, interval.event_type)
+
+    def write_event(self, event: TraceEvent):
+        """Appends a point event."""
+        self._write(event.time, event.time, event.pid, event.event_type)
+
+    def flush(self):
+        """Writes the buffered records to the file."""
+        if self._pending:
+            self._file.write(memoryview(self._buffer)[: self._pending * _RECORD.size])
+            self._pending = 0
+        self._file.flush()
+
+    def close(self):
+        """Flushes and closes the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+@contextmanager
+def record_trace(engine, path: Union[str, os.PathLike], buffer_records: int = 1 << 16):
+    """Streams an engine's trace to a binary file for the duration of the block.
+
+    The in-memory trace of the run stays (nearly) empty; everything goes to
+    ``path``.
+
+    Args:
+      engine: The engine about to be run.
+      path: Where to write the trace.
+      buffer_records: Records per write. (Default value = 65536)
+
+    Yields:
+      BinaryTraceWriter: The sink, e.g. to check ``records`` afterwards.
+    """
+    writer = BinaryTraceWriter(path, buffer_records)
+    engine.tracer.attach(writer)
+    try:
+        yield writer
+    finally:
+        engine.tracer.detach()
+        writer.close()
+
+
+def read_binary_trace(path: Union[str, os.PathLike]):
+    """Memory-maps a binary trace as a NumPy record array (no copy).
+
+    Fields are ``start``, ``end``, ``pid`` and ``kind`` (an index into
+    ``KINDS``; see ``KIND_CODES``).
+
+    Args:
+      path: A file written by ``BinaryTraceWriter``.
+
+    Returns:
+      numpy.memmap: One record per interval or point event, read-only.
+    """
+    _require_numpy()
+    with open(path, "rb") as f:
+        magic, record_size, _ = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != MAGIC or record_size != _RECORD.size:
+        raise ValueError(f"{path} is not a vance binary trace.")
+    if os.path.getsize(path) == _HEADER.size:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=_HEADER.size)
+
+
+def _records(source) -> Iterator[Tuple[int, int, str, Optional[int]]]:
+    """(start, end, kind, pid) of every record in an engine result or binary trace."""
+    if isinstance(source, Mapping):
+        # Switches to idle carry the pid "Idle"; like BinaryTraceWriter, only
+        # integer pids name a process
+        trace = source["structured_trace"]
+        for run in getattr(trace, "intervals", ()):
+            yield run.start, run.end, run.event_type, run.pid if isinstance(run.pid, int) else None
+        for event in getattr(trace, "points", ()):
+            yield event.time, event.time, event.event_type, event.pid if isinstance(event.pid, int) else None
+        return
+    trace = read_binary_trace(source)
+    # Walk the memory map in slices, so huge traces never load all at once
+    for lo in range(0, len(trace), 1 << 16):
+        chunk = trace[lo:lo + (1 << 16)]
+        for start, end, pid, kind in zip(
+            chunk["start"].tolist(), chunk["end"].tolist(), chunk["pid"].tolist(), chunk["kind"].tolist()
+        ):
+            yield start, end, KINDS[kind], pid if pid >= 0 else None
+
+
+def write_chrome_trace(
+    source, path: Union[str, os.PathLike], tick_us: float = 1.0
+) -> int:
+    """Writes a trace in the Chrome Trace Event format.
+
+    Perfetto shows a "CPU" process with the dispatcher track (what the CPU
+    executed, switches and idle time) and a "Processes" process with one
+    track per PID (its bursts on the CPU and its arrival).
+
+    Args:
+      source: An engine result dict (with a structured trace) or the path of
+        a binary trace.
+      path: Where to write the JSON.
+      tick_us: Microseconds per tick on the timeline. (Default value = 1.0)
+
+    Returns:
+      int: The number of trace events written.
+    """
+    cpu, procs = 0, 1
+    seen = set()
+    # Events are formatted by hand (names are plain ASCII) and written in
+    # batches; json.dumps per event is several times slower on big traces.
+    lines = [
+        json.dumps({"ph": "M", "name": "process_name", "pid": cpu, "tid": 0, "args": {"name": "CPU"}}),
+        json.dumps({"ph": "M", "name": "thread_name", "pid": cpu, "tid": 0, "args": {"name": "dispatcher"}}),
+        json.dumps({"ph": "M", "name": "process_name", "pid": procs, "tid": 0, "args": {"name": "Processes"}}),
+    ]
+    count = 0
+    with open(path, "w") as f:
+        f.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+        for start, end, kind, pid in _records(source):
+            if pid is not None and pid not in seen:
+                seen.add(pid)
+                lines.append(
+                    f'{{"ph":"M","name":"thread_name","pid":{procs},"tid":{pid},"args":{{"name":"P{pid}"}}}}'
+                )
+            ts = start * tick_us
+            if start == end:
+                target_pid, tid = (procs, pid) if kind in _PROCESS_EVENTS and pid is not None else (cpu, 0)
+                label = f"{kind} P{pid}" if pid is not None else kind
+                lines.append(
+                    f'{{"ph":"i","s":"t","name":"{label}","cat":"{kind}","ts":{ts},"pid":{target_pid},"tid":{tid}}}'
+                )
+            else:
+                dur = (end - start) * tick_us
+                name = f"P{pid}" if kind == "EXEC" else (f"{kind} P{pid}" if pid is not None else kind)
+                lines.append(
+                    f'{{"ph":"X","name":"{name}","cat":"{kind}","ts":{ts},"dur":{dur},"pid":{cpu},"tid":0}}'
+                )
+                if kind == "EXEC":
+                    lines.append(
+                        f'{{"ph":"X","name":"running","cat":"EXEC","ts":{ts},"dur":{dur},"pid":{procs},"tid":{pid}}}'
+                    )
+            if len(lines) >= 1 << 14:
+                f.write((",\n" if count else "") + ",\n".join(lines))
+                count += len(lines)
+                lines.clear()
+        if lines:
+            f.write((",\n" if count else "") + ",\n".join(lines))
+            count += len(lines)
+        f.write("\n]}\n")
+    return count
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "Reading binary traces needs NumPy. Install it with `pip install vance[numpy]`."
+        )
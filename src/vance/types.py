@@ -1,14 +1,125 @@
 from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple, Union
+
+
+@dataclass(frozen=True)
+class IOBurst:
+    """An I/O request a process makes when a CPU burst ends.
+
+    Attributes:
+      duration: Service time on the device.
+      cpu_after: Length of the CPU burst that follows once it is served.
+      device: Index or name of the device (see ``vance.io.IODevice``).
+    """
+
+    duration: int
+    cpu_after: int
+    device: Union[int, str] = 0
+
+
+@dataclass(frozen=True)
+class PeriodicTask:
+    """A real-time task that releases a job every ``period`` ticks.
+
+    Each job needs ``wcet`` ticks of CPU time (its worst-case execution
+    time) and must complete within ``deadline`` ticks of its release. See
+    ``vance.realtime`` for turning tasks into jobs and for checking them.
+
+    Attributes:
+      task_id: Identifies the task in the output.
+      period: Ticks between releases.
+      wcet: CPU time of every job.
+      deadline: Relative deadline. (Default value = None, the period)
+      offset: Release time of the first job. (Default value = 0)
+    """
+
+    task_id: int
+    period: int
+    wcet: int
+    deadline: Optional[int] = None
+    offset: int = 0
+
+    @property
+    def relative_deadline(self) -> int:
+        """The relative deadline, which defaults to the period."""
+        return self.deadline if self.deadline is not None else self.period
+
+
+@dataclass(frozen=True)
+class SporadicTask(PeriodicTask):
+    """A real-time task whose jobs come at least ``period`` ticks apart.
+
+    Every release comes a random 0 to ``max_delay`` ticks later than the
+    period alone would have it. Schedulability tests assume the worst case,
+    where each release comes as early as allowed.
+
+    Attributes:
+      max_delay: Longest extra gap between two releases. (Default value = None, the period)
+    """
+
+    max_delay: Optional[int] = None
 
 
 @dataclass(frozen=True)
 class Process:
-    """The input data for a process."""
+    """The input data for a process.
+
+    ``burst_time`` is the first CPU burst. Processes with ``io`` block on a
+    device after each CPU burst and then run the next one (see
+    ``from_bursts``). ``working_set`` is how much cache the process uses,
+    for switch cost models (see ``vance.switching``). Jobs of real-time
+    tasks have an absolute ``deadline`` and their ``task`` (see
+    ``vance.realtime``); any process can have a deadline.
+    """
 
     pid: int
     burst_time: int
     arrival_time: int = 0
     priority_time: int = 0
+    io: Tuple[IOBurst, ...] = ()
+    working_set: int = 0
+    deadline: Optional[int] = None
+    task: Optional[PeriodicTask] = None
+
+    @property
+    def cpu_time(self) -> int:
+        """The CPU time over all bursts."""
+        if not self.io:
+            return self.burst_time
+        return self.burst_time + sum(burst.cpu_after for burst in self.io)
+
+    @classmethod
+    def from_bursts(
+        cls,
+        pid: int,
+        bursts: Sequence[Union[int, Tuple[Union[int, str], int]]],
+        arrival_time: int = 0,
+        priority_time: int = 0,
+        working_set: int = 0,
+    ) -> "Process":
+        """Builds a process from alternating CPU and I/O bursts.
+
+        Args:
+          pid: The process ID.
+          bursts: CPU burst, I/O burst, CPU burst, ..., ending with a CPU
+            burst. An I/O burst is a duration (on device 0) or a
+            ``(device, duration)`` pair.
+          arrival_time: (Default value = 0)
+          priority_time: (Default value = 0)
+          working_set: (Default value = 0)
+
+        Example:
+          ``Process.from_bursts(1, [5, ("disk", 8), 3])`` computes for 5
+          ticks, reads from "disk" for 8 and computes for 3 more.
+        """
+        if len(bursts) % 2 == 0:
+            raise ValueError("Bursts must alternate CPU and I/O, starting and ending with CPU.")
+        io = []
+        for k in range(1, len(bursts), 2):
+            request = bursts[k]
+            device, duration = request if isinstance(request, tuple) else (0, request)
+            io.append(IOBurst(duration, bursts[k + 1], device))
+        return cls(pid, bursts[0], arrival_time, priority_time, tuple(io), working_set)
 
 
 @dataclass(frozen=True)
@@ -19,3 +130,5 @@ class ProcessResult:
     waiting_time: int
     turnaround_time: int
     completion_time: int
+    # Time from arrival until the process first got the CPU
+    response_time: Optional[int] = None
@@ -1,3 +1,7 @@
+from .core import TraceInterval
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
 class Visualizer:
     """ """
     # ANSI Color Palette
@@ -30,21 +34,62 @@ class Visualizer:
         )
 
     @staticmethod
-    def render_gantt(res: dict, custom_colors: dict = None):
-        """Prints a color-coded Gantt chart using TraceEvents.
+    def render_gantt(
+        res: dict,
+        custom_colors: dict = None,
+        window: Optional[Tuple[int, int]] = None,
+        width: Optional[int] = None,
+        pids: Optional[Iterable[int]] = None,
+        top: Optional[int] = None,
+        sort_by: str = "turnaround",
+        file=None,
+    ):
+        """Prints a color-coded Gantt chart (see ``format_gantt`` for the options).
 
         Args:
-          res: dict:
-          custom_colors: dict:  (Default value = None)
-          res: dict:
-          custom_colors: dict:  (Default value = None)
-          res: dict: 
-          custom_colors: dict:  (Default value = None)
+          res: dict: The output of an engine's ``run``.
+          custom_colors: dict: Theme overrides for "EXEC", "WAIT", "CTX". (Default value = None)
+          window: Only chart the ticks ``t0 <= t < t1``. (Default value = None, everything)
+          width: Squeeze the window into at most this many columns. (Default value = None, one per tick)
+          pids: Only chart these processes. (Default value = None, all)
+          top: Only chart the ``top`` processes with the largest ``sort_by``. (Default value = None)
+          sort_by: Result field that ``top`` ranks by. (Default value = "turnaround")
+          file: Where to write the chart. (Default value = None, stdout)
+        """
+        print(
+            Visualizer.format_gantt(res, custom_colors, window, width, pids, top, sort_by),
+            file=file,
+        )
 
-        Returns:
+    @staticmethod
+    def format_gantt(
+        res: dict,
+        custom_colors: dict = None,
+        window: Optional[Tuple[int, int]] = None,
+        width: Optional[int] = None,
+        pids: Optional[Iterable[int]] = None,
+        top: Optional[int] = None,
+        sort_by: str = "turnaround",
+    ) -> str:
+        """Builds the Gantt chart as one string.
+
+        The chart is built from the trace's interval runs, so the work depends
+        on the number of runs in the window and the size of the chart, not on
+        the number of ticks. With ``width``, every column covers a bucket of
+        ticks and shows whichever state covers most of it.
+
+        Args:
+          res: dict: The output of an engine's ``run``.
+          custom_colors: dict: Theme overrides for "EXEC", "WAIT", "CTX". (Default value = None)
+          window: Only chart the ticks ``t0 <= t < t1``. (Default value = None, everything)
+          width: Squeeze the window into at most this many columns. (Default value = None, one per tick)
+          pids: Only chart these processes. (Default value = None, all)
+          top: Only chart the ``top`` processes with the largest ``sort_by``. (Default value = None)
+          sort_by: Result field that ``top`` ranks by. (Default value = "turnaround")
 
+        Returns:
+          str: The chart, with ANSI colors.
         """
-        events = res["structured_trace"]
         total_time = res["total_time"]
         results = {r["pid"]: r for r in res["individual_results"]}
 
@@ -53,54 +98,142 @@ class Visualizer:
         if custom_colors:
             theme.update(custom_colors)
 
-        # Map timeline
-        cpu_map = [None] * (total_time + 1)
-        for e in events:
-            if e.event_type in ["EXEC", "SWITCH", "IDLE"]:
-                cpu_map[e.time] = (e.event_type, e.pid)
-
-        print(f"\n{Visualizer._color('📊 VANCE GANTT CHART', 'bold')}")
-
-        pids = sorted(results.keys())
-        for pid in pids:
-            arrival = results[pid]["arrival"]
-            finish = results[pid]["completion"]
-
-            row = [f"P{pid:02} |"]
-            for t in range(total_time):
-                state = cpu_map[t]
-                if state and state[0] == "EXEC" and state[1] == pid:
-                    row.append(Visualizer._color("█", theme["EXEC"]))
-                elif arrival <= t < finish:
-                    row.append(Visualizer._color("░", theme["WAIT"]))
-                else:
-                    row.append(" ")
-            print("".join(row))
+        t0, t1 = window if window is not None else (0, total_time)
+        t0, t1 = max(t0, 0), min(t1, total_time)
+        if t1 < t0:
+            raise ValueError(f"Empty window [{t0}, {t1}).")
+        if width is not None and width < 1:
+            raise ValueError("width must be at least 1.")
+        bucket = max(-(-(t1 - t0) // width), 1) if width else 1
+        columns = -(-(t1 - t0) // bucket)
 
-        # Context Switch Track
-        ctx_row = ["CTX |"]
-        for t in range(total_time):
-            state = cpu_map[t]
-            if state and state[0] == "SWITCH":
-                ctx_row.append(Visualizer._color("▒", theme["CTX"]))
+        selected = Visualizer._select_pids(results, pids, top, sort_by)
+        row_of = {pid: i for i, pid in enumerate(selected)}
+
+        # Ticks spent executing (per process) and switching, per column
+        exec_ticks = [[0] * columns for _ in selected]
+        ctx_ticks = [0] * columns
+        for run in Visualizer._runs_in_window(res["structured_trace"], t0, t1):
+            if run.event_type == "EXEC":
+                row = row_of.get(run.pid)
+                if row is None:
+                    continue
+                counts = exec_ticks[row]
+            elif run.event_type == "SWITCH":
+                counts = ctx_ticks
             else:
-                ctx_row.append(" ")
-        print("".join(ctx_row))
-
-        # Axis
-        axis = ["    └"] + ["┸" if t % 5 == 0 else "─" for t in range(total_time)]
-        print("".join(axis))
-        labels = ["     "] + [
-            f"{t:<5}" if t % 5 == 0 else "" for t in range(total_time)
+                continue
+            lo, hi = max(run.start, t0) - t0, min(run.end, t1) - t0
+            column = lo // bucket
+            while lo < hi:
+                stop = min((column + 1) * bucket, hi)
+                counts[column] += stop - lo
+                lo = stop
+                column += 1
+
+        label_width = max([len(f"P{pid:02}") for pid in selected] + [3])
+        cells = {
+            "EXEC": ("█", theme["EXEC"]),
+            "WAIT": ("░", theme["WAIT"]),
+            "CTX": ("▒", theme["CTX"]),
+            None: (" ", None),
+        }
+        lines = ["", Visualizer._color("📊 VANCE GANTT CHART", "bold")]
+        if window is not None or bucket > 1:
+            lines.append(Visualizer._color(f"ticks {t0}-{t1}, {bucket} per column", "dim"))
+
+        for pid, counts in zip(selected, exec_ticks):
+            # Blank before arrival and after completion; only look at the rest
+            alive_lo = max(results[pid]["arrival"], t0) - t0
+            alive_hi = min(results[pid]["completion"], t1) - t0
+            states = [None] * columns
+            if alive_lo < alive_hi:
+                for column in range(alive_lo // bucket, -(-alive_hi // bucket)):
+                    lo = column * bucket
+                    hi = min(lo + bucket, t1 - t0)
+                    alive = min(hi, alive_hi) - max(lo, alive_lo)
+                    executing = counts[column]
+                    waiting = alive - executing
+                    if executing and executing >= waiting and executing >= hi - lo - alive:
+                        states[column] = "EXEC"
+                    elif waiting > 0 and waiting >= hi - lo - alive:
+                        states[column] = "WAIT"
+            lines.append(f"P{pid:02}".ljust(label_width) + " |" + Visualizer._paint(states, cells))
+
+        # Context Switch Track
+        ctx_states = [
+            "CTX" if switching and switching * 2 >= min(bucket, t1 - t0 - column * bucket) else None
+            for column, switching in enumerate(ctx_ticks)
         ]
-        print(Visualizer._color("".join(labels), "cyan"))
+        lines.append("CTX".ljust(label_width) + " |" + Visualizer._paint(ctx_states, cells))
+
+        # Axis, labelled every `step` columns with the first tick of the column
+        step = max(5, len(str(t0 + max(columns - 1, 0) * bucket)) + 1)
+        lines.append(
+            " " * (label_width + 1) + "└"
+            + "".join("┸" if c % step == 0 else "─" for c in range(columns))
+        )
+        labels = " " * (label_width + 2) + "".join(
+            f"{t0 + c * bucket:<{step}}" for c in range(0, columns, step)
+        )
+        lines.append(Visualizer._color(labels, "cyan"))
 
         exec_icon = Visualizer._color("█", theme["EXEC"])
         wait_icon = Visualizer._color("░", theme["WAIT"])
         ctx_icon = Visualizer._color("▒", theme["CTX"])
-        print(
+        lines.append(
             f"\n{Visualizer._color('KEY:', 'dim')} {exec_icon} Executing  {wait_icon} Waiting  {ctx_icon} Context Switch"
         )
+        return "\n".join(lines)
+
+    @staticmethod
+    def _select_pids(results: dict, pids, top, sort_by) -> List[int]:
+        """The PIDs to chart, in PID order."""
+        selected = sorted(results) if pids is None else sorted(p for p in set(pids) if p in results)
+        if top is not None:
+            if results and sort_by not in next(iter(results.values())):
+                raise ValueError(f"Cannot rank processes by {sort_by!r}.")
+            ranked = sorted(selected, key=lambda p: (-results[p][sort_by], p))
+            selected = sorted(ranked[:top])
+        return selected
+
+    @staticmethod
+    def _runs_in_window(events, t0: int, t1: int) -> Iterator[TraceInterval]:
+        """Yields the trace's interval runs that overlap ``[t0, t1)``."""
+        intervals = getattr(events, "intervals", None)
+        if intervals is None:
+            # A plain list of per-tick events
+            intervals = [
+                TraceInterval(e.time, e.time + 1, e.event_type, e.pid)
+                for e in events
+                if e.event_type in ("EXEC", "SWITCH", "IDLE")
+            ]
+        # Runs are in time order: binary search for the first one ending after t0
+        lo, hi = 0, len(intervals)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if intervals[mid].end <= t0:
+                lo = mid + 1
+            else:
+                hi = mid
+        for index in range(lo, len(intervals)):
+            run = intervals[index]
+            if run.start >= t1:
+                break
+            yield run
+
+    @staticmethod
+    def _paint(states: list, cells: dict) -> str:
+        """Turns a row of states into text, coloring each stretch once."""
+        parts = []
+        start = 0
+        for index in range(1, len(states) + 1):
+            if index == len(states) or states[index] != states[start]:
+                char, color = cells[states[start]]
+                text = char * (index - start)
+                parts.append(Visualizer._color(text, color) if color else text)
+                start = index
+        return "".join(parts)
 
     @staticmethod
     def display_summary(res: dict):
@@ -132,11 +265,13 @@ class Visualizer:
         print(
             f"Average Turnaround Time: {Visualizer._color(avgs['avg_turnaround_time'], 'green')}"
         )
+        efficiency = f"{avgs['hardware_efficiency']:.1f}%"
+        utilization = f"{avgs['cpu_utilization']:.1f}%"
         print(
-            f"Hardware Efficiency:     {Visualizer._color(avgs['hardware_efficiency'], 'cyan')} (Actual Work / Total Time)"
+            f"Hardware Efficiency:     {Visualizer._color(efficiency, 'cyan')} (Actual Work / Total Time)"
         )
         print(
-            f"CPU Utilization:         {Visualizer._color(avgs['cpu_utilization'], 'cyan')} (Non-Idle Time / Total Time)"
+            f"CPU Utilization:         {Visualizer._color(utilization, 'cyan')} (Non-Idle Time / Total Time)"
         )
 
     @staticmethod
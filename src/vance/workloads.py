@@ -0,0 +1,274 @@
+"""Seeded synthetic workloads for large experiments.
+
+A ``Workload`` combines an arrival process, a burst time distribution and an
+optional priority mix. Everything is drawn in NumPy batches from one seeded
+generator, so the same seed always gives the same processes, whether they
+are taken as arrays or lazily as ``Process`` objects:
+
+    w = Workload(PoissonArrivals(rate=0.08), LogNormal(median=8, sigma=1.0), seed=42)
+
+    cols = w.arrays(10_000_000)        # dict of int64 arrays, for AnalyticEngine.run_arrays
+    table = w.table(1_000_000)         # ProcessTable, for any engine's run
+    procs = w.take(1_000)              # list[Process], for BasicEngine.run
+    stream = w.processes()             # endless generator, for StreamingEngine.stream
+
+Times are whole ticks: arrival times are rounded down and burst times are
+rounded up (and are at least 1).
+
+Requires NumPy (``pip install vance[numpy]``).
+"""
+from .types import Process
+from .table import ProcessTable
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Union
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+# Arrival processes. ``sample`` returns ``size`` sorted, continuous arrival
+# times strictly after ``start``.
+
+@dataclass(frozen=True)
+class PoissonArrivals:
+    """Arrivals with exponential inter-arrival gaps (``rate`` per tick)."""
+
+    rate: float
+
+    def sample(self, rng, size: int, start: float):
+        return start + np.cumsum(rng.exponential(1 / self.rate, size))
+
+
+@dataclass(frozen=True)
+class BurstyArrivals:
+    """Arrivals in clusters: clusters come as a Poisson process and each one
+    brings a geometric number of processes (``mean_burst_size`` on average)
+    at almost the same time (``spread`` ticks apart on average).
+
+    ``rate`` is the long-run number of processes per tick.
+    """
+
+    rate: float
+    mean_burst_size: float = 10.0
+    spread: float = 0.0
+
+    def sample(self, rng, size: int, start: float):
+        n_clusters = max(1, math.ceil(size / self.mean_burst_size) + 1)
+        times = np.empty(0)
+        while len(times) < size:
+            gaps = rng.exponential(self.mean_burst_size / self.rate, n_clusters)
+            cluster_times = start + np.cumsum(gaps)
+            counts = rng.geometric(1 / self.mean_burst_size, n_clusters)
+            batch = np.repeat(cluster_times, counts)
+            if self.spread > 0:
+                batch = batch + rng.exponential(self.spread, len(batch))
+                batch.sort()
+            times = np.concatenate([times, batch])
+            start = batch[-1]
+        return times[:size]
+
+
+@dataclass(frozen=True)
+class DiurnalArrivals:
+    """Poisson arrivals whose rate follows a daily cycle:
+    ``mean_rate * (1 + amplitude * sin(2 * pi * t / period))``.
+
+    Sampled by thinning a Poisson process at the peak rate.
+    """
+
+    mean_rate: float
+    amplitude: float = 0.5
+    period: float = 86_400.0
+
+    def sample(self, rng, size: int, start: float):
+        peak = self.mean_rate * (1 + abs(self.amplitude))
+        accepted = []
+        n_accepted = 0
+        while n_accepted < size:
+            # Draw enough candidates to cover the rest in one go (on average)
+            n = max(1024, int((size - n_accepted) * 1.2 * (1 + abs(self.amplitude))))
+            candidates = start + np.cumsum(rng.exponential(1 / peak, n))
+            rate = self.mean_rate * (1 + self.amplitude * np.sin(2 * np.pi * candidates / self.period))
+            keep = candidates[rng.random(n) * peak < rate]
+            accepted.append(keep)
+            n_accepted += len(keep)
+            start = candidates[-1]
+        return np.concatenate(accepted)[:size]
+
+
+# Burst time distributions. ``sample`` returns ``size`` positive floats.
+
+@dataclass(frozen=True)
+class Exponential:
+    """Exponential burst times with the given mean."""
+
+    mean: float
+
+    def sample(self, rng, size: int):
+        return rng.exponential(self.mean, size)
+
+
+@dataclass(frozen=True)
+class LogNormal:
+    """Log-normal burst times with the given median and log-space sigma."""
+
+    median: float
+    sigma: float = 1.0
+
+    def sample(self, rng, size: int):
+        return rng.lognormal(math.log(self.median), self.sigma, size)
+
+
+@dataclass(frozen=True)
+class Pareto:
+    """Heavy-tailed Pareto burst times: at least ``minimum``, tail index ``alpha``."""
+
+    alpha: float
+    minimum: float = 1.0
+
+    def sample(self, rng, size: int):
+        return (rng.pareto(self.alpha, size) + 1) * self.minimum
+
+
+@dataclass(frozen=True)
+class Bimodal:
+    """A mix of short and long jobs: exponential around ``short_mean``, or
+    around ``long_mean`` with probability ``long_fraction``."""
+
+    short_mean: float
+    long_mean: float
+    long_fraction: float = 0.1
+
+    def sample(self, rng, size: int):
+        means = np.where(rng.random(size) < self.long_fraction, self.long_mean, self.short_mean)
+        return rng.exponential(means)
+
+
+@dataclass(frozen=True)
+class PriorityMix:
+    """Draws priorities from a weighted set of levels.
+
+    Args:
+      weights: Either ``{priority: weight}``, or a sequence of weights for
+        priorities 0, 1, 2, ...
+    """
+
+    weights: Union[Mapping[int, float], Sequence[float]]
+
+    def sample(self, rng, size: int):
+        if isinstance(self.weights, Mapping):
+            levels = np.array(list(self.weights.keys()), dtype=np.int64)
+            weights = np.array(list(self.weights.values()), dtype=float)
+        else:
+            levels = np.arange(len(self.weights), dtype=np.int64)
+            weights = np.array(self.weights, dtype=float)
+        return rng.choice(levels, size=size, p=weights / weights.sum())
+
+
+class Workload:
+    """A reproducible stream of processes.
+
+    Args:
+      arrivals: The arrival process. (Default value = None, Poisson at 0.1 per tick)
+      bursts: The burst time distribution. (Default value = None, exponential with mean 8)
+      priorities: A ``PriorityMix``. (Default value = None, everything at priority 0)
+      seed: Seed of the NumPy generator. (Default value = None, not reproducible)
+      batch_size: Processes drawn per batch. (Default value = 1 << 16)
+    """
+
+    def __init__(
+        self,
+        arrivals=None,
+        bursts=None,
+        priorities: Optional[PriorityMix] = None,
+        seed: Optional[int] = None,
+        batch_size: int = 1 << 16,
+    ):
+        _require_numpy()
+        self.arrivals = arrivals if arrivals is not None else PoissonArrivals(rate=0.1)
+        self.bursts = bursts if bursts is not None else Exponential(mean=8)
+        self.priorities = priorities
+        self.seed = seed
+        self.batch_size = batch_size
+
+    def batches(self) -> Iterator[Dict[str, "np.ndarray"]]:
+        """Yields endless batches of processes as dicts of int64 arrays.
+
+        Every call starts over from the seed. PIDs count up from 0 and
+        arrival times never decrease across batches.
+        """
+        rng = np.random.default_rng(self.seed)
+        size = self.batch_size
+        pid_start = 0
+        clock = 0.0
+        while True:
+            arrival_times = self.arrivals.sample(rng, size, clock)
+            clock = float(arrival_times[-1])
+            burst = np.maximum(np.ceil(self.bursts.sample(rng, size)), 1).astype(np.int64)
+            if self.priorities is not None:
+                priority = self.priorities.sample(rng, size).astype(np.int64)
+            else:
+                priority = np.zeros(size, dtype=np.int64)
+            yield {
+                "pid": np.arange(pid_start, pid_start + size, dtype=np.int64),
+                "arrival": np.floor(arrival_times).astype(np.int64),
+                "burst": burst,
+                "priority": priority,
+            }
+            pid_start += size
+
+    def arrays(self, n: int) -> Dict[str, "np.ndarray"]:
+        """The first ``n`` processes as columns (pid, arrival, burst, priority).
+
+        The keys match the arguments of ``AnalyticEngine.run_arrays``.
+        """
+        columns: Dict[str, list] = {"pid": [], "arrival": [], "burst": [], "priority": []}
+        remaining = n
+        for batch in self.batches():
+            if remaining <= 0:
+                break
+            for name, values in batch.items():
+                columns[name].append(values[:remaining])
+            remaining -= self.batch_size
+        return {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+            for name, parts in columns.items()
+        }
+
+    def table(self, n: int) -> ProcessTable:
+        """The first ``n`` processes as a ``ProcessTable`` (see ``vance.table``)."""
+        return ProcessTable.from_arrays(**self.arrays(n))
+
+    def processes(self, n: Optional[int] = None) -> Iterator[Process]:
+        """Lazily yields ``Process`` objects in arrival order.
+
+        Args:
+          n: How many to yield. (Default value = None, endless)
+        """
+        produced = 0
+        for batch in self.batches():
+            columns = zip(
+                batch["pid"].tolist(),
+                batch["burst"].tolist(),
+                batch["arrival"].tolist(),
+                batch["priority"].tolist(),
+            )
+            for pid, burst, arrival, priority in columns:
+                if n is not None and produced >= n:
+                    return
+                yield Process(pid=pid, burst_time=burst, arrival_time=arrival, priority_time=priority)
+                produced += 1
+
+    def take(self, n: int) -> List[Process]:
+        """The first ``n`` processes as a list."""
+        return list(self.processes(n))
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "vance.workloads needs NumPy. Install it with `pip install vance[numpy]`."
+        )
@@ -0,0 +1,42 @@
+import random
+
+from vance import FCFS, RR, BasicEngine, EventEngine, Process
+
+
+def _workload(seed: int):
+    rng = random.Random(seed)
+    return [
+        Process(pid=i, burst_time=rng.randint(1, 12), arrival_time=rng.randint(0, 60))
+        for i in range(1, 30)
+    ]
+
+
+def _with_list_queue(policy_cls):
+    """A subclass that gets a plain list as its ready queue."""
+    return type(f"List{policy_cls.__name__}", (policy_cls,), {"create_ready_queue": lambda self, _rt: []})
+
+
+def test_fcfs_takes_a_plain_list():
+    queue = [Process(pid=1, burst_time=3), Process(pid=2, burst_time=1)]
+    assert FCFS().get_next_process(queue, None, 0, {1: 3, 2: 1}).pid == 1
+    assert [p.pid for p in queue] == [2]
+
+
+def test_rr_takes_a_plain_list():
+    first, second = Process(pid=1, burst_time=5), Process(pid=2, burst_time=5)
+    queue = [second]
+    # Quantum used up: the current process goes to the back, the head runs
+    assert RR(time_quantum=2).get_next_process(queue, first, 2, {1: 3, 2: 5}) is second
+    assert queue == [first]
+
+
+def test_plain_list_schedules_like_the_fifo_queue():
+    for policy_cls, make in ((FCFS, FCFS), (RR, lambda: RR(time_quantum=3))):
+        listed = _with_list_queue(policy_cls)
+        for seed in range(10):
+            processes = _workload(seed)
+            for engine_cls in (BasicEngine, EventEngine):
+                expected = engine_cls(make(), dispatch_latency=1).run(processes)
+                policy = listed(time_quantum=3) if policy_cls is RR else listed()
+                got = engine_cls(policy, dispatch_latency=1).run(processes)
+                assert list(got["individual_results"]) == list(expected["individual_results"])
@@ -0,0 +1,42 @@
+import random
+
+from vance import Lottery, Process, RR, SMPEngine, Stride
+from vance.smp import PLACEMENTS
+
+
+def _workload(n: int = 40, seed: int = 1):
+    rng = random.Random(seed)
+    return [
+        Process(
+            pid=i,
+            burst_time=rng.randint(5, 40),
+            arrival_time=rng.randint(0, 60),
+            priority_time=rng.randint(-2, 2),
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def test_fairness_is_reported_for_every_placement():
+    processes = _workload()
+    for make in (lambda: Lottery(time_quantum=3, seed=7), lambda: Stride(time_quantum=3)):
+        for placement in PLACEMENTS:
+            res = SMPEngine(make(), cores=2, placement=placement, balance_interval=10, trace_level="OFF").run(processes)
+            fairness = res["fairness"]
+            # Every process is summed up once, on the core it finished on
+            assert fairness["processes"] == len(processes)
+            assert 0.0 <= fairness["share_error"] < 1.0
+            assert 0.0 < fairness["jain_index"] <= 1.0
+
+
+def test_per_core_fairness_adds_up():
+    processes = _workload()
+    engine = SMPEngine(Stride(time_quantum=3), cores=3, placement="balance", balance_interval=10, trace_level="OFF")
+    res = engine.run(processes)
+    per_core = [core.policy.report()["fairness"] for core in engine.cores]
+    assert sum(report["processes"] for report in per_core) == res["fairness"]["processes"]
+
+
+def test_policies_without_a_report_add_nothing():
+    res = SMPEngine(RR(time_quantum=3), cores=2, placement="steal", trace_level="OFF").run(_workload())
+    assert "fairness" not in res and "core_reports" not in res